@@ -1,11 +1,16 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
 
+from api_response import etag_matches, json_response, negotiated_etag, not_modified
 from search_engine import (
+    INDEX_GENERATION,
+    RESULT_FIELDS,
     tfidf_search,
     bm25_search,
     get_metrics,
     get_document,
+    has_document,
+    metrics_stamp,
 )
 
 from evaluator import evaluate_query_both_algos
@@ -13,6 +18,59 @@ from evaluator import evaluate_query_both_algos
 app = Flask(__name__)
 CORS(app)  # Penting biar frontend (Next.js) bisa akses backend
 
+# fields= untuk /search: daftar field ("doc_id,score"), field yang dibuang
+# ("-snippet,-image_url"), atau preset di bawah
+FIELD_PRESETS = {
+    "all": RESULT_FIELDS,
+    "ids": ("doc_id", "score"),
+    "lean": tuple(f for f in RESULT_FIELDS if f != "snippet"),
+}
+
+
+# Dokumen & metrics boleh disimpan client, tapi selalu divalidasi ulang
+# (If-None-Match -> 304): doc_id bisa menunjuk dokumen lain setelah reindex.
+REVALIDATE = "public, no-cache"
+
+
+def jsonify(payload, status: int = 200, headers: dict = None):
+    """JSON (orjson) + gzip/brotli sesuai Accept-Encoding, lihat api_response.py"""
+    return json_response(payload, status, request.headers.get("Accept-Encoding"), headers)
+
+
+def representation_etag(etag: str) -> str:
+    """ETag + suffix encoding untuk request ini; dipakai untuk cek 304 dan header 200."""
+    return negotiated_etag(etag, request.headers.get("Accept-Encoding"))
+
+
+def client_has(etag: str) -> bool:
+    return etag_matches(request.headers.get("If-None-Match"), etag)
+
+
+def parse_fields(spec: str):
+    """Tuple field hasil /search (urutan RESULT_FIELDS); ValueError kalau tidak valid."""
+    spec = spec.strip().lower()
+    if not spec:
+        return RESULT_FIELDS
+    if spec in FIELD_PRESETS:
+        return FIELD_PRESETS[spec]
+
+    names = [n.strip() for n in spec.split(",") if n.strip()]
+    excluded = {n[1:] for n in names if n.startswith("-")}
+    included = {n for n in names if not n.startswith("-")}
+    unknown = (excluded | included) - set(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if included and excluded:
+        raise ValueError("Use either a field list or '-field' exclusions, not both")
+
+    if excluded:
+        fields = tuple(f for f in RESULT_FIELDS if f not in excluded)
+    else:
+        fields = tuple(f for f in RESULT_FIELDS if f in included)
+    if not fields:
+        raise ValueError("At least one field is required")
+    return fields
+
 
 # ===============================
 # Root Test Endpoint
@@ -22,7 +80,7 @@ def index():
     return jsonify({
         "message": "Sipapa Search Engine API is running!",
         "endpoints": [
-            "/search",
+            "/search?query=&algo=&top_k=&fields=",
             "/metrics",
             "/document/<doc_id>",
             "/evaluate",
@@ -39,6 +97,15 @@ def search():
     algo = request.args.get("algo", "tfidf").lower()
     top_k = int(request.args.get("top_k", 20))
 
+    try:
+        fields = parse_fields(request.args.get("fields", ""))
+    except ValueError as e:
+        return jsonify({
+            "error": str(e),
+            "available_fields": list(RESULT_FIELDS),
+            "presets": list(FIELD_PRESETS),
+        }), 400
+
     if not query:
         return jsonify({
             "results": [],
@@ -56,9 +123,9 @@ def search():
         }), 400
 
     if algo == "bm25":
-        results = bm25_search(query, top_k=top_k)
+        results = bm25_search(query, top_k=top_k, fields=fields)
     else:
-        results = tfidf_search(query, top_k=top_k)
+        results = tfidf_search(query, top_k=top_k, fields=fields)
 
     return jsonify(results)
 
@@ -68,8 +135,13 @@ def search():
 # ===============================
 @app.get("/metrics")
 def metrics():
+    stamp = metrics_stamp()
+    etag = representation_etag(f'"metrics-{stamp[0]:x}-{stamp[1]:x}"' if stamp else '"metrics-none"')
+    if client_has(etag):
+        return not_modified(etag, REVALIDATE)
+
     result = get_metrics()
-    return jsonify(result)
+    return jsonify(result, headers={"ETag": etag, "Cache-Control": REVALIDATE})
 
 
 # ===============================
@@ -82,15 +154,25 @@ def document_detail(doc_id: int):
     Sekarang kita langsung pakai get_document()
     dan nggak cek len(DOC_META_MAP) lagi,
     karena doc_id di dataset bisa aja nggak 0..N-1.
+
+    Isi dokumen tetap selama generation index sama, jadi ETag = generation +
+    doc_id dan request ulang dengan If-None-Match dijawab 304 tanpa fetch.
+    Keberadaan doc_id dicek dulu supaya `If-None-Match: *` tidak dapat 304
+    untuk dokumen yang tidak ada.
     """
-    doc = get_document(doc_id)
-    if not doc:
+    if not has_document(doc_id):
         return jsonify({
             "error": "Document not found",
             "requested_id": doc_id
         }), 404
 
-    return jsonify(doc)
+    etag = representation_etag(f'"{INDEX_GENERATION}-{doc_id}"')
+    if client_has(etag):
+        return not_modified(etag, REVALIDATE)
+
+    doc = get_document(doc_id)
+
+    return jsonify(doc, headers={"ETag": etag, "Cache-Control": REVALIDATE})
 
 
 # ===============================
@@ -131,16 +213,9 @@ def evaluate():
 
     import search_engine as se
 
-    class SearchEngineMock:
-        def search(self, q, algo="tfidf", top_k=20):
-            if algo == "bm25":
-                return se.bm25_search(q, top_k=top_k)
-            else:
-                return se.tfidf_search(q, top_k=top_k)
-
     try:
-        search_mock = SearchEngineMock()
-        result = evaluate_query_both_algos(query, search_mock, top_k=top_k)
+        # search_engine.multi_search_ids: TF-IDF + BM25 dari satu traversal postings
+        result = evaluate_query_both_algos(query, se, top_k=top_k)
         return jsonify(result)
     except Exception as e:
         return jsonify({
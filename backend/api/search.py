@@ -1,85 +1,60 @@
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from pathlib import Path
 import json
-import csv
-import math
-from collections import defaultdict
+import os
+import sys
 
-# ====================================================
-# LOAD INVERTED INDEX
-# ====================================================
-with open("data/inverted_index.json", "r", encoding="utf-8") as f:
-    INVERTED_INDEX = json.load(f)
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
 
-# ====================================================
-# LOAD DOCUMENT METADATA
-# Format CSV harus:
-# id,title,url
-# ====================================================
-DOC_META = {}
-with open("data/doc_meta.csv", "r", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        DOC_META[row["id"]] = {
-            "title": row.get("title", "Untitled"),
-            "url": row.get("url", "#"),
-        }
-
-TOTAL_DOCS = len(DOC_META)
+# compact_index & ranking hanya butuh NumPy (requirements.txt), sama dengan search_engine.py
+from compact_index import COMPACT_FILE, average_doc_len, load_compact_artifact  # noqa: E402
+from ranking import bm25_contrib, load_bm25_params, score_tokens, top_k as _top_k  # noqa: E402
+from ranking import preprocess_query as tokenize  # noqa: E402,F401
 
+DATA_DIR = Path(os.environ.get("SIPAPA_DATA_DIR", BASE_DIR / "data"))
+TOP_K = 20
 
 # ====================================================
-# SIMPLE BM25-LIKE SCORING (PURE PYTHON)
+# LOAD COMPACT INDEX (sekali per instance)
+# Artifact yang sama dengan search_engine.py (python compact_index.py):
+# doc_len, idf, postings CSR, title/url. Konten dokumen tidak dimuat.
+# Instance yang masih warm memakai objek ini lagi di invocation berikutnya.
+# Tanpa artifact handler tetap ter-load dan menjawab 503 (build ulang butuh
+# pandas + file sumber, tidak tersedia di runtime serverless).
 # ====================================================
-def bm25_score(query_terms):
-    scores = defaultdict(float)
-
-    # Hyperparameter BM25 versi ringan
-    k1 = 1.5
-    b = 0.75
-
-    # Hitung doc length
-    doc_lengths = {}
-    total_length = 0
-    for term, postings in INVERTED_INDEX.items():
-        for doc_id, freq in postings:
-            doc_lengths[doc_id] = doc_lengths.get(doc_id, 0) + freq
-            total_length += freq
+TERMS = DOCS = None
+LOAD_ERROR = None
+try:
+    TERMS, DOCS = load_compact_artifact(DATA_DIR / COMPACT_FILE, contents=False)
+except FileNotFoundError:
+    LOAD_ERROR = f"{COMPACT_FILE} belum di-build (jalankan: python compact_index.py)"
+    print(f"[WARN] {LOAD_ERROR}")
+AVG_DL = average_doc_len(DOCS) if DOCS is not None else 0.0
 
-    avg_dl = total_length / TOTAL_DOCS if TOTAL_DOCS else 1
+# Hyperparameter BM25, sama dengan search_engine.py (hasil tuning kalau ada)
+K1, B = load_bm25_params(DATA_DIR)
 
-    # Loop tiap term di query
-    for term in query_terms:
-        if term not in INVERTED_INDEX:
-            continue
 
-        postings = INVERTED_INDEX[term]
-        df = len(postings)
-
-        # idf sederhana
-        idf = math.log((TOTAL_DOCS - df + 0.5) / (df + 0.5) + 1)
-
-        # Loop tiap dokumen yang mengandung term
-        for doc_id, freq in postings:
-            dl = doc_lengths.get(doc_id, 1)
-            tf = freq
+# ====================================================
+# BM25 (kerja per request sebanding jumlah postings term query)
+# ====================================================
+def _bm25(term_id, rows, tf, params):
+    return bm25_contrib(tf, DOCS.doc_len[rows], TERMS.idf_bm25[term_id], K1, B, AVG_DL)
 
-            # BM25 formula simplified
-            score = idf * ((tf * (k1 + 1)) /
-                           (tf + k1 * (1 - b + b * (dl / avg_dl))))
-            scores[doc_id] += score
 
-    # Sort by score
-    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+def bm25_score(query_terms, top_k=TOP_K):
+    rows, scores = score_tokens(TERMS, query_terms, {"bm25": _bm25}, {})["bm25"]
 
     results = []
-    for doc_id, score in ranked[:20]:  # top 20 results
-        meta = DOC_META.get(doc_id, {})
+    for i in _top_k((rows, scores), top_k).tolist():
+        row = int(rows[i])
         results.append({
-            "id": doc_id,
-            "title": meta.get("title", "Untitled"),
-            "url": meta.get("url", "#"),
-            "score": score
+            "id": int(DOCS.doc_ids[row]),
+            "title": DOCS.title(row) or "Untitled",
+            "url": DOCS.url(row) or "#",
+            "score": float(scores[i]),
         })
 
     return results
@@ -93,6 +68,13 @@ class handler(BaseHTTPRequestHandler):
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
 
+        if LOAD_ERROR is not None:
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": LOAD_ERROR}).encode("utf-8"))
+            return
+
         q = params.get("q", [""])[0].strip()
 
         if not q:
@@ -102,7 +84,7 @@ class handler(BaseHTTPRequestHandler):
             self.wfile.write(b'{"error":"Query parameter q is required"}')
             return
 
-        query_terms = q.lower().split()
+        query_terms = tokenize(q)
         results = bm25_score(query_terms)
 
         body = json.dumps(results, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,153 @@
+"""
+Response JSON untuk api.py: serialisasi cepat + kompresi sesuai Accept-Encoding.
+
+- orjson kalau terpasang (jauh lebih cepat dari json stdlib untuk list hasil
+  /search), fallback json.dumps.
+- Body >= MIN_COMPRESS_BYTES dikompres brotli (kalau modul brotli ada) atau
+  gzip, sesuai Accept-Encoding client (q=0 dihormati).
+- Setiap response membawa ukuran payload & waktu serialisasi/kompresi:
+  header X-Payload-Bytes (JSON sebelum kompresi) dan Server-Timing
+  (serialize;dur=..., compress;dur=..., dalam ms; terlihat di DevTools).
+- ETag + If-None-Match: endpoint yang isinya bisa diberi versi (dokumen per
+  generation index, metrics per mtime file) hitung negotiated_etag() sekali,
+  cek etag_matches() dan balas not_modified() tanpa membangun body. ETag
+  dapat suffix encoding hasil negosiasi ("...-br") karena byte-nya berbeda;
+  tag yang sama dipakai di 200 maupun 304.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from typing import Dict, Optional
+
+from flask import Response
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+MIN_COMPRESS_BYTES = 1024     # di bawah ini kompresi tidak sebanding overhead-nya
+# Level rendah: ~2 ms untuk 130 KB hasil top_k=100, rasio ~4x (level 6: ~6 ms, ~4.3x)
+GZIP_LEVEL = 3
+BROTLI_QUALITY = 4
+
+
+def _default(value):
+    # Skalar / array NumPy (mis. skor dari evaluator) -> tipe Python
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br' / 'gzip' / None. Brotli diutamakan kalau q-nya tidak lebih kecil."""
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = []
+    if HAS_BROTLI:
+        candidates.append(("br", accepted.get("br", wildcard)))
+    candidates.append(("gzip", accepted.get("gzip", wildcard)))
+    best, q = max(candidates, key=lambda c: c[1])
+    return best if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def negotiated_etag(etag: str, accept_encoding: Optional[str]) -> str:
+    """
+    ETag representasi yang akan dikirim untuk Accept-Encoding ini: '"x"' ->
+    '"x-br"' / '"x-gzip"'. Hanya bergantung pada negosiasi, jadi bisa
+    dihitung sebelum body dibangun (body kecil yang tidak dikompres tetap
+    byte-identik untuk Accept-Encoding yang sama).
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    return etag[:-1] + f'-{encoding}"' if encoding else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True kalau If-None-Match memuat `etag` (perbandingan weak seperti RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    response = Response(status=304)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def json_response(payload, status: int = 200, accept_encoding: Optional[str] = None,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    start = time.perf_counter()
+    body = dumps(payload)
+    serialized = time.perf_counter()
+    payload_bytes = len(body)
+
+    encoding = negotiate_encoding(accept_encoding) if payload_bytes >= MIN_COMPRESS_BYTES else None
+    if encoding:
+        body = compress(body, encoding)
+    compressed = time.perf_counter()
+
+    response = Response(body, status=status, mimetype="application/json")
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["X-Payload-Bytes"] = str(payload_bytes)
+    response.headers["Server-Timing"] = (
+        f"serialize;dur={(serialized - start) * 1000:.3f}, "
+        f"compress;dur={(compressed - serialized) * 1000:.3f}"
+    )
+    for key, value in (headers or {}).items():
+        response.headers[key] = value
+    return response
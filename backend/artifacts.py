@@ -0,0 +1,211 @@
+"""
+Artifact antar tahap pipeline dalam format kolumnar (Parquet), fallback CSV.
+
+scraped.csv -> corpus_clean / corpus_clean_v2 -> doc_meta: setiap konsumen
+dulu mem-parse ulang seluruh CSV (termasuk kolom teks panjang) walau cuma
+butuh url + title. Dengan Parquet:
+
+- kolom bertipe (string / int64 / float64), kompresi zstd
+- row group ROW_GROUP_ROWS baris -> iter_table() streaming per row group
+- read_table(path, columns=[...]) hanya membaca kolom yang diminta
+
+Path di kode tetap path .csv; file Parquet-nya <nama>.parquet di sebelahnya.
+Pembaca memilih yang paling baru dari keduanya (CSV hasil tool lama /
+synthetic_corpus.py tetap terbaca). pyarrow opsional: tanpa pyarrow, atau
+dengan env SIPAPA_ARTIFACT_FORMAT=csv, semuanya tetap CSV.
+
+scraped.csv tetap CSV: scraper append per batch (resume), Parquet tidak bisa append.
+
+CLI (ukuran disk & waktu parse CSV vs Parquet, full vs proyeksi kolom):
+    python artifacts.py [--data-dir data]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ROW_GROUP_ROWS = 1000
+COMPRESSION = "zstd"
+TEXT_COLUMNS = {
+    "url", "domain", "title", "image_url", "content", "content_clean",
+    "content_final", "content_raw",
+}
+
+
+def parquet_enabled() -> bool:
+    return HAS_PYARROW and os.environ.get("SIPAPA_ARTIFACT_FORMAT", "parquet").lower() != "csv"
+
+
+def parquet_path(path: Path) -> Path:
+    return Path(path).with_suffix(".parquet")
+
+
+def resolve(path: Path) -> Path:
+    """File yang dibaca untuk artifact `path`: Parquet kalau ada & tidak lebih lama dari CSV."""
+    path = Path(path)
+    pq_path = parquet_path(path)
+    if HAS_PYARROW and pq_path.exists():
+        if not path.exists() or pq_path.stat().st_mtime >= path.stat().st_mtime:
+            return pq_path
+    if path.exists():
+        return path
+    if pq_path.exists():
+        raise ImportError(f"{pq_path} butuh pyarrow (pip install pyarrow), atau buat ulang "
+                          f"artifact dengan SIPAPA_ARTIFACT_FORMAT=csv")
+    raise FileNotFoundError(f"Artifact tidak ditemukan: {path} / {pq_path}")
+
+
+def exists(path: Path) -> bool:
+    return Path(path).exists() or parquet_path(path).exists()
+
+
+def _to_arrow(df: pd.DataFrame) -> "pa.Table":
+    # Kolom teks selalu string (kolom yang isinya NaN semua jangan jadi double);
+    # kolom lain pakai tipe dari pandas (doc_id / doc_len tetap int64)
+    df = df.copy()
+    for col in df.columns:
+        if col in TEXT_COLUMNS:
+            df[col] = df[col].astype("string")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_table(df: pd.DataFrame, path: Path, keep_csv: bool = False,
+                encoding: str = "utf-8", verbose: bool = True) -> Path:
+    """
+    Simpan artifact. Parquet kalau tersedia (CSV juga kalau keep_csv, mis.
+    doc_meta.csv yang dibaca API), kalau tidak CSV dengan `encoding`.
+    CSV ditulis lebih dulu supaya Parquet-nya yang terbaru dan dipilih resolve().
+    """
+    path = Path(path)
+    start = time.perf_counter()
+    written = []
+    use_parquet = parquet_enabled()
+    if keep_csv or not use_parquet:
+        df.to_csv(path, index=False, encoding=encoding)
+        written.append(path)
+    if use_parquet:
+        pq.write_table(_to_arrow(df), parquet_path(path),
+                       row_group_size=ROW_GROUP_ROWS, compression=COMPRESSION)
+        written.insert(0, parquet_path(path))
+    if verbose:
+        sizes = ", ".join(f"{p.name} {p.stat().st_size / 1e6:.2f} MB" for p in written)
+        print(f"[IO] Tulis {len(df)} baris -> {sizes} ({time.perf_counter() - start:.2f} detik)")
+    return written[0]
+
+
+def read_table(path: Path, columns: Optional[Sequence[str]] = None,
+               verbose: bool = True) -> pd.DataFrame:
+    """Baca artifact (hanya `columns` kalau diberikan)."""
+    source = resolve(path)
+    start = time.perf_counter()
+    if source.suffix == ".parquet":
+        df = pq.read_table(source, columns=list(columns) if columns else None).to_pandas()
+    else:
+        df = pd.read_csv(source, usecols=list(columns) if columns else None)
+    if verbose:
+        print(f"[IO] Baca {source.name}: {len(df)} baris x {len(df.columns)} kolom, "
+              f"{source.stat().st_size / 1e6:.2f} MB di disk ({time.perf_counter() - start:.2f} detik)")
+    return df
+
+
+def iter_table(path: Path, columns: Optional[Sequence[str]] = None,
+               batch_rows: int = ROW_GROUP_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Artifact per potongan (Parquet: per row group, CSV: chunksize). Index
+    DataFrame = nomor baris global, jadi tetap bisa dipakai sebagai doc_id.
+    """
+    source = resolve(path)
+    columns = list(columns) if columns else None
+    offset = 0
+    if source.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(source)
+        for i in range(parquet_file.num_row_groups):
+            chunk = parquet_file.read_row_group(i, columns=columns).to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(source, usecols=columns, chunksize=batch_rows)
+
+
+def table_columns(path: Path) -> list:
+    """Nama kolom artifact (hanya header / schema yang dibaca)."""
+    source = resolve(path)
+    if source.suffix == ".parquet":
+        return pq.ParquetFile(source).schema_arrow.names
+    return list(pd.read_csv(source, nrows=0).columns)
+
+
+# ========== LAPORAN CSV VS PARQUET ==========
+
+ARTIFACTS = {
+    "scraped.csv": ["url", "title"],
+    "corpus_clean.csv": ["url", "title"],
+    "corpus_clean_v2.csv": ["url", "image_url", "content_final"],
+    "doc_meta.csv": ["doc_id", "url", "title", "doc_len"],
+}
+
+
+def _timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(path: Path, columns: Sequence[str], tmp_dir: Path):
+    """Satu baris tabel; pasangan CSV/Parquet yang belum ada dibuat di tmp_dir."""
+    if not exists(path):
+        return
+    source = resolve(path)
+    if source.suffix == ".parquet":
+        pq_path, csv_path = source, tmp_dir / path.name
+        pd.read_parquet(pq_path).to_csv(csv_path, index=False)
+    else:
+        csv_path, pq_path = source, tmp_dir / parquet_path(path).name
+        pq.write_table(_to_arrow(pd.read_csv(csv_path)), pq_path,
+                       row_group_size=ROW_GROUP_ROWS, compression=COMPRESSION)
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    columns = [c for c in columns if c in header]
+
+    csv_full = _timed(lambda: pd.read_csv(csv_path))
+    pq_full = _timed(lambda: pq.read_table(pq_path).to_pandas())
+    csv_proj = _timed(lambda: pd.read_csv(csv_path, usecols=columns))
+    pq_proj = _timed(lambda: pq.read_table(pq_path, columns=columns).to_pandas())
+    print(f"{path.name:<22}{csv_path.stat().st_size / 1e6:>9.2f}{pq_path.stat().st_size / 1e6:>8.2f}"
+          f"{csv_full:>8.3f}{pq_full:>8.3f}{csv_proj:>12.3f}{pq_proj:>11.3f}  {','.join(columns)}")
+
+
+def main(data_dir: Path):
+    if not HAS_PYARROW:
+        print("[WARN] pyarrow tidak terpasang, hanya CSV yang bisa dibaca")
+        return
+
+    print(f"{'artifact':<22}{'CSV MB':>9}{'PQ MB':>8}{'CSV s':>8}{'PQ s':>8}"
+          f"{'CSV proj s':>12}{'PQ proj s':>11}  kolom proyeksi")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, columns in ARTIFACTS.items():
+            _report(data_dir / name, columns, Path(tmp))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan artifact CSV vs Parquet")
+    parser.add_argument("--data-dir", type=Path, default=Path(__file__).resolve().parent / "data")
+    args = parser.parse_args()
+    main(args.data_dir)
@@ -3,64 +3,25 @@ Backfill SEMUA 4852 artikel dengan image URL.
 Hanya scrape gambar, tidak perlu content parsing.
 Lebih cepat dari full re-scrape.
 """
+import argparse
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import time
 from pathlib import Path
-import re
+
+from http_client import print_handshake_stats
+from image_meta import DEFAULT_CONCURRENCY, fetch_images, print_fetch_stats
+from page_store import open_default_store
+from url_canon import canonicalize_url
 
 BASE_DIR = Path(__file__).parent
 SCRAPED_FILE = BASE_DIR / "data" / "scraped.csv"
+STORE = open_default_store()
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-}
-
-def extract_images(soup):
-    """Ekstrak URL gambar dari artikel"""
-    # Prioritas 1: Open Graph image
-    og_image = soup.find("meta", attrs={"property": "og:image"})
-    if og_image and og_image.get("content"):
-        return og_image["content"].strip()
-    
-    # Prioritas 2: Twitter card
-    twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
-    if twitter_image and twitter_image.get("content"):
-        return twitter_image["content"].strip()
-    
-    # Prioritas 3: First image in article
-    article_containers = soup.find_all(["article", "div"], class_=lambda x: x and ('article' in x.lower() or 'content' in x.lower()))
-    for container in article_containers:
-        img = container.find("img", src=True)
-        if img and img.get("src"):
-            src = img["src"].strip()
-            if not src.startswith('data:') and 'icon' not in src.lower() and 'logo' not in src.lower():
-                return src
-    
-    # Fallback: first image
-    img = soup.find("img", src=True)
-    if img and img.get("src"):
-        src = img["src"].strip()
-        if not src.startswith('data:'):
-            return src
-    
-    return ""
-
-def scrape_image(url):
-    """Scrape gambar dari satu URL"""
-    try:
-        # Remove query params untuk kompas.com
-        clean_url = re.sub(r'\?page=.*', '', url)
-        
-        res = requests.get(clean_url, headers=HEADERS, timeout=15)
-        if res.status_code == 200:
-            soup = BeautifulSoup(res.text, "html.parser")
-            image_url = extract_images(soup)
-            return image_url
-        return ""
-    except Exception as e:
-        return ""
+arg_parser = argparse.ArgumentParser(description="Backfill image_url di scraped.csv")
+arg_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Jumlah request paralel (politeness per host tetap berlaku)")
+arg_parser.add_argument("--full", action="store_true",
+                        help="Download seluruh halaman seperti versi lama (pembanding byte/artikel)")
+args = arg_parser.parse_args()
 
 print(f"[INFO] Membaca {SCRAPED_FILE}...")
 df = pd.read_csv(SCRAPED_FILE)
@@ -76,51 +37,33 @@ if need_scrape == 0:
     print("[INFO] Semua artikel sudah punya gambar!")
     exit(0)
 
-print(f"\n[START] Scraping {need_scrape} artikel...")
-print(f"[ESTIMATE] Waktu: ~{need_scrape * 0.3 / 60:.1f} menit\n")
+print(f"\n[START] Scraping {need_scrape} artikel "
+      f"({'full body' if args.full else 'head-only'}, {args.concurrency} paralel)...\n")
+
+# Buang ?page=, tracking param & fragment (sama dengan frontier crawler)
+clean_urls = {idx: canonicalize_url(url) or url for idx, url in df.loc[no_image, 'url'].items()}
+images, fetch_stats = fetch_images(clean_urls.values(), concurrency=args.concurrency,
+                                   full=args.full, store=STORE)
 
 updated_count = 0
 failed_count = 0
-start_time = time.time()
-
-for idx, row in df[no_image].iterrows():
-    url = row['url']
-    
-    progress = updated_count + failed_count + 1
-    pct = (progress / need_scrape) * 100
-    
-    print(f"[{progress}/{need_scrape}] ({pct:.1f}%) Scraping doc_id {idx}...")
-    
-    image_url = scrape_image(url)
-    
+for idx, url in clean_urls.items():
+    image_url = images.get(url, "")
+    df.at[idx, 'image_url'] = image_url
     if image_url:
-        df.at[idx, 'image_url'] = image_url
         updated_count += 1
-        print(f"   ✓ {image_url[:70]}...")
     else:
-        df.at[idx, 'image_url'] = ""
         failed_count += 1
-        print(f"   ✗ No image")
-    
-    # Progress setiap 100 artikel
-    if progress % 100 == 0:
-        elapsed = time.time() - start_time
-        avg_time = elapsed / progress
-        remaining = (need_scrape - progress) * avg_time
-        print(f"\n   📊 Progress: {updated_count} success, {failed_count} failed")
-        print(f"   ⏱️  Elapsed: {elapsed/60:.1f}m | Remaining: ~{remaining/60:.1f}m\n")
-    
-    time.sleep(0.25)  # Rate limit
 
 # Final stats
-elapsed = time.time() - start_time
 print(f"\n{'='*60}")
 print(f"[SUCCESS] Backfill selesai!")
 print(f"[STATS]")
 print(f"   ✓ Berhasil: {updated_count}/{need_scrape}")
 print(f"   ✗ Gagal: {failed_count}/{need_scrape}")
-print(f"   ⏱️  Waktu: {elapsed/60:.1f} menit")
-print(f"   📈 Speed: {need_scrape/elapsed:.1f} artikel/detik")
+print(f"   ⏱️  Waktu: {fetch_stats['seconds']/60:.1f} menit")
+print_fetch_stats(fetch_stats, len(clean_urls), args.full)
+print_handshake_stats()
 
 # Save
 print(f"\n[SAVE] Menyimpan ke {SCRAPED_FILE}...")
@@ -133,6 +76,5 @@ pct_with_img = (has_img.sum() / total) * 100
 print(f"\n[RESULT] {has_img.sum()}/{total} artikel ({pct_with_img:.1f}%) punya gambar")
 
 print("\n[NEXT STEPS]")
-print("1. python quick_corpus_clean.py")
-print("2. python quick_indexing.py")
-print("3. Restart backend API")
+print("1. python pipeline.py   # clean + indexing, tahap yang inputnya tidak berubah dilewati")
+print("2. Restart backend API")
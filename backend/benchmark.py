@@ -0,0 +1,426 @@
+"""
+Micro-benchmark untuk inti search engine:
+preprocess_query, tfidf_search, bm25_search dan _rank_to_results, plus
+handler serverless api/search.py (latency per request & cold start).
+Set `boolean` (query AND/NOT, +/-) dibandingkan dengan query bag-of-words
+dari kata yang sama lewat target bm25_bag_of_words.
+
+Setiap run me-replay query set yang tetap (20 query ground truth + campuran
+head/tail dari inverted index), lalu mencatat distribusi latency, alokasi
+memori (tracemalloc) dan peak memory proses. Hasil disimpan sebagai JSON di
+data/benchmarks/ supaya dua commit bisa dibandingkan otomatis.
+
+Contoh:
+    python benchmark.py
+    python benchmark.py --repeat 20 --label sebelum-refactor
+    python benchmark.py --queries data/query_log.txt --sets custom
+    python benchmark.py --compare data/benchmarks/a.json data/benchmarks/b.json
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parent
+BENCH_DIR = BASE_DIR / "data" / "benchmarks"
+SERVERLESS_PATH = BASE_DIR / "api" / "search.py"
+
+DEFAULT_SETS = ["ground_truth", "head", "tail", "mixed", "boolean"]
+PERCENTILES = [50, 90, 95, 99]
+
+
+# ========== UTIL ==========
+
+def _peak_rss_mb() -> float:
+    """Peak RSS proses ini (MB). ru_maxrss = KB di Linux, byte di macOS."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Percentile dengan interpolasi linear (sama seperti numpy default)."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def latency_stats(samples_ns: list) -> dict:
+    """Ringkas sampel latency (ns) jadi statistik dalam milidetik."""
+    values = sorted(s / 1e6 for s in samples_ns)
+    stats = {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else 0.0,
+        "stdev": statistics.pstdev(values) if len(values) > 1 else 0.0,
+        "min": values[0] if values else 0.0,
+        "max": values[-1] if values else 0.0,
+    }
+    for pct in PERCENTILES:
+        stats[f"p{pct}"] = _percentile(values, pct)
+    return stats
+
+
+# ========== QUERY SETS ==========
+
+def load_query_file(path: Path) -> list:
+    """Satu query per baris, baris kosong dan '#' diabaikan."""
+    with path.open("r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def build_query_sets(se, names: list, size: int, seed: int, query_file: Path = None) -> dict:
+    """
+    Bangun query set yang deterministik.
+
+    - ground_truth: 20 query dari generate_ground_truth.py
+    - head        : kombinasi term dengan df tertinggi (posting list panjang)
+    - tail        : term langka (df kecil)
+    - mixed       : 80% head + 20% tail, diacak dengan seed tetap
+    - boolean     : query restriktif dari term head ("a AND b NOT c", "+a +b -c")
+    - custom      : isi file --queries
+    """
+    from generate_ground_truth import test_queries
+
+    rng = random.Random(seed)
+    term_df = sorted(
+        ((se.TERMS.term(i), int(se.TERMS.df[i])) for i in range(len(se.TERMS))),
+        key=lambda x: (-x[1], x[0]),
+    )
+    head_terms = [t for t, _ in term_df[:200]]
+    tail_terms = [t for t, df in term_df if df <= 3] or [t for t, _ in term_df[-200:]]
+    tail_terms = sorted(tail_terms)
+
+    def _make_boolean(n):
+        queries = []
+        for _ in range(n):
+            a, b, c = rng.sample(head_terms, 3)
+            queries.append(rng.choice([f"{a} AND {b} NOT {c}", f"+{a} +{b} -{c}",
+                                       f"({a} OR {c}) AND {b}"]))
+        return queries
+
+    def _make(pool, n):
+        queries = []
+        for _ in range(n):
+            n_terms = rng.choice([1, 2, 2, 3])
+            queries.append(" ".join(rng.sample(pool, min(n_terms, len(pool)))))
+        return queries
+
+    sets = {}
+    for name in names:
+        if name == "ground_truth":
+            sets[name] = list(test_queries.keys())
+        elif name == "head":
+            sets[name] = _make(head_terms, size)
+        elif name == "tail":
+            sets[name] = _make(tail_terms, size)
+        elif name == "mixed":
+            n_head = int(size * 0.8)
+            mixed = _make(head_terms, n_head) + _make(tail_terms, size - n_head)
+            rng.shuffle(mixed)
+            sets[name] = mixed
+        elif name == "boolean":
+            sets[name] = _make_boolean(size)
+        elif name == "custom":
+            if query_file is None:
+                raise ValueError("Query set 'custom' butuh --queries <file>")
+            sets[name] = load_query_file(query_file)
+        else:
+            raise ValueError(f"Query set tidak dikenal: {name}")
+    return sets
+
+
+# ========== TARGET ==========
+
+def serverless_available(se) -> bool:
+    """api/search.py hanya bisa di-load kalau compact_index.npz sudah di-build."""
+    from compact_index import COMPACT_FILE
+    return (se.DATA_DIR / COMPACT_FILE).exists()
+
+
+def load_serverless():
+    """Import api/search.py (bukan package) sebagai modul."""
+    spec = importlib.util.spec_from_file_location("api_search", SERVERLESS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_COLD_START_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import benchmark
+api = benchmark.load_serverless()
+t1 = time.perf_counter()
+api.bm25_score(api.tokenize({query!r}))
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def serverless_cold_start(query: str, runs: int = 5) -> dict:
+    """
+    Cold start handler serverless di interpreter baru: import modul (load
+    index) + request pertama. Median dari `runs` proses.
+    """
+    imports, firsts = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SNIPPET.format(query=query)],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        import_s, first_s = map(float, out.stdout.split()[-2:])
+        imports.append(import_s)
+        firsts.append(first_s)
+    return {
+        "import_seconds": statistics.median(imports),
+        "first_request_seconds": statistics.median(firsts),
+        "runs": runs,
+    }
+
+
+def build_targets(se, top_k: int, serverless: bool = True) -> dict:
+    """
+    Fungsi yang di-benchmark. Masing-masing menerima argumen hasil `prepare`
+    sehingga _rank_to_results bisa diukur terpisah dari scoring.
+    Handler serverless hanya di-load kalau `serverless`.
+    """
+    from boolean_query import query_words
+
+    targets = {
+        "preprocess_query": (lambda q: q, se.preprocess_query),
+        "tfidf_search": (lambda q: q, lambda q: se.tfidf_search(q, top_k=top_k)),
+        "bm25_search": (lambda q: q, lambda q: se.bm25_search(q, top_k=top_k)),
+        # Kata yang sama tanpa operator (pembanding untuk set boolean)
+        "bm25_bag_of_words": (query_words, lambda q: se.bm25_search(q, top_k=top_k)),
+        "rank_to_results": (
+            lambda q: se.tfidf_scores(se.preprocess_query(q)),
+            lambda scores: se._rank_to_results(scores, top_k),
+        ),
+    }
+    if serverless:
+        api = load_serverless()
+        targets["serverless_search"] = (api.tokenize, lambda tokens: api.bm25_score(tokens, top_k))
+    return targets
+
+
+def run_target(prepare, func, queries: list, repeat: int, warmup: int) -> dict:
+    args = [prepare(q) for q in queries]
+
+    for _ in range(warmup):
+        for a in args:
+            func(a)
+
+    # Pass 1: latency murni (tanpa tracemalloc supaya tidak ada overhead)
+    samples = []
+    perf = time.perf_counter_ns
+    for _ in range(repeat):
+        for a in args:
+            t0 = perf()
+            func(a)
+            samples.append(perf() - t0)
+
+    # Pass 2: alokasi per panggilan
+    peak_bytes = []
+    net_bytes = []
+    net_blocks = []
+    tracemalloc.start()
+    for a in args:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        blocks_before = sys.getallocatedblocks()
+        result = func(a)
+        after, peak = tracemalloc.get_traced_memory()
+        net_blocks.append(sys.getallocatedblocks() - blocks_before)
+        peak_bytes.append(peak - before)
+        net_bytes.append(after - before)
+        del result
+    tracemalloc.stop()
+
+    return {
+        "latency_ms": latency_stats(samples),
+        "throughput_qps": (len(samples) / (sum(samples) / 1e9)) if samples else 0.0,
+        "alloc": {
+            "peak_bytes_mean": statistics.fmean(peak_bytes) if peak_bytes else 0,
+            "peak_bytes_max": max(peak_bytes, default=0),
+            "retained_bytes_mean": statistics.fmean(net_bytes) if net_bytes else 0,
+            "blocks_mean": statistics.fmean(net_blocks) if net_blocks else 0,
+        },
+    }
+
+
+# ========== RUN ==========
+
+def run_benchmark(args) -> dict:
+    rss_before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    import search_engine as se
+    load_seconds = time.perf_counter() - t0
+    rss_after_load = _peak_rss_mb()
+
+    query_file = Path(args.queries) if args.queries else None
+    sets = build_query_sets(se, args.sets, args.set_size, args.seed, query_file)
+
+    # Handler serverless (target + cold start) hanya kalau diminta & artifact-nya ada
+    serverless = not args.targets or "serverless_search" in args.targets
+    if serverless and not serverless_available(se):
+        print("[WARN] compact_index.npz belum ada (python compact_index.py), "
+              "target serverless & cold start dilewati")
+        serverless = False
+    targets = build_targets(se, args.top_k, serverless)
+
+    results = {}
+    for set_name, queries in sets.items():
+        results[set_name] = {"n_queries": len(queries), "targets": {}}
+        for target_name, (prepare, func) in targets.items():
+            if args.targets and target_name not in args.targets:
+                continue
+            print(f"[BENCH] {set_name:<12} {target_name:<18}", end=" ", flush=True)
+            res = run_target(prepare, func, queries, args.repeat, args.warmup)
+            results[set_name]["targets"][target_name] = res
+            lat = res["latency_ms"]
+            print(f"p50={lat['p50']:.3f}ms p95={lat['p95']:.3f}ms p99={lat['p99']:.3f}ms "
+                  f"peak={res['alloc']['peak_bytes_mean'] / 1024:.1f}KB")
+
+    cold_start = None
+    if serverless:
+        cold_start = serverless_cold_start(sets[next(iter(sets))][0])
+        print(f"[BENCH] serverless cold start: import {cold_start['import_seconds'] * 1000:.1f}ms, "
+              f"request pertama {cold_start['first_request_seconds'] * 1000:.2f}ms")
+
+    return {
+        "meta": {
+            "label": args.label,
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "top_k": args.top_k,
+            "seed": args.seed,
+            "n_docs": se.N,
+            "n_terms": len(se.TERMS),
+        },
+        "load": {
+            "seconds": load_seconds,
+            "rss_before_mb": rss_before,
+            "rss_after_load_mb": rss_after_load,
+            "serverless_cold_start": cold_start,
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+        "query_sets": sets,
+        "results": results,
+    }
+
+
+# ========== COMPARE ==========
+
+def compare(path_a: Path, path_b: Path, threshold: float, metric: str) -> int:
+    """
+    Bandingkan dua file hasil benchmark. Return jumlah regresi
+    (latency `metric` naik lebih dari `threshold`).
+    """
+    with path_a.open("r", encoding="utf-8") as f:
+        a = json.load(f)
+    with path_b.open("r", encoding="utf-8") as f:
+        b = json.load(f)
+
+    print(f"A: {path_a.name} (commit {a['meta']['commit']})")
+    print(f"B: {path_b.name} (commit {b['meta']['commit']})")
+    print(f"{'set':<12} {'target':<18} {metric + ' A':>10} {metric + ' B':>10} {'delta':>8}")
+    print("-" * 62)
+
+    regressions = 0
+    for set_name, set_res in b["results"].items():
+        for target, res_b in set_res["targets"].items():
+            res_a = a["results"].get(set_name, {}).get("targets", {}).get(target)
+            if res_a is None:
+                continue
+            va = res_a["latency_ms"][metric]
+            vb = res_b["latency_ms"][metric]
+            delta = (vb - va) / va if va else 0.0
+            flag = ""
+            if delta > threshold:
+                flag = "  REGRESI"
+                regressions += 1
+            print(f"{set_name:<12} {target:<18} {va:>10.3f} {vb:>10.3f} {delta:>+7.1%}{flag}")
+
+    print(f"\nPeak RSS: {a['peak_rss_mb']:.1f} MB -> {b['peak_rss_mb']:.1f} MB")
+    print(f"Load time: {a['load']['seconds']:.2f} s -> {b['load']['seconds']:.2f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark search engine core")
+    parser.add_argument("--sets", nargs="+", default=DEFAULT_SETS,
+                        help="Query set: ground_truth head tail mixed boolean custom")
+    parser.add_argument("--targets", nargs="+", default=None,
+                        help="Subset target (default semua)")
+    parser.add_argument("--queries", help="File query (1 per baris) untuk set 'custom'")
+    parser.add_argument("--set-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", help="Path JSON output (default data/benchmarks/...)")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"),
+                        help="Bandingkan dua file hasil benchmark")
+    parser.add_argument("--metric", default="p50", help="Metric latency untuk --compare")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Batas regresi relatif untuk --compare (default 0.10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(Path(args.compare[0]), Path(args.compare[1]),
+                              args.threshold, args.metric)
+        sys.exit(1 if regressions else 0)
+
+    report = run_benchmark(args)
+
+    if args.output:
+        out_path = Path(args.output)
+    else:
+        suffix = f"_{args.label}" if args.label else ""
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        out_path = BENCH_DIR / f"bench_{report['meta']['commit']}_{stamp}{suffix}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n[INFO] Load engine: {report['load']['seconds']:.2f} s, "
+          f"peak RSS: {report['peak_rss_mb']:.1f} MB")
+    print(f"[SUCCESS] Hasil benchmark disimpan ke: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
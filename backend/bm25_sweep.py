@@ -0,0 +1,262 @@
+"""
+Tuning parameter BM25 (k1, b) dengan grid sweep yang di-vectorize.
+
+Per query, postings term query + doc_len dokumen kandidat diambil SEKALI dari
+index. Setelah itu seluruh grid (k1 x b) dihitung sebagai operasi array:
+
+    norm[b, d]     = 1 - b + b * dl[d] / avgdl
+    score[k, b, d] = Σ_t idf[t] * tf[t, d] * (k1 + 1) / (tf[t, d] + k1 * norm[b, d])
+
+Ranking top_k per titik grid lalu dievaluasi sekaligus dengan
+evaluator.batch_metrics (MAP, nDCG, ...). Hasilnya heatmap + setting terbaik,
+dan opsional ditulis ke data/bm25_params.json yang dibaca search_engine.py
+sebagai default k1/b.
+
+Contoh:
+    python bm25_sweep.py
+    python bm25_sweep.py --k1 0.2:3.0:20 --b 0:1:20 --metric ndcg --write-config
+    python bm25_sweep.py --queries data/queries.txt --top-k 20
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+import search_engine as se
+from evaluator import DEFAULT_GROUND_TRUTH_PATH, SearchEvaluator, batch_metrics
+from run_evaluation import load_queries
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Batas elemen array skor per blok (k1 x b x dokumen) supaya memori terkendali
+MAX_BLOCK_ELEMENTS = 20_000_000
+
+
+def parse_range(spec: str) -> np.ndarray:
+    """'start:stop:num' -> np.linspace, atau daftar '0.5,1.2,2.0'."""
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(x) for x in spec.split(",") if x.strip()])
+
+
+# ========== PRECOMPUTE ==========
+
+def query_postings(query: str) -> tuple:
+    """
+    Ambil postings term query sekali.
+    Return (doc rows kandidat, matriks tf (T x D), idf bm25 (T,), doc_len (D,)).
+    """
+    tokens = se.preprocess_query(query)
+    parts = []
+    for term in tokens:
+        term_id = se.TERMS.lookup(term)
+        if term_id < 0:
+            continue
+        rows, tf = se.TERMS.postings(term_id)
+        if len(rows):
+            parts.append((term_id, rows, tf))
+
+    if not parts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, np.zeros((0, 0)), np.zeros(0), np.zeros(0)
+
+    cand = np.unique(np.concatenate([rows for _, rows, _ in parts]))
+    tf_matrix = np.zeros((len(parts), len(cand)), dtype=np.float64)
+    for t, (_, rows, tf) in enumerate(parts):
+        tf_matrix[t, np.searchsorted(cand, rows)] = tf
+    idf = np.array([se.TERMS.idf_bm25[term_id] for term_id, _, _ in parts])
+    dl = se.DOCS.doc_len[cand].astype(np.float64)
+    return cand, tf_matrix, idf, dl
+
+
+def grid_rankings(k1_values: np.ndarray, b_values: np.ndarray, postings: tuple,
+                  top_k: int) -> np.ndarray:
+    """Doc_id top_k untuk setiap (k1, b): array (len(k1), len(b), top_k), padding -1."""
+    cand, tf_matrix, idf, dl = postings
+    nk, nb = len(k1_values), len(b_values)
+    out = np.full((nk, nb, top_k), -1, dtype=np.int64)
+    n_docs = len(cand)
+    if n_docs == 0:
+        return out
+
+    norm = 1 - b_values[:, None] + b_values[:, None] * (dl[None, :] / se.AVGDL)   # (B, D)
+    doc_ids = se.DOCS.doc_ids[cand]
+    n_take = min(top_k, n_docs)
+
+    # Blok per k1 supaya tensor (k, b, t, d) tidak meledak untuk query head
+    per_k1 = nb * n_docs * max(len(idf), 1)
+    block = max(1, MAX_BLOCK_ELEMENTS // per_k1)
+    for start in range(0, nk, block):
+        k1 = k1_values[start:start + block][:, None, None, None]                 # (K,1,1,1)
+        tf = tf_matrix[None, None, :, :]                                          # (1,1,T,D)
+        denom = tf + k1 * norm[None, :, None, :]                                   # (K,B,T,D)
+        # tf=0 (term tidak ada di dokumen) tidak menyumbang; tanpa mask k1=0 -> 0/0 = NaN.
+        # Urutan operasi sama dengan ranking.bm25_contrib supaya skor (dan tie) identik bit per bit.
+        numer = idf[None, None, :, None] * (tf * (k1 + 1))                        # (K,1,T,D)
+        scores = np.divide(numer, denom, out=np.zeros(denom.shape), where=tf > 0).sum(axis=2)
+
+        # Urutan sama dengan engine: skor turun, tie -> doc row kecil dulu
+        # (cand sudah terurut naik, jadi argsort stabil atas -skor sudah cukup)
+        order = np.argsort(-scores, axis=-1, kind="stable")[..., :n_take]
+        out[start:start + block, :, :n_take] = doc_ids[order]
+    return out
+
+
+# ========== PARITY ==========
+
+# Titik grid yang dicek terhadap engine; k1=0 (tf tidak berpengaruh) kasus tepi
+PARITY_POINTS = [(0.0, 0.75), (1.2, 0.75), (1.5, 0.0), (3.0, 1.0)]
+
+
+def check_parity(queries: list, top_k: int) -> int:
+    """
+    Bandingkan ranking grid_rankings dengan se.bm25_scores di PARITY_POINTS.
+    Return jumlah ranking yang berbeda (0 = sweep identik dengan engine).
+    """
+    mismatches = 0
+    for query in queries:
+        postings = query_postings(query)
+        tokens = se.preprocess_query(query)
+        for k1, b in PARITY_POINTS:
+            grid = grid_rankings(np.array([k1]), np.array([b]), postings, top_k)[0, 0]
+            expected = se.rank_doc_ids(se.bm25_scores(tokens, k1=k1, b=b), top_k)
+            if grid[grid >= 0].tolist() != expected:
+                mismatches += 1
+                print(f"[WARN] Ranking beda dengan engine: {query!r} k1={k1} b={b}")
+    return mismatches
+
+
+# ========== SWEEP ==========
+
+def run_sweep(queries: list, relevant: list, k1_values: np.ndarray, b_values: np.ndarray,
+              top_k: int) -> dict:
+    nk, nb = len(k1_values), len(b_values)
+    retrieved = np.full((nk, nb, len(queries), top_k), -1, dtype=np.int64)
+    for qi, query in enumerate(queries):
+        retrieved[:, :, qi, :] = grid_rankings(k1_values, b_values, query_postings(query), top_k)
+
+    # Semua titik grid x query dievaluasi dalam satu panggilan
+    flat = retrieved.reshape(nk * nb * len(queries), top_k)
+    metrics = batch_metrics(flat, relevant * (nk * nb))
+    grid = {
+        name: metrics[name].reshape(nk, nb, len(queries)).mean(axis=2)
+        for name in ("ap", "ndcg", "precision", "recall", "rr")
+    }
+    return grid
+
+
+def plot_heatmap(grid: np.ndarray, k1_values, b_values, metric: str, best: tuple, out_path: Path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[WARN] matplotlib tidak terpasang, heatmap dilewati")
+        return
+
+    fig, ax = plt.subplots(figsize=(9, 7))
+    im = ax.imshow(grid, origin="lower", aspect="auto", cmap="viridis",
+                   extent=[b_values[0], b_values[-1], k1_values[0], k1_values[-1]])
+    ax.plot(best[1], best[0], "r*", markersize=14)
+    ax.set_xlabel("b")
+    ax.set_ylabel("k1")
+    ax.set_title(f"BM25 {metric} (terbaik k1={best[0]:.2f}, b={best[1]:.2f})")
+    fig.colorbar(im, ax=ax, label=metric)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=120)
+    print(f"[INFO] Heatmap disimpan ke: {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid sweep k1/b BM25 (vectorized)")
+    parser.add_argument("--queries", help="File query (.txt / .json). Default: query ground truth")
+    parser.add_argument("--ground-truth", default=str(BASE_DIR / DEFAULT_GROUND_TRUTH_PATH))
+    parser.add_argument("--k1", default="0.2:3.0:20", help="start:stop:num atau daftar koma")
+    parser.add_argument("--b", default="0.0:1.0:20", help="start:stop:num atau daftar koma")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--metric", choices=["map", "ndcg"], default="map",
+                        help="Metrik untuk memilih setting terbaik")
+    parser.add_argument("--output-dir", default=str(se.DATA_DIR))
+    parser.add_argument("--write-config", action="store_true",
+                        help="Tulis setting terbaik ke data/bm25_params.json (default engine)")
+    args = parser.parse_args()
+
+    ground_truth = {}
+    gt_path = Path(args.ground_truth)
+    if gt_path.exists():
+        with gt_path.open("r", encoding="utf-8") as f:
+            ground_truth = {q: set(v) for q, v in json.load(f).items()}
+    if args.queries:
+        queries, _, gt_from_queries = load_queries(Path(args.queries))
+        ground_truth.update(gt_from_queries)
+    else:
+        queries = list(ground_truth)
+    if not queries:
+        raise SystemExit("[ERROR] Tidak ada query. Pakai --queries atau buat ground_truth.json dulu.")
+
+    evaluator = SearchEvaluator(ground_truth_path="", engine=se)
+    relevant = [ground_truth.get(q) or evaluator.get_relevant(q) for q in queries]
+
+    mismatches = check_parity(queries, args.top_k)
+    if mismatches:
+        print(f"[WARN] {mismatches} ranking sweep tidak sama dengan se.bm25_search, "
+              f"--write-config dinonaktifkan")
+        args.write_config = False
+
+    k1_values = parse_range(args.k1)
+    b_values = parse_range(args.b)
+    print(f"[INFO] {len(queries)} query x grid {len(k1_values)}x{len(b_values)} "
+          f"= {len(queries) * len(k1_values) * len(b_values):,} evaluasi")
+
+    start = time.time()
+    grid = run_sweep(queries, relevant, k1_values, b_values, args.top_k)
+    elapsed = time.time() - start
+
+    key = "ap" if args.metric == "map" else "ndcg"
+    best_k, best_b = np.unravel_index(np.argmax(grid[key]), grid[key].shape)
+    best = {
+        "k1": float(k1_values[best_k]),
+        "b": float(b_values[best_b]),
+        "metric": args.metric,
+        "MAP": float(grid["ap"][best_k, best_b]),
+        "nDCG": float(grid["ndcg"][best_k, best_b]),
+        "num_queries": len(queries),
+        "top_k": args.top_k,
+    }
+
+    # Baseline: setting engine saat ini
+    current = run_sweep(queries, relevant, np.array([se.BM25_K1]), np.array([se.BM25_B]), args.top_k)
+
+    print(f"\n[RESULT] Sweep selesai dalam {elapsed:.2f} detik")
+    print(f"   Saat ini  k1={se.BM25_K1:.2f} b={se.BM25_B:.2f}: "
+          f"MAP={current['ap'][0, 0]:.4f} nDCG={current['ndcg'][0, 0]:.4f}")
+    print(f"   Terbaik   k1={best['k1']:.2f} b={best['b']:.2f}: "
+          f"MAP={best['MAP']:.4f} nDCG={best['nDCG']:.4f}")
+
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with (out_dir / "bm25_sweep.json").open("w", encoding="utf-8") as f:
+        json.dump({
+            "k1": k1_values.tolist(),
+            "b": b_values.tolist(),
+            "MAP": grid["ap"].tolist(),
+            "nDCG": grid["ndcg"].tolist(),
+            "MRR": grid["rr"].tolist(),
+            "best": best,
+            "seconds": elapsed,
+        }, f, indent=2)
+    plot_heatmap(grid[key], k1_values, b_values, args.metric,
+                 (best["k1"], best["b"]), out_dir / "bm25_sweep_heatmap.png")
+
+    if args.write_config:
+        with se.BM25_PARAMS_PATH.open("w", encoding="utf-8") as f:
+            json.dump(best, f, indent=2)
+        print(f"[SUCCESS] Default BM25 ditulis ke: {se.BM25_PARAMS_PATH} (restart API)")
+    print(f"[SUCCESS] Hasil sweep disimpan ke: {out_dir / 'bm25_sweep.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Query boolean untuk search_engine.py: AND / OR / NOT, +wajib / -dilarang, kurung.
+
+Contoh:
+    pantai AND lombok NOT bali
+    +pantai +lombok -bali snorkeling
+    (pantai OR danau) AND (lombok OR sumbawa)
+
+Precedence (kuat -> lemah):
+    clause  : kata, (grup), dengan prefix opsional + / - / NOT
+    urutan  : clause berjejer tanpa operator. Clause biasa = OR (sama
+              dengan query bag-of-words), +clause wajib ada, -clause
+              dilarang. Kalau ada clause wajib, clause biasa hanya
+              menambah skor, tidak menyaring.
+    AND/NOT : `a AND b` = keduanya wajib, `a NOT b` = a tanpa b
+    OR      : `a OR b`
+Operator harus huruf besar ("and" kecil tetap dianggap kata). Parser
+toleran: kurung yang tidak ditutup ditutup di akhir, kurung tutup / operator
+nyasar diabaikan, jadi setiap input menghasilkan query (paling buruk kosong).
+
+Eksekusi atas postings CSR (doc row terurut, compact_index.TermDictionary):
+- AND mulai dari anak dengan estimasi hasil terkecil (df untuk term), lalu
+  kandidat itu disaring ke anak berikutnya. Penyaringan = binary search
+  semua kandidat sekaligus ke postings yang lebih panjang (np.searchsorted),
+  setelah postings dipotong ke rentang [kandidat pertama, terakhir] (skip
+  seperti skip pointer). Biaya O(|kandidat| log |postings|), postings
+  panjang tidak pernah disentuh penuh.
+- NOT tidak pernah mematerialisasi postings term yang dilarang: kandidat
+  dicek satu per satu dengan cara yang sama.
+- OR = union terurut anak-anaknya (sama seperti bag-of-words).
+Skor dihitung hanya untuk dokumen yang lolos (lihat search_engine.boolean_scores).
+"""
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+OPERATORS = ("AND", "OR", "NOT")
+
+_TOKEN_RE = re.compile(r"[()]|[^\s()]+")
+_BOOLEAN_RE = re.compile(r"\b(?:AND|OR|NOT)\b|[()]|(?:^|\s)[+-]\w")
+
+
+def is_boolean_query(text: str) -> bool:
+    """True kalau query memakai operator, kurung, atau prefix +/-."""
+    return bool(_BOOLEAN_RE.search(text))
+
+
+# ========== EXECUTION TREE ==========
+
+_EMPTY_ROWS = np.zeros(0, dtype=np.int64)
+
+
+def _contains(sorted_rows: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Mask: kandidat (terurut) mana yang ada di sorted_rows."""
+    if len(candidates) == 0 or len(sorted_rows) == 0:
+        return np.zeros(len(candidates), dtype=bool)
+    # Potong ke rentang kandidat dulu, baru binary search per kandidat
+    lo = int(np.searchsorted(sorted_rows, candidates[0]))
+    hi = int(np.searchsorted(sorted_rows, candidates[-1], side="right"))
+    window = sorted_rows[lo:hi]
+    if len(window) == 0:
+        return np.zeros(len(candidates), dtype=bool)
+    pos = np.searchsorted(window, candidates)
+    np.minimum(pos, len(window) - 1, out=pos)
+    return window[pos] == candidates
+
+
+class Node(ABC):
+    @abstractmethod
+    def estimate(self, terms) -> int:
+        """Batas atas jumlah dokumen yang cocok (untuk urutan eksekusi)."""
+
+    @abstractmethod
+    def rows(self, terms) -> np.ndarray:
+        """Doc rows terurut yang cocok."""
+
+    @abstractmethod
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        """Mask kandidat yang cocok (kandidat terurut)."""
+
+
+@dataclass
+class Term(Node):
+    token: str
+    term_id: int = -1
+
+    def estimate(self, terms) -> int:
+        return int(terms.df[self.term_id]) if self.term_id >= 0 else 0
+
+    def rows(self, terms) -> np.ndarray:
+        if self.term_id < 0:
+            return _EMPTY_ROWS
+        return terms.postings(self.term_id)[0]
+
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        return _contains(self.rows(terms), candidates)
+
+
+@dataclass
+class And(Node):
+    children: List[Node]
+
+    def estimate(self, terms) -> int:
+        return min(child.estimate(terms) for child in self.children)
+
+    def rows(self, terms) -> np.ndarray:
+        # Mulai dari anak paling selektif, sisanya hanya menyaring kandidat
+        ordered = sorted(self.children, key=lambda c: c.estimate(terms))
+        candidates = ordered[0].rows(terms)
+        for child in ordered[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = candidates[child.mask(terms, candidates)]
+        return candidates
+
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        keep = np.ones(len(candidates), dtype=bool)
+        for child in sorted(self.children, key=lambda c: c.estimate(terms)):
+            idx = np.flatnonzero(keep)
+            if len(idx) == 0:
+                break
+            keep[idx] = child.mask(terms, candidates[idx])
+        return keep
+
+
+@dataclass
+class Or(Node):
+    children: List[Node]
+
+    def estimate(self, terms) -> int:
+        return sum(child.estimate(terms) for child in self.children)
+
+    def rows(self, terms) -> np.ndarray:
+        parts = [child.rows(terms) for child in self.children]
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return _EMPTY_ROWS
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts))
+
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        keep = np.zeros(len(candidates), dtype=bool)
+        for child in self.children:
+            idx = np.flatnonzero(~keep)
+            if len(idx) == 0:
+                break
+            keep[idx] = child.mask(terms, candidates[idx])
+        return keep
+
+
+@dataclass
+class Exclude(Node):
+    """`include` tanpa dokumen yang cocok dengan `exclude`."""
+    include: Node
+    exclude: Node
+
+    def estimate(self, terms) -> int:
+        return self.include.estimate(terms)
+
+    def rows(self, terms) -> np.ndarray:
+        candidates = self.include.rows(terms)
+        return candidates[~self.exclude.mask(terms, candidates)]
+
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        keep = self.include.mask(terms, candidates)
+        idx = np.flatnonzero(keep)
+        keep[idx] = ~self.exclude.mask(terms, candidates[idx])
+        return keep
+
+
+@dataclass
+class Nothing(Node):
+    """Query tanpa clause positif (mis. hanya -kata)."""
+
+    def estimate(self, terms) -> int:
+        return 0
+
+    def rows(self, terms) -> np.ndarray:
+        return _EMPTY_ROWS
+
+    def mask(self, terms, candidates: np.ndarray) -> np.ndarray:
+        return np.zeros(len(candidates), dtype=bool)
+
+
+# ========== PARSER ==========
+
+@dataclass
+class _Group:
+    """
+    Hasil parse satu bagian: node positif (None kalau tidak ada), node yang
+    dilarang, dan term yang ikut menyumbang skor.
+    """
+    node: Optional[Node] = None
+    excluded: List[Node] = field(default_factory=list)
+    scoring: List[Term] = field(default_factory=list)
+
+    def finalize(self) -> Optional[Node]:
+        if self.node is None or not self.excluded:
+            return self.node
+        return Exclude(self.node, _any_of(self.excluded))
+
+
+def _all_of(nodes: List[Node]) -> Node:
+    return nodes[0] if len(nodes) == 1 else And(nodes)
+
+
+def _any_of(nodes: List[Node]) -> Node:
+    return nodes[0] if len(nodes) == 1 else Or(nodes)
+
+
+class _Parser:
+    def __init__(self, text: str, normalize: Callable[[str], List[str]], terms):
+        self.tokens = _TOKEN_RE.findall(text)
+        self.pos = 0
+        self.normalize = normalize
+        self.terms = terms
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self) -> _Group:
+        groups = [self.or_expr()]
+        while self.peek() is not None:
+            # ")" nyasar: lewati, sisanya digabung sebagai OR
+            self.take()
+            groups.append(self.or_expr())
+        return self.union(groups)
+
+    def union(self, groups: List[_Group]) -> _Group:
+        if len(groups) == 1:
+            return groups[0]
+        nodes = [n for n in (g.finalize() for g in groups) if n is not None]
+        return _Group(_any_of(nodes) if nodes else None,
+                      scoring=[t for g in groups for t in g.scoring])
+
+    def or_expr(self) -> _Group:
+        groups = [self.and_expr()]
+        while self.peek() == "OR":
+            self.take()
+            groups.append(self.and_expr())
+        return self.union(groups)
+
+    def and_expr(self) -> _Group:
+        group = self.sequence()
+        required = [group.node] if group.node is not None else []
+        excluded = list(group.excluded)
+        scoring = list(group.scoring)
+        while self.peek() in ("AND", "NOT"):
+            op = self.take()
+            nxt = self.sequence()
+            if op == "AND":
+                if nxt.node is not None:
+                    required.append(nxt.node)
+                excluded += nxt.excluded
+                scoring += nxt.scoring
+            elif nxt.finalize() is not None:
+                excluded.append(nxt.finalize())
+        return _Group(_all_of(required) if required else None, excluded, scoring)
+
+    def sequence(self) -> _Group:
+        must, should, must_not, scoring = [], [], [], []
+        while True:
+            token = self.peek()
+            if token is None or token in (")", "AND", "OR"):
+                break
+            if token == "NOT" and (must or should or must_not):
+                break                       # NOT biner, ditangani and_expr
+            occur = "should"
+            if token in ("NOT", "+", "-"):
+                self.take()
+                occur = "must" if token == "+" else "must_not"
+            elif token[0] in "+-":
+                occur = "must" if token[0] == "+" else "must_not"
+                self.tokens[self.pos] = token[1:]
+            clause = self.clause()
+            if clause is None:
+                continue
+            {"must": must, "should": should, "must_not": must_not}[occur].append(clause.node)
+            if occur != "must_not":
+                scoring += clause.scoring
+
+        # Ada clause wajib -> clause biasa hanya untuk skor
+        node = _all_of(must) if must else (_any_of(should) if should else None)
+        return _Group(node, must_not, scoring)
+
+    def clause(self) -> Optional[_Group]:
+        token = self.peek()
+        if token is None or token in (")", "AND", "OR", "NOT"):
+            return None
+        self.take()
+        if token == "(":
+            group = self.or_expr()
+            if self.peek() == ")":
+                self.take()
+            node = group.finalize()
+            return _Group(node, scoring=group.scoring) if node is not None else None
+        # Kata yang dipecah preprocessing ("raja-ampat") = semua bagiannya
+        words = [Term(w, self.terms.lookup(w)) for w in self.normalize(token)]
+        if not words:
+            return None
+        return _Group(_all_of(words), scoring=words)
+
+
+def parse_query(text: str, normalize: Callable[[str], List[str]], terms) -> Tuple[Node, List[Term]]:
+    """
+    Parse query boolean jadi (execution tree, term yang menyumbang skor).
+    `normalize` = preprocessing kata yang sama dengan query biasa, `terms` =
+    TermDictionary untuk lookup term_id.
+    """
+    group = _Parser(text, normalize, terms).parse()
+    node = group.finalize()
+    seen, scoring = set(), []
+    for term in group.scoring:
+        if term.term_id >= 0 and term.term_id not in seen:
+            seen.add(term.term_id)
+            scoring.append(term)
+    return (node if node is not None else Nothing()), scoring
+
+
+def query_words(text: str) -> str:
+    """Query tanpa operator/prefix (versi bag-of-words-nya, untuk benchmark)."""
+    words = []
+    for token in _TOKEN_RE.findall(text):
+        if token in OPERATORS or token in ("(", ")", "+", "-"):
+            continue
+        words.append(token.lstrip("+-"))
+    return " ".join(words)
@@ -0,0 +1,155 @@
+"""
+Daftar URL yang berubah dari recrawl kondisional (scrape_articles.py --recrawl)
++ helper untuk tahap cleaning/indexing yang hanya memproses ulang baris itu.
+
+Recrawl menimpa baris scraped.csv di tempat (urutan baris = doc_id tetap), jadi
+baris ke-i output lama masih milik URL yang sama. Baris yang perlu diproses
+ulang = URL di changed_urls.txt + baris baru di akhir (scrape URL baru).
+
+changed_urls.txt hanya di-append: dua recrawl sebelum tahap --changed jalan
+tetap tercatat semua. Setiap tahap (CONSUMERS) menyimpan sampai baris ke
+berapa log sudah ia proses di changed_urls.consumed.json; log baru
+dikosongkan setelah semua tahap memproses semuanya. pipeline.py menjalankan
+corpus_clean & corpus_clean_v2 paralel, jadi baca-ubah-tulis log/state
+dikunci (flock) supaya posisi satu tahap tidak tertimpa tahap lain.
+"""
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CHANGED_LOG = Path(__file__).resolve().parent / "data" / "changed_urls.txt"
+# Tahap yang membaca log (quick_corpus_clean, clean_corpus_v2, quick_indexing)
+CONSUMERS = ("corpus_clean", "corpus_clean_v2", "index")
+# Input index = corpus_clean.csv: perubahan baru ada di sana setelah
+# corpus_clean memprosesnya, jadi index tidak boleh mendahuluinya
+UPSTREAM = {"index": "corpus_clean"}
+
+
+def _state_path(path: Path) -> Path:
+    return Path(path).with_name(Path(path).stem + ".consumed.json")
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """
+    Kunci eksklusif untuk log + state-nya. File kunci terpisah karena state
+    ditulis ulang lewat os.replace (inode berganti).
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = Path(path).with_name(Path(path).name + ".lock")
+    with lock_path.open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_log(path: Path) -> List[str]:
+    with Path(path).open(encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _read_state(path: Path) -> Dict[str, int]:
+    state_path = _state_path(path)
+    if not state_path.exists():
+        return {}
+    with state_path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(path: Path, state: Dict[str, int]) -> None:
+    state_path = _state_path(path)
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, state_path)
+
+
+def append_changed_urls(urls: Iterable[str], path: Path = CHANGED_LOG) -> None:
+    """Tambahkan URL ke log (file tetap dibuat walau kosong: tanda recrawl pernah jalan)."""
+    with _locked(path), Path(path).open("a", encoding="utf-8") as f:
+        f.writelines(f"{url}\n" for url in urls)
+
+
+def pending_changes(consumer: str, path: Path = CHANGED_LOG) -> Optional[Tuple[Set[str], int]]:
+    """
+    (URL yang belum diproses `consumer`, posisi akhir log) atau None kalau
+    belum pernah ada recrawl (berarti harus rebuild penuh). Posisi diteruskan
+    ke mark_consumed() setelah output tahap tersimpan.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with _locked(path):
+        lines = _read_log(path)
+        state = _read_state(path)
+    offset = state.get(consumer, 0)
+    end = len(lines)
+    if consumer in UPSTREAM:
+        end = min(end, state.get(UPSTREAM[consumer], 0))
+    if offset > end:
+        offset = 0              # log diganti di luar helper ini: proses ulang semua
+    return set(lines[offset:end]), end
+
+
+def mark_consumed(consumer: str, offset: int, path: Path = CHANGED_LOG) -> None:
+    """
+    Catat `consumer` sudah memproses log sampai `offset` (dari
+    pending_changes). Kalau semua CONSUMERS sudah sampai akhir log, log
+    dikosongkan dan posisi direset.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with _locked(path):
+        state = _read_state(path)
+        state[consumer] = offset
+        n_lines = len(_read_log(path))
+        if all(state.get(c, 0) >= n_lines for c in CONSUMERS):
+            path.write_text("", encoding="utf-8")
+            state = {c: 0 for c in CONSUMERS}
+        _write_state(path, state)
+
+
+def rows_to_rebuild(new_urls: Sequence[str], old_urls: Sequence[str],
+                    changed: Set[str]) -> Optional[List[int]]:
+    """
+    Posisi baris input yang harus diproses ulang, atau None kalau output lama
+    tidak sejajar dengan input (baris dihapus / diurutkan ulang -> rebuild penuh).
+    """
+    new_urls = [str(u) for u in new_urls]
+    old_urls = [str(u) for u in old_urls]
+    n_old = len(old_urls)
+    if len(new_urls) < n_old or new_urls[:n_old] != old_urls:
+        return None
+    rows = [i for i, url in enumerate(new_urls[:n_old]) if url in changed]
+    return rows + list(range(n_old, len(new_urls)))
+
+
+def merge_rows(old: pd.DataFrame, updated: pd.DataFrame) -> pd.DataFrame:
+    """
+    Timpa baris `old` dengan `updated` (index = posisi baris); index di luar
+    `old` ditambahkan di akhir. Kolom jadi object selama penggabungan supaya
+    string baru bisa masuk ke kolom yang di CSV lama kosong semua (float NaN),
+    lalu tipe disimpulkan ulang: kolom numerik (doc_id, doc_len,
+    word_count_clean) kembali int64/float64 seperti hasil rebuild penuh.
+    """
+    merged = old.astype(object)
+    in_place = updated[updated.index < len(old)]
+    merged.loc[in_place.index, in_place.columns] = in_place
+    merged = pd.concat([merged, updated[updated.index >= len(old)].astype(object)])
+    return merged.infer_objects()
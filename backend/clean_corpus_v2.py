@@ -1,85 +1,31 @@
-import re
+import argparse
 from pathlib import Path
 
 import pandas as pd
 
+from artifacts import exists, read_table, write_table
+from changed_docs import mark_consumed, merge_rows, pending_changes, rows_to_rebuild
+from near_dedup import dedup_frame
+from text_cleaning import clean_parallel, clean_text
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 
 
-def clean_text(raw) -> str:
-    """
-    Bersihin teks artikel dari scraped.csv jadi content_final.
-
-    Fokus:
-    - Hapus baris iklan / membership / download app (kalau ada)
-    - Hapus 'Baca juga:' dan link terkait
-    - Rapihin double quotes ""contoh"" -> "contoh"
-    - Hilangkan bullet 'O ' di awal baris
-    - Perbaiki kata nempel karena tag <a> hilang (wilayahPurworejo -> wilayah Purworejo)
-    - Rapihin newline & spasi
-    """
-    if pd.isna(raw):
-        raw = ""
-    text = str(raw)
-
-    # Normalisasi newline
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-
-    clean_lines: list[str] = []
-
-    for line in text.split("\n"):
-        original = line
-        line = line.strip()
-        if not line:
-            continue
-
-        lower = line.lower()
-
-        # Buang keterangan membership / aplikasi kalau nyangkut di konten
-        if lower.startswith("membership:"):
-            continue
-        if lower.startswith("download aplikasi:"):
-            continue
-
-        # Buang baris yang berisi 'baca juga: ...'
-        if "baca juga:" in lower:
-            continue
-
-        # Hapus bullet 'O ' di awal baris (hasil copy symbol list)
-        line = re.sub(r"^O\s+", "", line)
-
-        # Rapihin double double-quote -> single
-        # ""teks"" -> "teks"
-        line = re.sub(r'""([^"]+?)""', r'"\1"', line)
-
-        # Rapihin spasi berlebihan
-        line = re.sub(r"\s+", " ", line)
-
-        # Perbaiki kata nempel karena <a> ketemu <p> (ex: wilayahPurworejo)
-        line = re.sub(r"([a-z])([A-Z])", r"\1 \2", line)
-
-        clean_lines.append(line)
-
-    # Gabung lagi, pisah paragraf pakai newline
-    text = "\n".join(clean_lines)
-
-    # Rapihin newline ganda di akhir proses
-    text = re.sub(r"\n\s*\n\s*\n+", "\n\n", text).strip()
-    return text
-
-
-def main():
+def main(changed_only: bool = False, dedup: bool = True, workers: int = None):
     src_path = DATA_DIR / "scraped.csv"
     if not src_path.exists():
         raise FileNotFoundError(f"scraped.csv tidak ditemukan di: {src_path}")
 
-    df = pd.read_csv(src_path)
+    # Kolom lain (domain, word_count, timestamp) tidak dipakai
+    df = pd.read_csv(src_path, usecols=lambda c: c in {"url", "title", "image_url", "content"})
 
     if "url" not in df.columns or "content" not in df.columns:
         raise ValueError("scraped.csv harus punya kolom 'url' dan 'content'")
 
-    df["content_final"] = df["content"].apply(clean_text)
+    # Near-duplicate dibuang sebelum cleaning (sama dengan quick_corpus_clean.py)
+    if dedup:
+        df, _ = dedup_frame(df)
 
     output_cols = []
     for col in ["url", "title", "image_url"]:
@@ -87,13 +33,42 @@ def main():
             output_cols.append(col)
     output_cols.append("content_final")
 
-    out_df = df[output_cols].copy()
-
     out_path = DATA_DIR / "corpus_clean_v2.csv"
-    out_df.to_csv(out_path, index=False, encoding="utf-8")
 
-    print(f"[OK] Saved cleaned corpus to {out_path} (rows: {len(out_df)})")
+    # --changed: baris lain diambil dari corpus_clean_v2.csv lama tanpa dibersihkan ulang
+    rows = None
+    pending = pending_changes("corpus_clean_v2")
+    changed = pending[0] if changed_only and pending is not None else None
+    if changed is not None and exists(out_path):
+        old_df = read_table(out_path, columns=output_cols)
+        rows = rows_to_rebuild(df["url"], old_df["url"], changed)
+        if rows is None:
+            print("[WARN] corpus_clean_v2.csv lama tidak sejajar dengan scraped.csv, rebuild penuh")
+
+    if rows is None:
+        df["content_final"] = clean_parallel(clean_text, df["content"], workers)
+        out_df = df[output_cols].copy()
+    else:
+        part = df.iloc[rows].copy()
+        part["content_final"] = clean_parallel(clean_text, part["content"], workers)
+        out_df = merge_rows(old_df, part[output_cols])
+        print(f"[INFO] Inkremental: {len(rows)}/{len(df)} baris dibersihkan ulang")
+
+    # corpus_clean_v2.parquet kalau pyarrow ada (lihat artifacts.py)
+    saved = write_table(out_df, out_path, encoding="utf-8")
+    if pending is not None:
+        mark_consumed("corpus_clean_v2", pending[1])
+
+    print(f"[OK] Saved cleaned corpus to {saved} (rows: {len(out_df)})")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="scraped.csv -> corpus_clean_v2.csv")
+    parser.add_argument("--changed", action="store_true",
+                        help="Hanya bersihkan ulang URL di data/changed_urls.txt (hasil recrawl)")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Jangan buang near-duplicate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah proses cleaning (default: semua core)")
+    args = parser.parse_args()
+    main(changed_only=args.changed, dedup=not args.no_dedup, workers=args.workers)
@@ -0,0 +1,465 @@
+"""
+Representasi index & metadata dokumen yang hemat memori untuk search_engine.py.
+
+Daripada dict-of-dicts (setiap angka jadi objek int Python) dan DataFrame yang
+disimpan terus, semua data disimpan sebagai array NumPy + buffer string:
+
+- StringPool     : banyak string dalam satu buffer UTF-8 + array offset
+- TermDictionary : term diurutkan (StringPool) -> term_id lewat binary search,
+                   df/idf sebagai array paralel, postings format CSR
+                   (post_offsets, post_rows, post_tf) dengan doc row terurut
+- DocStore       : metadata dokumen struct-of-arrays (doc_ids, doc_len) +
+                   title/url/image_url dalam satu StringPool, konten dalam
+                   StringPool terpisah
+
+"row" = posisi dokumen di DocStore (0..N-1), "doc_id" = id asli dari doc_meta.csv.
+
+Hasil build disimpan sebagai satu artifact data/compact_index.npz (python
+compact_index.py, tahap "compact" di pipeline.py). search_engine.py dan
+handler serverless api/search.py memuatnya langsung tanpa parse JSON/CSV;
+modul ini hanya butuh NumPy saat load (pandas baru di-import saat build).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+COMPACT_FILE = "compact_index.npz"
+# File sumber artifact; artifact lebih lama dari salah satunya dianggap basi
+SOURCE_FILES = ("doc_meta.csv", "corpus_clean_v2.csv", "inverted_index.json")
+
+
+def min_uint_dtype(max_value: int) -> np.dtype:
+    """dtype unsigned terkecil yang muat `max_value` (row/tf jarang > 65535)."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+# ========== STRING POOL ==========
+
+class StringPool:
+    """Daftar string immutable dalam satu buffer UTF-8."""
+
+    def __init__(self, buffer: bytes, offsets: np.ndarray):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringPool":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+    def prefix(self, i: int, max_chars: int) -> str:
+        """
+        `self[i][:max_chars]` tanpa decode string penuh.
+        Satu karakter UTF-8 maksimal 4 byte, jadi cukup decode 4*max_chars byte;
+        karakter terpotong di ujung dibuang dengan errors="ignore".
+        """
+        start = int(self.offsets[i])
+        end = min(int(self.offsets[i + 1]), start + 4 * max_chars)
+        return self.buffer[start:end].decode("utf-8", errors="ignore")[:max_chars]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes
+
+
+# ========== TERM DICTIONARY ==========
+
+class TermDictionary:
+    """Term terurut + df/idf + postings CSR."""
+
+    def __init__(self, terms: StringPool, df: np.ndarray, idf_tfidf: np.ndarray,
+                 idf_bm25: np.ndarray, post_offsets: np.ndarray,
+                 post_rows: np.ndarray, post_tf: np.ndarray):
+        self.terms = terms
+        self.df = df
+        self.idf_tfidf = idf_tfidf
+        self.idf_bm25 = idf_bm25
+        self.post_offsets = post_offsets
+        self.post_rows = post_rows
+        self.post_tf = post_tf
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, term: str) -> int:
+        """Binary search term di pool; return term_id atau -1."""
+        key = term.encode("utf-8")
+        buf = self.terms.buffer
+        off = self.terms.offsets
+        lo, hi = 0, len(self.terms)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = buf[off[mid]:off[mid + 1]]
+            if cur < key:
+                lo = mid + 1
+            elif cur > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc rows terurut, tf) untuk term_id."""
+        start = self.post_offsets[term_id]
+        end = self.post_offsets[term_id + 1]
+        return self.post_rows[start:end], self.post_tf[start:end]
+
+    def term(self, term_id: int) -> str:
+        return self.terms[term_id]
+
+    def memory_breakdown(self) -> Dict[str, int]:
+        return {
+            "term_pool": self.terms.nbytes,
+            "df": self.df.nbytes,
+            "idf_tfidf": self.idf_tfidf.nbytes,
+            "idf_bm25": self.idf_bm25.nbytes,
+            "postings": self.post_offsets.nbytes + self.post_rows.nbytes + self.post_tf.nbytes,
+        }
+
+
+# ========== DOC STORE ==========
+
+# Urutan field per dokumen di DocStore.meta
+TITLE, URL, IMAGE_URL = 0, 1, 2
+META_FIELDS = 3
+
+
+class DocStore:
+    """Metadata dokumen struct-of-arrays."""
+
+    def __init__(self, doc_ids: np.ndarray, doc_len: np.ndarray,
+                 meta: StringPool, contents: StringPool):
+        self.doc_ids = doc_ids      # terurut naik, posisi = row
+        self.doc_len = doc_len
+        self.meta = meta            # title/url/image_url, 3 entri per row
+        self.contents = contents    # content_final per row
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def row_of(self, doc_id: int) -> int:
+        row = int(np.searchsorted(self.doc_ids, doc_id))
+        if row < len(self.doc_ids) and self.doc_ids[row] == doc_id:
+            return row
+        return -1
+
+    def title(self, row: int) -> str:
+        return self.meta[row * META_FIELDS + TITLE]
+
+    def url(self, row: int) -> str:
+        return self.meta[row * META_FIELDS + URL]
+
+    def image_url(self, row: int) -> str:
+        return self.meta[row * META_FIELDS + IMAGE_URL]
+
+    def content(self, row: int) -> str:
+        return self.contents[row]
+
+    def snippet(self, row: int, max_chars: int) -> str:
+        return self.contents.prefix(row, max_chars)
+
+    def memory_breakdown(self) -> Dict[str, int]:
+        return {
+            "doc_ids": self.doc_ids.nbytes,
+            "doc_len": self.doc_len.nbytes,
+            "doc_meta_strings": self.meta.nbytes,
+            "doc_contents": self.contents.nbytes,
+        }
+
+
+# ========== BUILD DARI FILE PIPELINE ==========
+
+def _str_or_empty(value) -> str:
+    import pandas as pd
+    return "" if pd.isna(value) else str(value)
+
+
+def _parse_postings(postings) -> Dict[int, int]:
+    """Normalisasi postings dari berbagai format JSON ke {doc_id: tf}."""
+    doc_tf: Dict[int, int] = {}
+
+    if isinstance(postings, dict):  # direct {doc: tf}
+        for doc_id, tf in postings.items():
+            doc_tf[int(doc_id)] = int(tf)
+
+    elif isinstance(postings, list):  # list postings
+        for item in postings:
+            doc_id = None
+            tf = 1
+
+            if isinstance(item, (list, tuple)) and len(item) >= 2:
+                doc_id, tf = item[0], item[1]
+
+            elif isinstance(item, dict):
+                doc_id = item.get("doc_id") or item.get("id") or item.get("doc")
+                tf = item.get("tf") or item.get("freq") or item.get("count") or 1
+
+            else:
+                doc_id = item
+                tf = 1
+
+            if doc_id is not None:
+                doc_tf[int(doc_id)] = doc_tf.get(int(doc_id), 0) + int(tf)
+
+    return doc_tf
+
+
+def build_doc_store(doc_meta_path: Path, corpus_path: Path) -> DocStore:
+    from artifacts import read_table, table_columns
+
+    meta_df = read_table(doc_meta_path, columns=["doc_id", "url", "title", "doc_len"], verbose=False)
+    meta_df = meta_df.sort_values("doc_id", kind="stable")
+
+    wanted = {"url", "content_final", "image_url"}
+    corpus_df = read_table(corpus_path, columns=[c for c in table_columns(corpus_path) if c in wanted],
+                           verbose=False)
+    corpus_by_url = {}
+    for url, content, image in zip(
+        corpus_df["url"].astype(str),
+        corpus_df["content_final"] if "content_final" in corpus_df else [""] * len(corpus_df),
+        corpus_df["image_url"] if "image_url" in corpus_df else [""] * len(corpus_df),
+    ):
+        corpus_by_url[url] = (_str_or_empty(content), _str_or_empty(image))
+    del corpus_df
+
+    meta_strings = []
+    contents = []
+    for url, title in zip(meta_df["url"], meta_df["title"]):
+        url = _str_or_empty(url)
+        content, image = corpus_by_url.get(url, ("", ""))
+        meta_strings.extend((_str_or_empty(title), url, image))
+        contents.append(content)
+    del corpus_by_url
+
+    doc_len = meta_df["doc_len"].to_numpy(dtype=np.int64)
+    return DocStore(
+        doc_ids=meta_df["doc_id"].to_numpy(dtype=np.int64),
+        doc_len=doc_len.astype(min_uint_dtype(int(doc_len.max()) if len(doc_len) else 0)),
+        meta=StringPool.from_strings(meta_strings),
+        contents=StringPool.from_strings(contents),
+    )
+
+
+def build_term_dictionary(raw_index: dict, docs: DocStore) -> TermDictionary:
+    n_docs = len(docs)
+    terms = sorted(raw_index)
+
+    df = np.zeros(len(terms), dtype=np.int32)
+    post_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    rows_chunks = []
+    tf_chunks = []
+
+    for term_id, term in enumerate(terms):
+        doc_tf = _parse_postings(raw_index[term])
+        df[term_id] = len(doc_tf)
+
+        doc_ids = np.fromiter(doc_tf.keys(), dtype=np.int64, count=len(doc_tf))
+        tfs = np.fromiter(doc_tf.values(), dtype=np.int32, count=len(doc_tf))
+
+        # doc_id -> row; postings untuk doc yang tidak ada di doc_meta dibuang
+        rows = np.searchsorted(docs.doc_ids, doc_ids)
+        rows_clipped = np.minimum(rows, max(n_docs - 1, 0))
+        known = (rows < n_docs) & (docs.doc_ids[rows_clipped] == doc_ids) if n_docs else rows < 0
+        rows = rows[known]
+        tfs = tfs[known]
+
+        order = np.argsort(rows, kind="stable")
+        rows_chunks.append(rows[order])
+        tf_chunks.append(tfs[order])
+        post_offsets[term_id + 1] = post_offsets[term_id] + len(rows)
+
+    post_rows = np.concatenate(rows_chunks) if rows_chunks else np.zeros(0, dtype=np.int64)
+    post_tf = np.concatenate(tf_chunks) if tf_chunks else np.zeros(0, dtype=np.int32)
+    post_rows = post_rows.astype(min_uint_dtype(max(n_docs - 1, 0)))
+    post_tf = post_tf.astype(min_uint_dtype(int(post_tf.max()) if len(post_tf) else 0))
+
+    df_safe = np.maximum(df, 1).astype(np.float64)
+    idf_tfidf = np.log(n_docs / df_safe) if n_docs else np.zeros(len(terms))
+    idf_bm25 = np.log((n_docs - df_safe + 0.5) / (df_safe + 0.5) + 1)
+
+    return TermDictionary(
+        terms=StringPool.from_strings(terms),
+        df=df,
+        idf_tfidf=idf_tfidf,
+        idf_bm25=idf_bm25,
+        post_offsets=post_offsets,
+        post_rows=post_rows,
+        post_tf=post_tf,
+    )
+
+
+def build_compact_index(data_dir: Path) -> Tuple[TermDictionary, DocStore]:
+    """Bangun TermDictionary + DocStore dari doc_meta.csv, corpus_clean_v2.csv, inverted_index.json."""
+    docs = build_doc_store(data_dir / "doc_meta.csv", data_dir / "corpus_clean_v2.csv")
+
+    with (data_dir / "inverted_index.json").open("r", encoding="utf-8") as f:
+        raw_index = json.load(f)
+    terms = build_term_dictionary(raw_index, docs)
+    del raw_index
+
+    return terms, docs
+
+
+def average_doc_len(docs: DocStore) -> float:
+    if len(docs) == 0:
+        return math.nan
+    return float(docs.doc_len.mean())
+
+
+# ========== ARTIFACT NPZ ==========
+
+def _pool_arrays(prefix: str, pool: StringPool) -> Dict[str, np.ndarray]:
+    return {
+        f"{prefix}_buffer": np.frombuffer(pool.buffer, dtype=np.uint8),
+        f"{prefix}_offsets": pool.offsets,
+    }
+
+
+def _pool_from(npz, prefix: str) -> StringPool:
+    return StringPool(npz[f"{prefix}_buffer"].tobytes(), npz[f"{prefix}_offsets"])
+
+
+def save_compact_index(terms: TermDictionary, docs: DocStore, path: Path) -> str:
+    """
+    Simpan index + doc store ke satu .npz (tanpa kompresi: load = baca langsung).
+    Return generation: sha1 isi semua array, ikut disimpan di artifact.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.stem + ".tmp.npz")
+    arrays = {
+        "df": terms.df, "idf_tfidf": terms.idf_tfidf, "idf_bm25": terms.idf_bm25,
+        "post_offsets": terms.post_offsets, "post_rows": terms.post_rows, "post_tf": terms.post_tf,
+        "doc_ids": docs.doc_ids, "doc_len": docs.doc_len,
+        **_pool_arrays("terms", terms.terms),
+        **_pool_arrays("meta", docs.meta),
+        **_pool_arrays("contents", docs.contents),
+    }
+    h = hashlib.sha1()
+    for name in sorted(arrays):
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(arrays[name]).tobytes())
+    generation = h.hexdigest()[:16]
+    np.savez(tmp, generation=np.array(generation), **arrays)
+    tmp.replace(path)
+    return generation
+
+
+def load_compact_artifact(path: Path, contents: bool = True) -> Tuple[TermDictionary, DocStore]:
+    """
+    Muat artifact .npz. contents=False melewati konten dokumen (bagian terbesar
+    artifact) untuk handler yang hanya butuh ranking + title/url.
+    """
+    with np.load(path) as npz:
+        terms = TermDictionary(
+            terms=_pool_from(npz, "terms"),
+            df=npz["df"],
+            idf_tfidf=npz["idf_tfidf"],
+            idf_bm25=npz["idf_bm25"],
+            post_offsets=npz["post_offsets"],
+            post_rows=npz["post_rows"],
+            post_tf=npz["post_tf"],
+        )
+        doc_ids = npz["doc_ids"]
+        docs = DocStore(
+            doc_ids=doc_ids,
+            doc_len=npz["doc_len"],
+            meta=_pool_from(npz, "meta"),
+            contents=(_pool_from(npz, "contents") if contents
+                      else StringPool(b"", np.zeros(len(doc_ids) + 1, dtype=np.int64))),
+        )
+    return terms, docs
+
+
+def artifact_is_fresh(data_dir: Path) -> bool:
+    """compact_index.npz ada dan tidak lebih lama dari file sumbernya (CSV / Parquet)."""
+    path = Path(data_dir) / COMPACT_FILE
+    if not path.exists():
+        return False
+    mtime = path.stat().st_mtime
+    for name in SOURCE_FILES:
+        for source in (Path(data_dir) / name, (Path(data_dir) / name).with_suffix(".parquet")):
+            if source.exists() and source.stat().st_mtime > mtime:
+                return False
+    return True
+
+
+def index_generation(data_dir: Path) -> str:
+    """
+    Id versi index yang sedang dipakai (untuk ETag): generation artifact kalau
+    segar, kalau tidak hash dari ukuran + mtime file sumber.
+    """
+    data_dir = Path(data_dir)
+    if artifact_is_fresh(data_dir):
+        with np.load(data_dir / COMPACT_FILE) as npz:
+            if "generation" in npz.files:
+                return str(npz["generation"])
+    h = hashlib.sha1()
+    for name in SOURCE_FILES:
+        for source in (data_dir / name, (data_dir / name).with_suffix(".parquet")):
+            if source.exists():
+                st = source.stat()
+                h.update(f"{source.name} {st.st_size} {st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:16]
+
+
+def load_compact_index(data_dir: Path) -> Tuple[TermDictionary, DocStore]:
+    """Artifact .npz kalau masih segar, kalau tidak build dari file pipeline."""
+    data_dir = Path(data_dir)
+    if artifact_is_fresh(data_dir):
+        return load_compact_artifact(data_dir / COMPACT_FILE)
+    print(f"[WARN] {COMPACT_FILE} tidak ada / basi, build dari inverted_index.json "
+          f"(jalankan: python compact_index.py)")
+    return build_compact_index(data_dir)
+
+
+def main(data_dir: Path):
+    start = time.perf_counter()
+    terms, docs = build_compact_index(data_dir)
+    build_seconds = time.perf_counter() - start
+
+    path = data_dir / COMPACT_FILE
+    generation = save_compact_index(terms, docs, path)
+
+    start = time.perf_counter()
+    load_compact_artifact(path)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    load_compact_artifact(path, contents=False)
+    lean_seconds = time.perf_counter() - start
+
+    print(f"[SUCCESS] {path} ({path.stat().st_size / 1e6:.2f} MB): "
+          f"{len(docs)} dokumen, {len(terms)} term, {len(terms.post_rows)} postings, "
+          f"generation {generation}")
+    print(f"   - Build dari JSON/CSV : {build_seconds:.3f} detik")
+    print(f"   - Load artifact       : {load_seconds:.3f} detik "
+          f"({lean_seconds:.3f} detik tanpa konten)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build artifact compact_index.npz")
+    parser.add_argument("--data-dir", type=Path, default=Path(__file__).resolve().parent / "data")
+    args = parser.parse_args()
+    main(args.data_dir)
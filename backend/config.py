@@ -31,7 +31,8 @@ SEEDS = [
 
 MAX_URLS = 10_000     
 MAX_CONCURRENT_TASKS = 50
-PER_DOMAIN_DELAY = 1.0
+PER_DOMAIN_DELAY = 1.0   # detik antar request ke host yang sama
+PER_DOMAIN_BURST = 1     # request beruntun yang boleh tanpa jeda
 REQUEST_TIMEOUT = 20
 MAX_RETRIES = 2
 
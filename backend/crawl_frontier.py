@@ -0,0 +1,250 @@
+"""
+Frontier crawling yang persisten (SQLite) + dedup URL hemat memori.
+
+- BloomFilter   : bit array NumPy ukuran tetap (dihitung dari kapasitas & false
+                  positive rate), jadi memori tidak tumbuh seiring jumlah URL.
+- CrawlFrontier : antrian FIFO + status URL di SQLite. "Mungkin sudah pernah
+                  dilihat" dari Bloom filter dicek ulang secara exact ke disk
+                  (fingerprint 64-bit ter-index + URL lengkap).
+
+Status URL:
+    QUEUED (0) -> IN_PROGRESS (1) -> DONE (2) / FAILED (3)
+
+Perubahan di-commit per batch (checkpoint). add() tidak pernah memicu commit,
+hanya pop()/mark_*(); jadi link hasil satu halaman dan status DONE halaman itu
+selalu masuk transaksi yang sama (selama pemanggil tidak await di antaranya).
+Setelah crash frontier tetap konsisten: yang belum ter-checkpoint cukup
+di-crawl ulang. Saat resume, URL IN_PROGRESS dikembalikan ke QUEUED dan Bloom
+filter dibangun ulang dari DB.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+QUEUED, IN_PROGRESS, DONE, FAILED = 0, 1, 2, 3
+
+CHECKPOINT_EVERY = 500       # operasi tulis per commit
+CHECKPOINT_SECONDS = 5.0     # atau paling lama tiap N detik
+
+
+def url_hashes(url: str) -> tuple:
+    """Dua hash 64-bit dari satu digest blake2b (double hashing Bloom filter)."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def fingerprint(h1: int) -> int:
+    """Hash 64-bit unsigned -> signed supaya muat di INTEGER SQLite."""
+    return h1 - (1 << 64) if h1 >= (1 << 63) else h1
+
+
+def url_host(url: str) -> str:
+    try:
+        return urlparse(url).netloc.lower()
+    except ValueError:
+        return ""
+
+
+# ========== BLOOM FILTER ==========
+
+class BloomFilter:
+    """Bloom filter bit array; tidak ada false negative."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(int(capacity), 1)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: tuple) -> List[int]:
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, hashes: tuple) -> None:
+        for pos in self._positions(hashes):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, hashes: tuple) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashes))
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+# ========== FRONTIER ==========
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    fp    INTEGER NOT NULL,
+    url   TEXT    NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    host  TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_urls_fp ON urls (fp);
+CREATE INDEX IF NOT EXISTS idx_urls_state ON urls (state, id);
+"""
+
+
+class CrawlFrontier:
+    """Antrian URL + himpunan URL yang sudah dilihat, disimpan di SQLite."""
+
+    def __init__(self, path: Path, capacity: int, error_rate: float = 0.001):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+        # Statistik dedup
+        self.bloom_hits = 0          # Bloom bilang "mungkin ada" -> cek disk
+        self.bloom_false_positive = 0
+        self.duplicates = 0
+
+        # Resume: URL yang sedang dikerjakan saat crash dianggap belum selesai
+        self.resumed = self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0] > 0
+        self.conn.execute("UPDATE urls SET state = ? WHERE state = ?", (QUEUED, IN_PROGRESS))
+        self.conn.commit()
+        for (url,) in self.conn.execute("SELECT url FROM urls"):
+            self.bloom.add(url_hashes(url))
+
+        counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state"))
+        self.total = sum(counts.values())
+        self.visited = counts.get(DONE, 0) + counts.get(FAILED, 0)
+        self.in_flight = 0
+        # Jumlah URL QUEUED per host (untuk scheduler per host)
+        self.queued_by_host: Counter = Counter(dict(self.conn.execute(
+            "SELECT host, COUNT(*) FROM urls WHERE state = ? GROUP BY host", (QUEUED,)
+        )))
+
+    def _migrate(self) -> None:
+        """Frontier lama (tanpa kolom host): tambah kolom + isi dari URL."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(urls)")}
+        if "host" not in columns:
+            self.conn.execute("ALTER TABLE urls ADD COLUMN host TEXT NOT NULL DEFAULT ''")
+            rows = self.conn.execute("SELECT id, url FROM urls").fetchall()
+            self.conn.executemany("UPDATE urls SET host = ? WHERE id = ?",
+                                  [(url_host(url), i) for i, url in rows])
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_host ON urls (host, state, id)")
+        self.conn.commit()
+
+    # ----- dedup -----
+
+    def _seen_on_disk(self, fp: int, url: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM urls WHERE fp = ? AND url = ? LIMIT 1", (fp, url)
+        ).fetchone()
+        return row is not None
+
+    def add(self, url: str) -> bool:
+        """Masukkan URL ke antrian kalau belum pernah dilihat. Return True kalau baru."""
+        hashes = url_hashes(url)
+        fp = fingerprint(hashes[0])
+        if hashes in self.bloom:
+            self.bloom_hits += 1
+            if self._seen_on_disk(fp, url):
+                self.duplicates += 1
+                return False
+            self.bloom_false_positive += 1
+
+        self.bloom.add(hashes)
+        host = url_host(url)
+        self.conn.execute("INSERT INTO urls (fp, url, state, host) VALUES (?, ?, ?, ?)",
+                          (fp, url, QUEUED, host))
+        self.total += 1
+        self.queued_by_host[host] += 1
+        self._pending_writes += 1
+        return True
+
+    def add_many(self, urls: Iterable[str]) -> int:
+        return sum(self.add(u) for u in urls)
+
+    # ----- antrian -----
+
+    def pop(self, host: Optional[str] = None) -> Optional[str]:
+        """
+        Ambil URL QUEUED tertua (opsional: khusus satu host) dan tandai
+        IN_PROGRESS; None kalau antrian kosong.
+        """
+        if host is None:
+            row = self.conn.execute(
+                "SELECT id, url, host FROM urls WHERE state = ? ORDER BY id LIMIT 1", (QUEUED,)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT id, url, host FROM urls WHERE host = ? AND state = ? ORDER BY id LIMIT 1",
+                (host, QUEUED),
+            ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE urls SET state = ? WHERE id = ?", (IN_PROGRESS, row[0]))
+        self.in_flight += 1
+        self.queued_by_host[row[2]] -= 1
+        if self.queued_by_host[row[2]] <= 0:
+            del self.queued_by_host[row[2]]
+        self._wrote()
+        return row[1]
+
+    def _finish(self, url: str, state: int) -> None:
+        fp = fingerprint(url_hashes(url)[0])
+        self.conn.execute("UPDATE urls SET state = ? WHERE fp = ? AND url = ?", (state, fp, url))
+        self.in_flight -= 1
+        self.visited += 1
+        self._wrote()
+
+    def mark_done(self, url: str) -> None:
+        self._finish(url, DONE)
+
+    def mark_failed(self, url: str) -> None:
+        self._finish(url, FAILED)
+
+    @property
+    def queued(self) -> int:
+        return self.total - self.visited - self.in_flight
+
+    def queued_hosts(self) -> Dict[str, int]:
+        return dict(self.queued_by_host)
+
+    # ----- checkpoint -----
+
+    def _wrote(self) -> None:
+        self._pending_writes += 1
+        if (self._pending_writes >= CHECKPOINT_EVERY
+                or time.monotonic() - self._last_commit >= CHECKPOINT_SECONDS):
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        self.conn.commit()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+    def close(self) -> None:
+        self.checkpoint()
+        self.conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "known_urls": self.total,
+            "visited": self.visited,
+            "queued": self.queued,
+            "bloom_bytes": self.bloom.nbytes,
+            "bloom_hits": self.bloom_hits,
+            "bloom_false_positive": self.bloom_false_positive,
+            "duplicates_skipped": self.duplicates,
+        }
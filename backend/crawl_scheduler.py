@@ -0,0 +1,284 @@
+"""
+Scheduler politeness per host untuk crawling.py dan scrape_articles.py.
+
+Setiap host punya token bucket sendiri: rate = 1 / delay, kapasitas = burst.
+delay dasar = max(PER_DOMAIN_DELAY, Crawl-delay robots.txt), lalu disesuaikan
+otomatis dari respons server:
+
+- 429 / 503      : delay x2 (atau Retry-After kalau lebih lama)
+- 5xx lain/error : delay x1.5
+- latency naik   : kalau EWMA latency > LATENCY_SLOWDOWN x latency terbaik, delay x1.25
+- sukses normal  : delay turun perlahan (x0.9) kembali ke delay dasar
+
+Worker tidak menunggu host tertentu: next_host() memilih host (yang masih
+punya URL di antrian) dengan token tersedia paling cepat, jadi throughput
+tetap di batas politeness semua host tanpa worker menganggur di satu host.
+
+polite_fetch() / load_robots() adalah fetch aiohttp yang melapor ke scheduler;
+dipakai crawling.py dan mode concurrent scrape_articles.py. next_ready_host()
+adalah pemilihan host + bootstrap robots.txt yang dipakai semua worker.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.robotparser import RobotFileParser
+
+from config import MAX_RETRIES
+from crawl_frontier import url_host
+from http_client import backoff_delay
+
+MAX_DELAY = 60.0
+LATENCY_ALPHA = 0.2          # bobot EWMA latency
+LATENCY_SLOWDOWN = 3.0
+THROTTLE_STATUS = {429, 503}
+
+
+class HostState:
+    """Token bucket + statistik satu host."""
+
+    def __init__(self, host: str, base_delay: float, burst: int):
+        self.host = host
+        self.base_delay = base_delay
+        self.delay = base_delay
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.not_before = 0.0            # Retry-After
+        self.robots_checked = False
+
+        self.latency_ewma: Optional[float] = None
+        self.latency_best: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def _refill(self, now: float) -> None:
+        if self.delay > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.delay)
+        else:
+            self.tokens = float(self.burst)
+        self.updated = now
+
+    def ready_at(self, now: float) -> float:
+        """Waktu (monotonic) token berikutnya tersedia."""
+        self._refill(now)
+        at = now if self.tokens >= 1 else now + (1 - self.tokens) * self.delay
+        return max(at, self.not_before)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+        self.requests += 1
+
+    def set_base_delay(self, base_delay: float) -> None:
+        self.base_delay = base_delay
+        self.delay = max(self.delay, base_delay)
+
+
+class HostScheduler:
+    def __init__(self, base_delay: float, burst: int = 1, max_delay: float = MAX_DELAY):
+        self.base_delay = base_delay
+        self.burst = burst
+        self.max_delay = max_delay
+        self.hosts: Dict[str, HostState] = {}
+
+    def state(self, host: str) -> HostState:
+        st = self.hosts.get(host)
+        if st is None:
+            st = self.hosts[host] = HostState(host, self.base_delay, self.burst)
+        return st
+
+    # ----- pemilihan host -----
+
+    def next_host(self, candidates: Iterable[str]) -> Tuple[Optional[str], float]:
+        """
+        Host dengan token tersedia paling cepat.
+        Return (host, 0) kalau ada yang siap sekarang (token langsung diambil),
+        atau (None, detik tunggu) kalau semua host masih harus menunggu.
+        """
+        now = time.monotonic()
+        best_host, best_at = None, None
+        for host in candidates:
+            at = self.state(host).ready_at(now)
+            if best_at is None or at < best_at:
+                best_host, best_at = host, at
+        if best_host is None:
+            return None, 0.0
+        if best_at <= now:
+            self.state(best_host).take(now)
+            return best_host, 0.0
+        return None, best_at - now
+
+    async def acquire(self, host: str) -> None:
+        """Tunggu sampai token host tersedia lalu ambil (untuk retry)."""
+        st = self.state(host)
+        while True:
+            now = time.monotonic()
+            at = st.ready_at(now)
+            if at <= now:
+                st.take(now)
+                return
+            await asyncio.sleep(at - now)
+
+    # ----- robots.txt -----
+
+    def apply_robots(self, host: str, robots_txt: Optional[str], user_agent: str = "*") -> None:
+        st = self.state(host)
+        st.robots_checked = True
+        if not robots_txt:
+            return
+        parser = RobotFileParser()
+        parser.parse(robots_txt.splitlines())
+        crawl_delay = parser.crawl_delay(user_agent)
+        if crawl_delay:
+            st.set_base_delay(max(self.base_delay, float(crawl_delay)))
+            print(f"[ROBOTS] {host}: crawl-delay {crawl_delay} detik")
+
+    # ----- feedback adaptif -----
+
+    def feedback(self, host: str, status: Optional[int], latency: float,
+                 retry_after: Optional[float] = None) -> None:
+        """Update delay host dari hasil satu request (status None = error koneksi)."""
+        st = self.state(host)
+
+        if status in THROTTLE_STATUS:
+            st.throttled += 1
+            st.delay = min(self.max_delay, max(st.delay * 2, retry_after or 0.0))
+            if retry_after:
+                st.not_before = time.monotonic() + retry_after
+            print(f"[THROTTLE] {host}: status {status}, delay -> {st.delay:.2f} detik")
+            return
+
+        if status is None or status >= 500:
+            st.errors += 1
+            st.delay = min(self.max_delay, st.delay * 1.5)
+            return
+
+        st.latency_ewma = latency if st.latency_ewma is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * st.latency_ewma
+        )
+        st.latency_best = st.latency_ewma if st.latency_best is None else min(
+            st.latency_best, st.latency_ewma
+        )
+        if st.latency_ewma > LATENCY_SLOWDOWN * st.latency_best:
+            st.delay = min(self.max_delay, st.delay * 1.25)
+        else:
+            st.delay = max(st.base_delay, st.delay * 0.9)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            host: {
+                "requests": st.requests,
+                "throttled": st.throttled,
+                "errors": st.errors,
+                "delay": round(st.delay, 3),
+                "base_delay": st.base_delay,
+                "latency_ewma": None if st.latency_ewma is None else round(st.latency_ewma, 3),
+            }
+            for host, st in self.hosts.items()
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Header Retry-After dalam detik (format tanggal HTTP diabaikan)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# ========== FETCH ==========
+
+class FetchedPage(NamedTuple):
+    status: int
+    headers: dict
+    text: str
+
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> dict:
+    """Header request kondisional dari validator respons sebelumnya."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+async def polite_fetch(session, url: str, scheduler: HostScheduler,
+                       headers: Optional[dict] = None) -> Optional[FetchedPage]:
+    """
+    Ambil HTML dari suatu URL (None kalau gagal). Status/latency dilaporkan ke
+    scheduler; retry (error, 429, 5xx) menunggu giliran host lagi, bukan langsung.
+    Token untuk percobaan pertama diambil pemanggil (next_host / acquire).
+
+    headers (mis. conditional_headers()) ikut dikirim; 304 Not Modified
+    dikembalikan sebagai FetchedPage dengan text kosong.
+    """
+    host = url_host(url)
+    for retry in range(MAX_RETRIES + 1):
+        if retry:
+            await scheduler.acquire(host)
+
+        start = time.monotonic()
+        try:
+            async with session.get(url, headers=headers) as res:
+                scheduler.feedback(
+                    host, res.status, time.monotonic() - start,
+                    parse_retry_after(res.headers.get("Retry-After")),
+                )
+                if res.status == 200:
+                    return FetchedPage(res.status, dict(res.headers), await res.text())
+                if res.status == 304:
+                    return FetchedPage(res.status, dict(res.headers), "")
+                status = res.status
+            # Retry di luar `async with`: koneksi sudah kembali ke pool selama
+            # menunggu giliran host (bisa selama Retry-After)
+            if (status in THROTTLE_STATUS or status >= 500) and retry < MAX_RETRIES:
+                print(f"[RETRY {retry+1}] {url} -> status {status}")
+                continue
+            print(f"[STATUS {status}] {url}")
+            return None
+        except Exception as e:
+            scheduler.feedback(host, None, time.monotonic() - start)
+            if retry < MAX_RETRIES:
+                print(f"[RETRY {retry+1}] {url} -> {e}")
+                await asyncio.sleep(backoff_delay(retry))
+                continue
+            print(f"[FAILED] {url} -> {e}")
+            return None
+    return None
+
+
+async def load_robots(session, scheduler: HostScheduler, host: str) -> None:
+    """Ambil robots.txt satu host (sekali) untuk Crawl-delay."""
+    robots_txt = None
+    try:
+        async with session.get(f"https://{host}/robots.txt") as res:
+            if res.status == 200:
+                robots_txt = await res.text()
+    except Exception as e:
+        print(f"[ROBOTS] {host}: gagal ambil robots.txt -> {e}")
+    scheduler.apply_robots(host, robots_txt)
+
+
+async def next_ready_host(session, scheduler: HostScheduler, hosts: Iterable[str]) -> Optional[str]:
+    """
+    Satu langkah loop worker: host yang tokennya sudah diambil dan siap di-fetch.
+    None = belum ada (sudah menunggu sebentar, atau token dipakai untuk
+    robots.txt host baru); pemanggil cukup mengulang loop-nya.
+    """
+    host, wait = scheduler.next_host(hosts)
+    if host is None:
+        await asyncio.sleep(min(wait, 1.0))
+        return None
+    if not scheduler.state(host).robots_checked:
+        # Token pertama host dipakai untuk robots.txt
+        scheduler.state(host).robots_checked = True
+        await load_robots(session, scheduler, host)
+        return None
+    return host
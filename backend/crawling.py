@@ -3,28 +3,57 @@
 # Input : SEEDS & ALLOWED_DOMAINS dari config.py
 # Output: data/urls.txt (1 URL per baris)
 # Di akhir: print total URL + lama waktu crawling
-
+#
+# Frontier (antrian + URL yang sudah dilihat) disimpan di
+# data/crawl_frontier.sqlite3 (lihat crawl_frontier.py), jadi crawl yang
+# berhenti di tengah jalan bisa dilanjutkan. Pakai --fresh untuk mulai ulang.
+#
+# Request diatur per host oleh crawl_scheduler.HostScheduler (token bucket
+# dari PER_DOMAIN_DELAY / Crawl-delay robots.txt, backoff adaptif untuk
+# 429/5xx dan latency naik).
+#
+# Fetch dan parse dipisah jadi pipeline: coroutine fetcher mengisi antrian
+# terbatas (url, html), parser mengambil link lewat link_extractor (regex
+# href saja, tanpa tree BeautifulSoup) di process pool, jadi parsing tidak
+# memblokir event loop dan bisa memakai semua core.
+#
+# Link baru dikanonikalisasi & difilter (url_canon.UrlFilter) sebelum masuk
+# frontier: varian query/fragment, tracking/paginasi, halaman non-artikel dan
+# file statis tidak di-fetch. SEEDS tidak lewat filter.
+#
+# HTML yang di-fetch disimpan ke page store terkompresi (page_store.py,
+# data/pages/) supaya scrape_articles.py / backfill gambar tidak download ulang.
+
+import argparse
 import asyncio
 import aiohttp
+import multiprocessing as mp
 import os
 import time
-from urllib.parse import urlparse, urljoin
-
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
 
 from config import (
     SEEDS,
     ALLOWED_DOMAINS,
     MAX_URLS,
     MAX_CONCURRENT_TASKS,
-    REQUEST_TIMEOUT,
-    MAX_RETRIES,
+    PER_DOMAIN_DELAY,
+    PER_DOMAIN_BURST,
 )
+from crawl_frontier import CrawlFrontier
+from crawl_scheduler import HostScheduler, next_ready_host, polite_fetch
+from http_client import async_session, print_handshake_stats
+from link_extractor import extract_links
+from page_store import PageStore
+from url_canon import UrlFilter
 
 OUTPUT_PATH = "data/urls.txt"
+FRONTIER_PATH = "data/crawl_frontier.sqlite3"
 os.makedirs("data", exist_ok=True)
 
 CRAWL_LIMIT = MAX_URLS  # sekarang = 1_000_000 dari config.py
+PROGRESS_SECONDS = 10
 
 
 def allowed_domain(url: str) -> bool:
@@ -36,23 +65,6 @@ def allowed_domain(url: str) -> bool:
         return False
 
 
-async def fetch(session: aiohttp.ClientSession, url: str, retry: int = 0):
-    """Ambil HTML dari suatu URL dengan retry sederhana."""
-    try:
-        async with session.get(url, timeout=REQUEST_TIMEOUT) as res:
-            if res.status == 200:
-                return await res.text()
-            else:
-                print(f"[STATUS {res.status}] {url}")
-                return None
-    except Exception as e:
-        if retry < MAX_RETRIES:
-            print(f"[RETRY {retry+1}] {url} -> {e}")
-            return await fetch(session, url, retry + 1)
-        print(f"[FAILED] {url} -> {e}")
-        return None
-
-
 async def append_url(url: str, file_lock: asyncio.Lock):
     """Tulis satu URL ke data/urls.txt (append, aman untuk multi-task)."""
     async with file_lock:
@@ -60,94 +72,184 @@ async def append_url(url: str, file_lock: asyncio.Lock):
             f.write(url.strip() + "\n")
 
 
-async def worker(
+async def fetcher(
     name: int,
-    queue: asyncio.Queue,
-    visited: set,
+    session: aiohttp.ClientSession,
+    frontier: CrawlFrontier,
+    scheduler: HostScheduler,
     file_lock: asyncio.Lock,
+    parse_queue: asyncio.Queue,
+    store: PageStore,
 ):
-    async with aiohttp.ClientSession() as session:
-        while True:
-            url = await queue.get()
-
-            # Sentinel stop
-            if url is None:
-                queue.task_done()
-                print(f"[WORKER {name}] stop.")
+    while True:
+        # Kalau sudah kena limit, stop
+        if frontier.visited + frontier.in_flight >= CRAWL_LIMIT:
+            break
+
+        hosts = frontier.queued_hosts()
+        if not hosts:
+            # Antrian kosong: selesai kalau tidak ada URL lain yang masih
+            # di-fetch / di-parse (bisa menghasilkan link baru)
+            if frontier.in_flight == 0:
                 break
+            await asyncio.sleep(0.1)
+            continue
 
-            # Kalau sudah kena limit, skip
-            if len(visited) >= CRAWL_LIMIT:
-                queue.task_done()
-                continue
+        # Ambil host mana pun yang tokennya siap paling dulu
+        host = await next_ready_host(session, scheduler, hosts)
+        if host is None:
+            continue
 
-            # Skip jika sudah pernah dikunjungi
-            if url in visited:
-                queue.task_done()
-                continue
+        url = frontier.pop(host)
+        if url is None:
+            continue
 
-            visited.add(url)
+        # Pastikan domain diizinkan
+        if not allowed_domain(url):
+            frontier.mark_done(url)
+            continue
 
-            # Pastikan domain diizinkan
-            if not allowed_domain(url):
-                queue.task_done()
-                continue
+        print(f"[FETCH {name}] CRAWL -> {url}")
 
-            print(f"[WORKER {name}] CRAWL -> {url}")
+        # Simpan URL ke file
+        await append_url(url, file_lock)
 
-            # Simpan URL ke file
-            await append_url(url, file_lock)
+        # Ambil HTML untuk cari link baru + simpan ke page store
+        page = await polite_fetch(session, url, scheduler)
+        if page is None:
+            frontier.mark_failed(url)
+            continue
+        if store is not None:
+            store.put(url, page.text, page.headers, page.status)
 
-            # Ambil HTML hanya untuk cari link baru
-            html = await fetch(session, url)
-            if not html:
-                queue.task_done()
-                continue
+        # Antrian terbatas: kalau parser ketinggalan, fetcher ikut menunggu
+        await parse_queue.put((url, page.text))
 
-            soup = BeautifulSoup(html, "html.parser")
-            for a in soup.find_all("a", href=True):
-                new_url = urljoin(url, a["href"])
+    print(f"[FETCH {name}] stop.")
 
-                if (
-                    allowed_domain(new_url)
-                    and new_url not in visited
-                    and len(visited) + queue.qsize() < CRAWL_LIMIT
-                ):
-                    await queue.put(new_url)
 
-            queue.task_done()
-
-
-async def main():
-    # Bersihkan urls.txt lama kalau ada
-    if os.path.exists(OUTPUT_PATH):
-        os.remove(OUTPUT_PATH)
+async def parser(
+    parse_queue: asyncio.Queue,
+    frontier: CrawlFrontier,
+    url_filter: UrlFilter,
+    pool,
+    stats: dict,
+):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await parse_queue.get()
+        if item is None:
+            break
+        url, html = item
+
+        try:
+            if pool is None:
+                links = extract_links(url, html)
+            else:
+                links = await loop.run_in_executor(pool, extract_links, url, html)
+        except Exception as e:
+            print(f"[PARSE ERROR] {url} -> {e}")
+            links = []
+
+        for new_url in links:
+            canon = url_filter.admit(new_url)
+            if canon is None or frontier.total >= CRAWL_LIMIT:
+                continue
+            if not frontier.add(canon) and canon != new_url:
+                # Varian URL yang baru ketahuan duplikat setelah kanonikalisasi
+                url_filter.counts["collapsed_variants"] += 1
+
+        # Link baru + status DONE masuk checkpoint yang sama (tanpa await di antaranya)
+        frontier.mark_done(url)
+        stats["pages"] += 1
+
+
+async def report_progress(stats: dict, frontier: CrawlFrontier, parse_queue: asyncio.Queue):
+    last_pages, last_time = 0, time.time()
+    while True:
+        await asyncio.sleep(PROGRESS_SECONDS)
+        now = time.time()
+        rate = (stats["pages"] - last_pages) / (now - last_time)
+        print(
+            f"[PROGRESS] {stats['pages']} halaman diparse, {rate:.1f} halaman/detik, "
+            f"antrian parse {parse_queue.qsize()}, frontier {frontier.queued}"
+        )
+        last_pages, last_time = stats["pages"], now
+
+
+async def main(fresh: bool = False, parse_workers: int = os.cpu_count() or 1,
+               save_pages: bool = True):
+    if fresh:
+        # Mulai dari nol: buang urls.txt + frontier lama
+        for path in (OUTPUT_PATH, FRONTIER_PATH, FRONTIER_PATH + "-wal", FRONTIER_PATH + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
 
     start_time = time.time()
 
-    queue = asyncio.Queue()
-    visited: set[str] = set()
+    frontier = CrawlFrontier(FRONTIER_PATH, capacity=CRAWL_LIMIT)
+    scheduler = HostScheduler(base_delay=PER_DOMAIN_DELAY, burst=PER_DOMAIN_BURST)
     file_lock = asyncio.Lock()
 
-    # Masukkan SEEDS ke antrian
-    for seed in SEEDS:
-        await queue.put(seed)
+    if frontier.resumed:
+        print(
+            f"[INFO] Resume frontier: {frontier.visited} URL sudah dikunjungi, "
+            f"{frontier.queued} di antrian"
+        )
+    else:
+        # urls.txt lama tanpa frontier tidak bisa dilanjutkan
+        if os.path.exists(OUTPUT_PATH):
+            os.remove(OUTPUT_PATH)
+
+    # Masukkan SEEDS ke antrian (yang sudah pernah dilihat otomatis di-skip)
+    frontier.add_many(SEEDS)
+    frontier.checkpoint()
+
+    # Satu connection pool untuk semua fetcher (lihat http_client.py)
+    session = async_session()
+    store = PageStore() if save_pages else None
+
+    # Parse di process pool (spawn: aman walau event loop punya thread DNS)
+    # parse_workers = 0 -> parse langsung di event loop (pembanding)
+    pool = None
+    n_parsers = 1
+    if parse_workers > 0:
+        pool = ProcessPoolExecutor(parse_workers, mp_context=mp.get_context("spawn"))
+        n_parsers = parse_workers * 2     # 2 halaman per proses biar pool tidak idle
+    parse_queue: asyncio.Queue = asyncio.Queue(maxsize=n_parsers * 2)
+    stats = {"pages": 0}
+    url_filter = UrlFilter(ALLOWED_DOMAINS)
 
-    # Buat worker
-    workers = []
     n_workers = MAX_CONCURRENT_TASKS
-    print(f"[INFO] Mulai crawling dengan {n_workers} worker, limit {CRAWL_LIMIT} URL")
-    for i in range(n_workers):
-        task = asyncio.create_task(worker(i + 1, queue, visited, file_lock))
-        workers.append(task)
-
-    # Tunggu sampai antrian kosong
-    await queue.join()
+    print(
+        f"[INFO] Mulai crawling dengan {n_workers} fetcher, {parse_workers} proses parse, "
+        f"limit {CRAWL_LIMIT} URL"
+    )
+    fetchers = [
+        asyncio.create_task(fetcher(i + 1, session, frontier, scheduler, file_lock, parse_queue, store))
+        for i in range(n_workers)
+    ]
+    parsers = [
+        asyncio.create_task(parser(parse_queue, frontier, url_filter, pool, stats))
+        for _ in range(n_parsers)
+    ]
+    progress = asyncio.create_task(report_progress(stats, frontier, parse_queue))
 
-    # Kirim sinyal stop ke semua worker
-    for _ in workers:
-        await queue.put(None)
-    await asyncio.gather(*workers, return_exceptions=True)
+    try:
+        await asyncio.gather(*fetchers)
+        for _ in parsers:
+            await parse_queue.put(None)
+        await asyncio.gather(*parsers)
+    finally:
+        progress.cancel()
+        await session.close()
+        if store is not None:
+            store_bytes = (store.bytes_raw, store.bytes_stored)
+            store.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        crawl_stats = frontier.stats()
+        frontier.close()
 
     elapsed = time.time() - start_time
     hours = int(elapsed // 3600)
@@ -155,8 +257,29 @@ async def main():
     seconds = int(elapsed % 60)
 
     print("\n=== CRAWLING SELESAI ===")
-    print(f"Total URL dikunjungi: {len(visited)}")
+    print(f"Total URL dikunjungi: {crawl_stats['visited']}")
+    print(f"URL di antrian      : {crawl_stats['queued']}")
+    print(f"Duplikat di-skip    : {crawl_stats['duplicates_skipped']} "
+          f"(Bloom filter {crawl_stats['bloom_bytes'] / 1024:.0f} KB, "
+          f"false positive {crawl_stats['bloom_false_positive']})")
+    counts = url_filter.counts
+    print(f"Link ditemukan      : {counts['links_seen']} "
+          f"({counts['rewritten']} dikanonikalisasi, {counts['dropped_offsite']} luar domain)")
+    print(f"Fetch dihemat       : {url_filter.fetches_avoided() + counts['collapsed_variants']} "
+          f"({counts['dropped_blocked_path']} non-artikel, {counts['dropped_asset']} file statis, "
+          f"{counts['collapsed_variants']} varian URL duplikat)")
+    print(f"Halaman diparse     : {stats['pages']} "
+          f"({stats['pages'] / elapsed:.1f} halaman/detik, {parse_workers} proses parse)")
+    for host, st in scheduler.stats().items():
+        print(f"Host {host:<15}: {st['requests']} request, {st['throttled']} throttle, "
+              f"{st['errors']} error, delay akhir {st['delay']:.2f} detik")
+    print_handshake_stats()
+    if store is not None:
+        raw, stored = store_bytes
+        print(f"Page store          : {stored / 1e6:.1f} MB ditulis "
+              f"(HTML {raw / 1e6:.1f} MB, rasio {raw / stored if stored else 0:.1f}x) -> {store.root}")
     print(f"File output         : {OUTPUT_PATH}")
+    print(f"Frontier            : {FRONTIER_PATH}")
     print(
         f"Total waktu         : {hours} jam {minutes} menit {seconds} detik "
         f"({elapsed:.2f} detik)"
@@ -164,4 +287,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arg_parser = argparse.ArgumentParser(description="Crawl link artikel travel")
+    arg_parser.add_argument("--fresh", action="store_true",
+                            help="Hapus frontier & urls.txt lama, mulai dari SEEDS")
+    arg_parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                            help="Jumlah proses parse HTML (0 = parse di event loop)")
+    arg_parser.add_argument("--no-store", action="store_true",
+                            help="Jangan simpan HTML ke page store (data/pages/)")
+    args = arg_parser.parse_args()
+    asyncio.run(main(fresh=args.fresh, parse_workers=args.parse_workers,
+                     save_pages=not args.no_store))
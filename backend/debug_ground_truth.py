@@ -1,8 +1,9 @@
-import pandas as pd
 import re
 
+from artifacts import read_table
+
 # Load corpus
-corpus = pd.read_csv("data/corpus_clean.csv")
+corpus = read_table("data/corpus_clean.csv")
 print(f"Corpus loaded: {len(corpus)} documents")
 print(f"Columns: {corpus.columns.tolist()}")
 print(f"\nFirst few rows:")
@@ -3,99 +3,142 @@ Modul evaluasi untuk membandingkan algoritma TF-IDF vs BM25
 Menggunakan metrik: Precision, Recall, F1, MAP (Mean Average Precision)
 """
 import json
-import pandas as pd
+import os
+import threading
 import numpy as np
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import time
-import re
+
+DEFAULT_GROUND_TRUTH_PATH = "data/ground_truth.json"
+# Jumlah judgment hasil generate on-the-fly yang disimpan (LRU)
+DEFAULT_CACHE_SIZE = 512
 
 
 class SearchEvaluator:
-    def __init__(self, ground_truth_path="data/ground_truth.json", corpus_path="data/corpus_clean.csv"):
+    def __init__(self, ground_truth_path=DEFAULT_GROUND_TRUTH_PATH, engine=None,
+                 cache_size=DEFAULT_CACHE_SIZE):
         """
         Initialize evaluator dengan ground truth
         
         Args:
             ground_truth_path: Path ke file ground truth relevance judgments
-            corpus_path: Path ke corpus untuk generate ground truth on-the-fly
+            engine: Modul search engine (default: search_engine) yang index-nya
+                dipakai untuk generate ground truth on-the-fly
+            cache_size: Maksimal judgment on-the-fly yang di-cache (LRU)
         """
+        self.ground_truth_path = ground_truth_path
+        self.ground_truth_mtime = None
         try:
             with open(ground_truth_path, "r", encoding="utf-8") as f:
                 gt = json.load(f)
                 # Convert lists back to sets
                 self.ground_truth = {k: set(v) for k, v in gt.items()}
+            self.ground_truth_mtime = os.path.getmtime(ground_truth_path)
         except FileNotFoundError:
             # Jika ground truth belum ada, gunakan empty dict
             self.ground_truth = {}
-        
-        # Load corpus untuk generate ground truth on-the-fly
-        try:
-            self.corpus = pd.read_csv(corpus_path)
-            print(f"✓ Corpus loaded: {len(self.corpus)} documents from {corpus_path}")
-        except Exception as e:
-            print(f"Warning: Failed to load corpus from {corpus_path}: {e}")
-            self.corpus = None
-    
+
+        if engine is None:
+            import search_engine as engine
+        self.engine = engine
+
+        # Judgment on-the-fly: LRU terbatas, terpisah dari ground truth file
+        self.cache_size = cache_size
+        self.generated = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Token store judul: term -> (doc rows, count), dibangun sekali
+        self._title_postings = self._build_title_postings()
+
+    def _build_title_postings(self) -> dict:
+        """Index kecil term judul (lowercase) -> (doc rows, jumlah kemunculan)."""
+        docs = self.engine.DOCS
+        postings = defaultdict(lambda: ([], []))
+        for row in range(len(docs)):
+            counts = {}
+            for token in self.engine.preprocess_query(docs.title(row)):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                rows, tfs = postings[token]
+                rows.append(row)
+                tfs.append(count)
+        return {
+            term: (np.array(rows, dtype=np.int64), np.array(tfs, dtype=np.int64))
+            for term, (rows, tfs) in postings.items()
+        }
+
     def generate_ground_truth_for_query(self, query: str) -> set:
         """
         Generate ground truth on-the-fly untuk query yang tidak ada di ground truth
-        Menggunakan TF-IDF scoring untuk menentukan relevansi (top 10% dokumen)
+        Skor relevansi = 5 x kemunculan keyword di judul + kemunculan di konten,
+        dihitung dari postings inverted index (bukan scan substring per dokumen).
+        Ambil top 5% dokumen sebagai relevan (minimal 20, maksimal 300).
         
         Args:
             query: Query string
         
         Returns:
-            Set of relevant doc_ids (top 10% by relevance score)
+            Set of relevant doc_ids
         """
-        if self.corpus is None:
-            return set()
-        
-        # Tokenize query menjadi keywords
-        query_lower = query.lower()
-        keywords = re.findall(r'\w+', query_lower)
-        keywords = [k for k in keywords if len(k) > 2]  # Filter keyword pendek
+        # Tokenize query menjadi keywords (tokenisasi sama dengan index)
+        keywords = [k for k in self.engine.preprocess_query(query) if len(k) > 2]
         
         if not keywords:
             return set()
         
-        # Hitung relevance score untuk setiap dokumen
-        doc_scores = []
-        
-        for idx, row in self.corpus.iterrows():
-            content = str(row.get("content_clean", "")).lower()
-            title = str(row.get("title", "")).lower()
-            
-            # Scoring dengan bobot berbeda untuk title dan content
-            title_score = 0
-            content_score = 0
-            
-            for keyword in keywords:
-                # Title match: bobot 5x
-                title_matches = title.count(keyword)
-                title_score += title_matches * 5
-                
-                # Content match: bobot 1x
-                content_matches = content.count(keyword)
-                content_score += content_matches
-            
-            total_score = title_score + content_score
-            
-            # Hanya simpan dokumen yang punya score > 0
-            if total_score > 0:
-                doc_scores.append((idx, total_score))
-        
+        terms = self.engine.TERMS
+        rows_parts = []
+        score_parts = []
+        for keyword in keywords:
+            # Content match: bobot 1x
+            term_id = terms.lookup(keyword)
+            if term_id >= 0:
+                rows, tf = terms.postings(term_id)
+                rows_parts.append(rows.astype(np.int64))
+                score_parts.append(tf.astype(np.int64))
+
+            # Title match: bobot 5x
+            title = self._title_postings.get(keyword)
+            if title is not None:
+                rows_parts.append(title[0])
+                score_parts.append(title[1] * 5)
+
         # Jika tidak ada dokumen dengan score > 0
-        if not doc_scores:
+        if not rows_parts:
             return set()
+
+        rows = np.concatenate(rows_parts)
+        uniq, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
         
-        # Sort by score descending
-        doc_scores.sort(key=lambda x: x[1], reverse=True)
+        # Sort by score descending (tie -> doc row kecil dulu)
+        order = np.lexsort((uniq, -scores))
         
         # Ambil top 5% dokumen sebagai relevant (minimal 20, maksimal 300)
-        num_relevant = max(20, min(300, len(doc_scores) // 20))
-        relevant_docs = set(doc_id for doc_id, score in doc_scores[:num_relevant])
+        num_relevant = max(20, min(300, len(uniq) // 20))
+        top_rows = uniq[order[:num_relevant]]
+        relevant_docs = set(int(d) for d in self.engine.DOCS.doc_ids[top_rows])
         
         return relevant_docs
+
+    def get_relevant(self, query: str) -> set:
+        """Ground truth untuk query: dari file kalau ada, kalau tidak dari cache / generate."""
+        if query in self.ground_truth:
+            return self.ground_truth[query]
+
+        with self._lock:
+            if query in self.generated:
+                self.generated.move_to_end(query)
+                return self.generated[query]
+
+        relevant = self.generate_ground_truth_for_query(query)
+
+        with self._lock:
+            self.generated[query] = relevant
+            self.generated.move_to_end(query)
+            while len(self.generated) > self.cache_size:
+                self.generated.popitem(last=False)
+        return relevant
     
     def calculate_precision(self, retrieved: set, relevant: set) -> float:
         """
@@ -177,24 +220,19 @@ class SearchEvaluator:
         Returns:
             Dict dengan metrics: precision, recall, f1, ap
         """
-        # Cek apakah ada ground truth untuk query ini
-        if query not in self.ground_truth:
-            # Generate ground truth on-the-fly jika belum ada
-            relevant = self.generate_ground_truth_for_query(query)
-            
-            # Jika masih tidak ada relevan docs, return 0
-            if not relevant:
-                return {
-                    "precision": 0.0,
-                    "recall": 0.0,
-                    "f1": 0.0,
-                    "ap": 0.0,
-                    "note": "No ground truth available and failed to generate"
-                }
-            # Simpan ground truth yang baru di-generate
-            self.ground_truth[query] = relevant
-        
-        relevant = self.ground_truth[query]
+        # Ground truth dari file, atau generate on-the-fly (di-cache)
+        relevant = self.get_relevant(query)
+
+        # Jika masih tidak ada relevan docs, return 0
+        if not relevant:
+            return {
+                "precision": 0.0,
+                "recall": 0.0,
+                "f1": 0.0,
+                "ap": 0.0,
+                "note": "No ground truth available and failed to generate"
+            }
+
         retrieved = set(retrieved_ids)
         
         precision = self.calculate_precision(retrieved, relevant)
@@ -213,50 +251,149 @@ class SearchEvaluator:
         }
 
 
-def evaluate_query_both_algos(query: str, search_engine, top_k: int = 20) -> dict:
+def batch_metrics(retrieved: np.ndarray, relevant: list, cutoffs=(5, 10)) -> dict:
+    """
+    Hitung metrik untuk banyak query sekaligus (vectorized NumPy).
+
+    Args:
+        retrieved: Array (Q, k) doc_id hasil ranking, padding -1 kalau < k hasil
+        relevant: List panjang Q berisi iterable doc_id relevan per query
+        cutoffs: Nilai k untuk P@k
+
+    Returns:
+        Dict nama metrik -> array (Q,): precision, recall, f1, ap, ndcg, rr,
+        p@k, retrieved_count, relevant_count, relevant_retrieved
+    """
+    retrieved = np.asarray(retrieved, dtype=np.int64)
+    n_queries, k = retrieved.shape
+    valid = retrieved >= 0
+
+    rel_counts = np.array([len(r) for r in relevant], dtype=np.int64)
+    rel_docs = np.fromiter((d for r in relevant for d in r), dtype=np.int64,
+                           count=int(rel_counts.sum()))
+    rel_query = np.repeat(np.arange(n_queries, dtype=np.int64), rel_counts)
+
+    # Key (query, doc) digabung jadi satu int supaya membership cukup satu np.isin
+    stride = int(max(retrieved.max(initial=0), rel_docs.max(initial=0))) + 1
+    rel_keys = rel_query * stride + rel_docs
+    ret_keys = np.arange(n_queries, dtype=np.int64)[:, None] * stride + retrieved
+    hits = np.isin(ret_keys, rel_keys) & valid
+
+    ranks = np.arange(1, k + 1, dtype=np.float64)
+    cum_hits = np.cumsum(hits, axis=1)
+    n_hits = cum_hits[:, -1] if k else np.zeros(n_queries, dtype=np.int64)
+    n_retrieved = valid.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(n_retrieved > 0, n_hits / n_retrieved, 0.0)
+        recall = np.where(rel_counts > 0, n_hits / rel_counts, 0.0)
+        f1 = np.where(precision + recall > 0,
+                      2 * precision * recall / (precision + recall), 0.0)
+        ap = np.where(rel_counts > 0,
+                      (hits * (cum_hits / ranks)).sum(axis=1) / rel_counts, 0.0)
+
+        # nDCG biner: DCG / DCG ideal (semua relevan di atas)
+        discounts = 1.0 / np.log2(ranks + 1)
+        dcg = (hits * discounts).sum(axis=1)
+        ideal_cum = np.concatenate(([0.0], np.cumsum(discounts)))
+        idcg = ideal_cum[np.minimum(rel_counts, k)]
+        ndcg = np.where(idcg > 0, dcg / idcg, 0.0)
+
+    first_hit = hits.argmax(axis=1)
+    rr = np.where(hits.any(axis=1), 1.0 / (first_hit + 1), 0.0)
+
+    result = {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "ap": ap,
+        "ndcg": ndcg,
+        "rr": rr,
+        "retrieved_count": n_retrieved,
+        "relevant_count": rel_counts,
+        "relevant_retrieved": n_hits,
+    }
+    for cutoff in cutoffs:
+        c = min(cutoff, k)
+        result[f"p@{cutoff}"] = cum_hits[:, c - 1] / cutoff if c else np.zeros(n_queries)
+    return result
+
+
+_EVALUATOR = None
+_EVALUATOR_LOCK = threading.Lock()
+
+
+def get_evaluator(ground_truth_path=DEFAULT_GROUND_TRUTH_PATH) -> SearchEvaluator:
+    """
+    Evaluator long-lived yang dipakai bersama antar request /evaluate.
+    Dibuat ulang hanya kalau file ground truth berubah (mtime).
+    """
+    global _EVALUATOR
+    try:
+        mtime = os.path.getmtime(ground_truth_path)
+    except OSError:
+        mtime = None
+
+    with _EVALUATOR_LOCK:
+        if (
+            _EVALUATOR is None
+            or _EVALUATOR.ground_truth_path != ground_truth_path
+            or _EVALUATOR.ground_truth_mtime != mtime
+        ):
+            _EVALUATOR = SearchEvaluator(ground_truth_path)
+        return _EVALUATOR
+
+
+def evaluate_query_both_algos(query: str, search_engine, top_k: int = 20,
+                              evaluator: SearchEvaluator = None) -> dict:
     """
     Evaluasi query menggunakan kedua algoritma (TF-IDF dan BM25)
     
     Args:
         query: Query string
-        search_engine: Instance dari SearchEngine
+        search_engine: Modul search_engine (pakai multi_search_ids, satu traversal)
+            atau objek dengan method search(query, algo, top_k)
         top_k: Jumlah dokumen yang di-retrieve
+        evaluator: SearchEvaluator (default: evaluator long-lived dari get_evaluator())
     
     Returns:
         Dict dengan hasil evaluasi untuk TF-IDF dan BM25
     """
-    # Buat satu evaluator untuk kedua algoritma agar ground truth konsisten
-    evaluator = SearchEvaluator()
-    
-    # Generate atau ambil ground truth sekali saja
-    if query not in evaluator.ground_truth:
-        relevant = evaluator.generate_ground_truth_for_query(query)
-        # Simpan untuk konsistensi
-        evaluator.ground_truth[query] = relevant
-    
-    # TF-IDF search
-    start = time.time()
-    tfidf_results = search_engine.search(query, algo="tfidf", top_k=top_k)
-    tfidf_time = (time.time() - start) * 1000  # Convert to ms
-    tfidf_ids = [r["doc_id"] for r in tfidf_results]
-    tfidf_eval = evaluator.evaluate_single_query(query, tfidf_ids)
-    tfidf_eval["runtime"] = tfidf_time
+    # Satu evaluator untuk kedua algoritma agar ground truth konsisten
+    if evaluator is None:
+        evaluator = get_evaluator()
     
-    # BM25 search
-    start = time.time()
-    bm25_results = search_engine.search(query, algo="bm25", top_k=top_k)
-    bm25_time = (time.time() - start) * 1000  # Convert to ms
-    bm25_ids = [r["doc_id"] for r in bm25_results]
-    bm25_eval = evaluator.evaluate_single_query(query, bm25_ids)
-    bm25_eval["runtime"] = bm25_time
+    # Generate atau ambil ground truth sekali saja (di-cache di evaluator)
+    evaluator.get_relevant(query)
     
-    return {
-        "query": query,
-        "tfidf": tfidf_eval,
-        "bm25": bm25_eval
-    }
-    bm25_eval = evaluator.evaluate_single_query(query, bm25_ids)
-    bm25_eval["runtime"] = bm25_time
+    if hasattr(search_engine, "multi_search_ids"):
+        # Satu traversal postings untuk kedua algoritma, hasil cuma doc_id
+        start = time.time()
+        ranked = search_engine.multi_search_ids(query, top_k=top_k, scorers=("tfidf", "bm25"))
+        shared_time = (time.time() - start) * 1000  # Convert to ms
+
+        tfidf_eval = evaluator.evaluate_single_query(query, ranked["tfidf"])
+        bm25_eval = evaluator.evaluate_single_query(query, ranked["bm25"])
+        # Runtime = waktu satu traversal gabungan (dipakai bersama kedua algoritma)
+        for result in (tfidf_eval, bm25_eval):
+            result["runtime"] = shared_time
+            result["runtime_shared"] = True
+    else:
+        # TF-IDF search
+        start = time.time()
+        tfidf_results = search_engine.search(query, algo="tfidf", top_k=top_k)
+        tfidf_time = (time.time() - start) * 1000  # Convert to ms
+        tfidf_ids = [r["doc_id"] for r in tfidf_results]
+        tfidf_eval = evaluator.evaluate_single_query(query, tfidf_ids)
+        tfidf_eval["runtime"] = tfidf_time
+
+        # BM25 search
+        start = time.time()
+        bm25_results = search_engine.search(query, algo="bm25", top_k=top_k)
+        bm25_time = (time.time() - start) * 1000  # Convert to ms
+        bm25_ids = [r["doc_id"] for r in bm25_results]
+        bm25_eval = evaluator.evaluate_single_query(query, bm25_ids)
+        bm25_eval["runtime"] = bm25_time
     
     return {
         "query": query,
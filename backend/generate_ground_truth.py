@@ -3,11 +3,9 @@ Script untuk generate ground truth sederhana berdasarkan keyword matching
 Ground truth ini digunakan untuk evaluasi TF-IDF vs BM25
 """
 import json
-import pandas as pd
 import re
 
-# Load corpus
-corpus = pd.read_csv("data/corpus_clean.csv")
+from artifacts import read_table
 
 # Query test dengan keyword yang relevan
 test_queries = {
@@ -63,23 +61,32 @@ def generate_relevance_judgments(query_keywords, corpus_df, min_keywords=1):
     
     return relevant_docs
 
-# Generate ground truth untuk semua query
-ground_truth = {}
 
-print("Generating ground truth...")
-print("=" * 80)
+def main():
+    # Load corpus
+    corpus = read_table("data/corpus_clean.csv")
 
-for query, keywords in test_queries.items():
-    relevant_docs = generate_relevance_judgments(keywords, corpus)
-    ground_truth[query] = relevant_docs
-    print(f"Query: '{query}' -> {len(relevant_docs)} relevant documents")
+    # Generate ground truth untuk semua query
+    ground_truth = {}
 
-# Simpan ground truth
-with open("data/ground_truth.json", "w", encoding="utf-8") as f:
-    json.dump(ground_truth, f, ensure_ascii=False, indent=2)
+    print("Generating ground truth...")
+    print("=" * 80)
 
-print("\n" + "=" * 80)
-print(f"✅ Ground truth berhasil disimpan ke data/ground_truth.json")
-print(f"Total queries: {len(ground_truth)}")
-print(f"Total relevant documents: {sum(len(v) for v in ground_truth.values())}")
-print(f"Average relevant docs per query: {sum(len(v) for v in ground_truth.values()) / len(ground_truth):.1f}")
+    for query, keywords in test_queries.items():
+        relevant_docs = generate_relevance_judgments(keywords, corpus)
+        ground_truth[query] = relevant_docs
+        print(f"Query: '{query}' -> {len(relevant_docs)} relevant documents")
+
+    # Simpan ground truth
+    with open("data/ground_truth.json", "w", encoding="utf-8") as f:
+        json.dump(ground_truth, f, ensure_ascii=False, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"✅ Ground truth berhasil disimpan ke data/ground_truth.json")
+    print(f"Total queries: {len(ground_truth)}")
+    print(f"Total relevant documents: {sum(len(v) for v in ground_truth.values())}")
+    print(f"Average relevant docs per query: {sum(len(v) for v in ground_truth.values()) / len(ground_truth):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Layer HTTP bersama untuk crawling.py, scrape_articles.py, backfill_all_images.py
+dan rescrape_images.py.
+
+- get_session()         : satu requests.Session per proses (keep-alive, pool per
+                          host, retry 429/5xx dengan backoff + jitter, timeout default)
+- async_session()       : aiohttp.ClientSession dengan satu TCPConnector bersama
+                          (limit total & per host, DNS cache, keep-alive)
+- Accept-Encoding gzip/deflate (+ br kalau paket Brotli terpasang)
+- handshake_stats()     : jumlah koneksi baru (TCP+TLS handshake) vs request,
+                          supaya efek connection reuse kelihatan
+"""
+from __future__ import annotations
+
+import os
+import random
+from typing import Optional
+
+from config import MAX_CONCURRENT_TASKS, MAX_RETRIES, REQUEST_TIMEOUT
+
+CONNECT_TIMEOUT = 5
+LIMIT_PER_HOST = 8           # koneksi paralel maksimal ke satu host
+DNS_CACHE_SECONDS = 300
+KEEPALIVE_SECONDS = 30
+BACKOFF_FACTOR = 0.5         # 0.5, 1, 2, ... detik (+ jitter)
+BACKOFF_JITTER = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+try:
+    import brotli  # noqa: F401  (dipakai urllib3/aiohttp untuk decode br)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff + jitter acak untuk retry ke-`attempt` (mulai 0)."""
+    return BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, BACKOFF_JITTER)
+
+
+# ========== SYNC (requests) ==========
+
+_session = None
+_session_pid = None
+_async_stats = {"connections": 0, "requests": 0}
+
+
+def _retry_policy():
+    from urllib3.util.retry import Retry
+
+    kwargs = dict(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=BACKOFF_JITTER, **kwargs)
+    except TypeError:  # urllib3 < 2 belum punya backoff_jitter
+        return Retry(**kwargs)
+
+
+def get_session():
+    """
+    requests.Session bersama untuk proses ini (dibuat ulang setelah fork,
+    karena socket pool tidak boleh dipakai bersama antar proses).
+    """
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class _Session(requests.Session):
+        def request(self, method, url, **kwargs):
+            kwargs.setdefault("timeout", (CONNECT_TIMEOUT, REQUEST_TIMEOUT))
+            return super().request(method, url, **kwargs)
+
+    session = _Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=LIMIT_PER_HOST,
+        max_retries=_retry_policy(),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    _session, _session_pid = session, os.getpid()
+    return session
+
+
+def fetch_text(url: str, session=None) -> Optional[str]:
+    """GET url, return HTML kalau status 200 (None kalau gagal)."""
+    session = session or get_session()
+    try:
+        res = session.get(url)
+        if res.status_code == 200:
+            return res.text
+        print(f"[STATUS {res.status_code}] {url}")
+        return None
+    except Exception as e:
+        print(f"[ERROR] {url} -> {e}")
+        return None
+
+
+def _sync_stats() -> dict:
+    connections = requests_made = 0
+    if _session is None or _session_pid != os.getpid():
+        return {"connections": 0, "requests": 0}
+    # adapter yang sama di-mount untuk http:// dan https://
+    adapters = {id(a): a for a in _session.adapters.values()}.values()
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_made += pool.num_requests
+    return {"connections": connections, "requests": requests_made}
+
+
+# ========== ASYNC (aiohttp) ==========
+
+def _trace_config():
+    import aiohttp
+
+    async def on_connection_create_end(session, ctx, params):
+        _async_stats["connections"] += 1
+
+    async def on_request_end(session, ctx, params):
+        _async_stats["requests"] += 1
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+def async_session(limit: int = MAX_CONCURRENT_TASKS, limit_per_host: int = LIMIT_PER_HOST):
+    """
+    aiohttp.ClientSession dengan satu connector bersama. Buat sekali per event
+    loop dan pakai di semua worker (`async with async_session() as session`).
+    """
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=DNS_CACHE_SECONDS,
+        use_dns_cache=True,
+        keepalive_timeout=KEEPALIVE_SECONDS,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=HEADERS,
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        trace_configs=[_trace_config()],
+    )
+
+
+# ========== STATISTIK ==========
+
+def handshake_stats() -> dict:
+    """Koneksi baru (handshake) vs request, sync + async digabung."""
+    sync = _sync_stats()
+    connections = sync["connections"] + _async_stats["connections"]
+    requests_made = sync["requests"] + _async_stats["requests"]
+    return {
+        "connections": connections,
+        "requests": requests_made,
+        "handshakes_per_request": connections / requests_made if requests_made else 0.0,
+    }
+
+
+def print_handshake_stats() -> None:
+    stats = handshake_stats()
+    print(
+        f"[HTTP] {stats['requests']} request, {stats['connections']} koneksi baru "
+        f"({stats['handshakes_per_request']:.3f} handshake/request)"
+    )
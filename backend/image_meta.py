@@ -0,0 +1,219 @@
+"""
+Ekstraksi URL gambar artikel untuk backfill_all_images.py & rescrape_images.py.
+
+Gambar hampir selalu ada di <head> (og:image / twitter:image), jadi mode
+default hanya membaca awal halaman: response di-stream per chunk dan
+berhenti begitu prefix pasti memberi hasil yang sama dengan parse seluruh
+dokumen: </head> berisi meta gambar, atau <img> layak pertama di dalam
+container article/content. Kalau tidak, body dibaca sampai habis.
+
+Fetch jalan concurrent (aiohttp, satu pool dari http_client.py) dengan
+politeness per host dari crawl_scheduler.HostScheduler. Halaman yang sudah
+ada di page store crawler dipakai langsung tanpa request.
+
+full=True membaca seluruh body seperti script lama (pembanding byte/artikel).
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from config import PER_DOMAIN_DELAY, PER_DOMAIN_BURST
+from crawl_frontier import url_host
+from crawl_scheduler import HostScheduler, next_ready_host, parse_retry_after
+from http_client import async_session
+from page_store import PageStore
+
+CHUNK_SIZE = 8 * 1024
+DEFAULT_CONCURRENCY = 16
+# Chunk baru dicek ulang hanya kalau (bersama ekor chunk sebelumnya) memuat tag ini
+RECHECK_OVERLAP = 2048
+
+_HEAD_END_RE = re.compile(rb"</head\s*>", re.I)
+_META_IMAGE_RE = re.compile(rb"""["'](?:og:image|twitter:image)["']""", re.I)
+_RECHECK_RE = re.compile(rb"<img\b|</head", re.I)
+
+
+def _meta_image(soup) -> str:
+    # Prioritas 1: Open Graph image
+    og_image = soup.find("meta", attrs={"property": "og:image"})
+    if og_image and og_image.get("content"):
+        return og_image["content"].strip()
+
+    # Prioritas 2: Twitter card
+    twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
+    if twitter_image and twitter_image.get("content"):
+        return twitter_image["content"].strip()
+    return ""
+
+
+def _article_image(soup) -> str:
+    # Prioritas 3: First image in article
+    article_containers = soup.find_all(["article", "div"], class_=lambda x: x and ('article' in x.lower() or 'content' in x.lower()))
+    for container in article_containers:
+        img = container.find("img", src=True)
+        if img and img.get("src"):
+            src = img["src"].strip()
+            if not src.startswith('data:') and 'icon' not in src.lower() and 'logo' not in src.lower():
+                return src
+    return ""
+
+
+def extract_images(soup):
+    """Ekstrak URL gambar dari artikel"""
+    src = _meta_image(soup) or _article_image(soup)
+    if src:
+        return src
+
+    # Fallback: first image
+    img = soup.find("img", src=True)
+    if img and img.get("src"):
+        src = img["src"].strip()
+        if not src.startswith('data:'):
+            return src
+
+    return ""
+
+
+def image_from_html(html: str) -> str:
+    return extract_images(BeautifulSoup(html, "html.parser"))
+
+
+def head_prefix_complete(buf: bytes) -> bool:
+    """
+    True kalau extract_images() atas prefix ini pasti sama dengan atas
+    dokumen penuh:
+    - </head> terbaca dan meta og:image/twitter:image di head punya content, atau
+    - prioritas 3 (container article/content pertama dengan <img> layak)
+      sudah ketemu. Container yang lebih awal dan belum ditutup pasti
+      memuat container ini, jadi hasilnya tidak bisa berubah oleh sisa body.
+    Prefix dipotong di '>' terakhir supaya tag yang terpotong tidak di-parse.
+    Meta gambar di luar <head> (HTML tidak valid) diabaikan.
+    """
+    head_end = _HEAD_END_RE.search(buf)
+    if head_end is not None and _META_IMAGE_RE.search(buf, 0, head_end.start()):
+        head = BeautifulSoup(bytes(buf[:head_end.end()]), "html.parser")
+        if _meta_image(head):
+            return True
+    if head_end is None:
+        return False
+    last_tag_end = buf.rfind(b">")
+    return bool(_article_image(BeautifulSoup(bytes(buf[:last_tag_end + 1]), "html.parser")))
+
+
+async def fetch_image_prefix(session, url: str, scheduler: HostScheduler,
+                             full: bool = False) -> Tuple[Optional[str], int]:
+    """
+    Stream HTML sampai head_prefix_complete() (atau seluruh body kalau full /
+    gambar belum pasti sampai body habis).
+    Return (html prefix atau None kalau gagal, byte body yang dibaca).
+    Token host untuk request ini diambil pemanggil (next_host).
+    """
+    host = url_host(url)
+    start = time.monotonic()
+    try:
+        async with session.get(url) as res:
+            scheduler.feedback(
+                host, res.status, time.monotonic() - start,
+                parse_retry_after(res.headers.get("Retry-After")),
+            )
+            if res.status != 200:
+                print(f"[STATUS {res.status}] {url}")
+                return None, 0
+
+            buf = bytearray()
+            async for chunk in res.content.iter_chunked(CHUNK_SIZE):
+                buf += chunk
+                if full:
+                    continue
+                # Parse ulang hanya kalau chunk ini membawa <img / </head
+                tail = buf[max(0, len(buf) - len(chunk) - RECHECK_OVERLAP):]
+                if _RECHECK_RE.search(tail) and head_prefix_complete(buf):
+                    # Sisa body tidak dibaca; koneksi ditutup saat keluar dari context
+                    break
+            return bytes(buf).decode(res.charset or "utf-8", errors="replace"), len(buf)
+    except Exception as e:
+        scheduler.feedback(host, None, time.monotonic() - start)
+        print(f"[FAILED] {url} -> {e}")
+        return None, 0
+
+
+async def _fetch_all(urls: Iterable[str], concurrency: int, full: bool,
+                     results: Dict[str, str], stats: Counter) -> None:
+    by_host = defaultdict(deque)
+    for url in urls:
+        by_host[url_host(url)].append(url)
+
+    scheduler = HostScheduler(base_delay=PER_DOMAIN_DELAY, burst=PER_DOMAIN_BURST)
+    session = async_session(limit=concurrency)
+
+    async def worker():
+        while True:
+            hosts = [h for h, queue in by_host.items() if queue]
+            if not hosts:
+                return
+            host = await next_ready_host(session, scheduler, hosts)
+            if host is None:
+                continue
+
+            url = by_host[host].popleft()
+            html, n_bytes = await fetch_image_prefix(session, url, scheduler, full=full)
+            if html is None:
+                stats["failed"] += 1
+                continue
+            stats["fetched"] += 1
+            stats["bytes"] += n_bytes
+            results[url] = image_from_html(html)
+
+            done = stats["fetched"] + stats["failed"]
+            if done % 100 == 0:
+                print(f"[PROGRESS] {done} artikel di-fetch, "
+                      f"rata-rata {stats['bytes'] / max(stats['fetched'], 1) / 1024:.1f} KB/artikel")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await session.close()
+
+
+def fetch_images(urls: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                 full: bool = False, store: Optional[PageStore] = None) -> Tuple[Dict[str, str], Counter]:
+    """
+    URL gambar untuk setiap URL artikel ("" kalau tidak ada gambar).
+    URL yang gagal di-fetch tidak ada di hasil. stats: from_store, fetched,
+    failed, bytes (body yang dibaca dari jaringan), seconds.
+    """
+    start = time.time()
+    results: Dict[str, str] = {}
+    stats: Counter = Counter()
+
+    todo = []
+    for url in dict.fromkeys(urls):
+        html = store.get_html(url) if store is not None else None
+        if html is None:
+            todo.append(url)
+            continue
+        results[url] = image_from_html(html)
+        stats["from_store"] += 1
+
+    if todo:
+        asyncio.run(_fetch_all(todo, concurrency, full, results, stats))
+    stats["seconds"] = time.time() - start
+    return results, stats
+
+
+def print_fetch_stats(stats: Counter, total: int, full: bool) -> None:
+    elapsed = stats["seconds"]
+    fetched = stats["fetched"]
+    mode = "full body" if full else "head-only"
+    print(f"   🗄️  Dari page store: {stats['from_store']}")
+    print(f"   🌐 Di-fetch ({mode}): {fetched}, gagal {stats['failed']}")
+    if fetched:
+        print(f"   📦 Byte dibaca: {stats['bytes'] / 1e6:.2f} MB "
+              f"({stats['bytes'] / fetched / 1024:.1f} KB/artikel)")
+    print(f"   📈 Speed: {total / elapsed if elapsed else 0:.1f} artikel/detik")
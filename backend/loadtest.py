@@ -0,0 +1,391 @@
+"""
+HTTP load test untuk api.py (Flask) secara lokal / offline.
+
+Me-replay file query ke /search, /document/<id> dan /evaluate dengan
+campuran endpoint & algoritma yang bisa diatur. Dua mode:
+
+- closed-loop : --concurrency N worker, masing-masing kirim request berikutnya
+                setelah response sebelumnya selesai
+- open-loop   : --rate R request/detik dengan jadwal kedatangan tetap/Poisson,
+                latency dihitung dari waktu jadwal (bukan waktu kirim) supaya
+                antrian di sisi client ikut terukur
+
+--sweep-rates menjalankan open-loop dengan rate bertahap dan melaporkan
+saturation point (rate pertama di mana throughput tertinggal dari rate yang
+diminta, p99 melewati SLO, atau error rate naik).
+
+Contoh:
+    python loadtest.py --start-server --concurrency 8 --duration 20
+    python loadtest.py --rate 50 --duration 30 --mix search=0.8,document=0.2
+    python loadtest.py --start-server --sweep-rates 10,25,50,100,200 --slo-ms 500
+    python loadtest.py --start-server --top-k 100 --fields lean --accept-encoding "br, gzip"
+
+Kolom KB = byte body di wire (setelah kompresi kalau --accept-encoding).
+"""
+import argparse
+import http.client
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+# ========== UTIL ==========
+
+def parse_mix(spec: str) -> dict:
+    """'search=0.7,document=0.2' -> {'search': 0.7, 'document': 0.2}"""
+    mix = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Mix tidak valid: {spec!r}")
+    return mix
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(records: list, elapsed: float) -> dict:
+    """Ringkas list record (endpoint, status, latency_s, nbytes) per endpoint."""
+    by_endpoint = defaultdict(list)
+    for rec in records:
+        by_endpoint[rec[0]].append(rec)
+        by_endpoint["ALL"].append(rec)
+
+    summary = {}
+    for endpoint, recs in by_endpoint.items():
+        latencies = sorted(r[2] * 1000 for r in recs)
+        errors = sum(1 for r in recs if r[1] is None or r[1] >= 400)
+        stats = {
+            "requests": len(recs),
+            "errors": errors,
+            "error_rate": errors / len(recs) if recs else 0.0,
+            "throughput_rps": len(recs) / elapsed if elapsed else 0.0,
+            "bytes_mean": statistics.fmean(r[3] for r in recs) if recs else 0.0,
+            "latency_ms": {
+                "mean": statistics.fmean(latencies) if latencies else 0.0,
+                "max": latencies[-1] if latencies else 0.0,
+            },
+        }
+        for pct in PERCENTILES:
+            stats["latency_ms"][f"p{pct}"] = _percentile(latencies, pct)
+        summary[endpoint] = stats
+    return summary
+
+
+def print_summary(summary: dict, title: str):
+    print(f"\n=== {title} ===")
+    print(f"{'endpoint':<10} {'req':>7} {'rps':>8} {'err%':>6} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'KB':>7}")
+    for endpoint in sorted(summary, key=lambda e: (e == "ALL", e)):
+        s = summary[endpoint]
+        lat = s["latency_ms"]
+        print(f"{endpoint:<10} {s['requests']:>7} {s['throughput_rps']:>8.1f} "
+              f"{s['error_rate'] * 100:>5.1f}% {lat['p50']:>8.1f} {lat['p90']:>8.1f} "
+              f"{lat['p99']:>8.1f} {lat['max']:>8.1f} {s['bytes_mean'] / 1024:>7.1f}")
+
+
+# ========== CLIENT ==========
+
+class LoadClient:
+    """
+    Generator request. Setiap thread punya koneksi keep-alive sendiri
+    (http.client), jadi yang terukur adalah server, bukan handshake TCP.
+    """
+
+    def __init__(self, base_url: str, queries: list, mix: dict, algo_mix: dict,
+                 top_k: int, seed: int, timeout: float, fields: str = "",
+                 accept_encoding: str = ""):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.queries = queries
+        self.endpoints = list(mix)
+        self.endpoint_weights = list(mix.values())
+        self.algos = list(algo_mix)
+        self.algo_weights = list(algo_mix.values())
+        self.top_k = top_k
+        self.fields = fields
+        self.headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.doc_ids = []
+        self.local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.local.conn = conn
+        return conn
+
+    def get(self, path: str, headers: dict = None):
+        """GET path; return (status, body_bytes). Status None kalau koneksi gagal."""
+        for attempt in range(2):
+            conn = self._conn()
+            try:
+                conn.request("GET", path, headers=self.headers if headers is None else headers)
+                res = conn.getresponse()
+                body = res.read()
+                return res.status, body
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self.local.conn = None
+                if attempt == 1:
+                    return None, b""
+        return None, b""
+
+    def next_request(self) -> tuple:
+        """Pilih (endpoint, path) berikutnya sesuai mix."""
+        with self.rng_lock:
+            endpoint = self.rng.choices(self.endpoints, self.endpoint_weights)[0]
+            query = self.rng.choice(self.queries)
+            algo = self.rng.choices(self.algos, self.algo_weights)[0]
+            doc_id = self.rng.choice(self.doc_ids) if self.doc_ids else 0
+
+        if endpoint == "search":
+            params = {"query": query, "algo": algo, "top_k": self.top_k}
+            if self.fields:
+                params["fields"] = self.fields
+            return endpoint, "/search?" + urlencode(params)
+        if endpoint == "document":
+            return endpoint, f"/document/{doc_id}"
+        if endpoint == "evaluate":
+            return endpoint, "/evaluate?" + urlencode({"query": query, "top_k": self.top_k})
+        raise ValueError(f"Endpoint tidak dikenal: {endpoint}")
+
+    def warmup(self):
+        """Panggil /search sekali per query untuk mengumpulkan doc_id valid."""
+        doc_ids = set()
+        for query in self.queries:
+            # Tanpa kompresi supaya body bisa langsung di-parse
+            status, body = self.get("/search?" + urlencode({"query": query, "top_k": self.top_k}),
+                                    headers={})
+            if status == 200:
+                try:
+                    doc_ids.update(r["doc_id"] for r in json.loads(body))
+                except (ValueError, KeyError, TypeError):
+                    pass
+        self.doc_ids = sorted(doc_ids)
+        print(f"[INFO] Warmup selesai: {len(self.queries)} query, {len(self.doc_ids)} doc_id")
+
+    def execute(self, scheduled: float = None) -> tuple:
+        endpoint, path = self.next_request()
+        start = time.perf_counter()
+        status, body = self.get(path)
+        end = time.perf_counter()
+        # Open-loop: latency dihitung dari waktu jadwal (hindari coordinated omission)
+        origin = scheduled if scheduled is not None else start
+        return endpoint, status, end - origin, len(body)
+
+
+# ========== MODES ==========
+
+def run_closed_loop(client: LoadClient, concurrency: int, duration: float) -> dict:
+    records = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def _worker():
+        local_records = []
+        while time.perf_counter() < deadline:
+            local_records.append(client.execute())
+        with lock:
+            records.extend(local_records)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return summarize(records, elapsed)
+
+
+def run_open_loop(client: LoadClient, rate: float, duration: float,
+                  max_inflight: int, poisson: bool, seed: int) -> dict:
+    rng = random.Random(seed)
+    records = []
+    lock = threading.Lock()
+
+    def _task(scheduled):
+        rec = client.execute(scheduled)
+        with lock:
+            records.append(rec)
+
+    start = time.perf_counter()
+    next_time = start
+    end_time = start + duration
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        while next_time < end_time:
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_task, next_time)
+            next_time += rng.expovariate(rate) if poisson else 1.0 / rate
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(records, elapsed)
+    summary["ALL"]["offered_rps"] = rate
+    return summary
+
+
+def find_saturation(sweep: list, slo_ms: float, max_error_rate: float) -> dict:
+    """
+    Saturation point = rate pertama yang:
+    - throughput < 95% rate yang diminta, atau
+    - p99 > SLO, atau
+    - error rate > batas
+    """
+    for entry in sweep:
+        total = entry["summary"]["ALL"]
+        reasons = []
+        if total["throughput_rps"] < 0.95 * entry["rate"]:
+            reasons.append("throughput tertinggal")
+        if total["latency_ms"]["p99"] > slo_ms:
+            reasons.append(f"p99 > {slo_ms:.0f} ms")
+        if total["error_rate"] > max_error_rate:
+            reasons.append("error rate tinggi")
+        if reasons:
+            return {"rate": entry["rate"], "reasons": reasons}
+    return {"rate": None, "reasons": ["tidak tercapai pada rate yang diuji"]}
+
+
+# ========== SERVER LOKAL ==========
+
+def start_local_server(port: int):
+    """Jalankan api.app di thread background (threaded WSGI server)."""
+    from werkzeug.serving import make_server
+
+    from api import app
+
+    # Log per-request werkzeug bikin output penuh dan ikut memperlambat server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"[INFO] Server lokal jalan di http://127.0.0.1:{port}")
+    return server
+
+
+def load_queries(path: str) -> list:
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    from generate_ground_truth import test_queries
+    return list(test_queries.keys())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test lokal untuk api.py")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--start-server", action="store_true",
+                        help="Jalankan api.py di proses ini (offline, tanpa server terpisah)")
+    parser.add_argument("--port", type=int, default=5055, help="Port untuk --start-server")
+    parser.add_argument("--queries", help="File query, 1 per baris (default: query ground truth)")
+    parser.add_argument("--mix", default="search=0.8,document=0.15,evaluate=0.05")
+    parser.add_argument("--algo-mix", default="tfidf=0.5,bm25=0.5")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--fields", default="",
+                        help="Parameter fields= untuk /search (mis. ids, lean, -snippet)")
+    parser.add_argument("--accept-encoding", default="",
+                        help="Header Accept-Encoding, mis. 'br, gzip' (default tanpa kompresi)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop worker")
+    parser.add_argument("--rate", type=float, help="Open-loop: request per detik")
+    parser.add_argument("--poisson", action="store_true", help="Kedatangan Poisson (open-loop)")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--sweep-rates", help="Daftar rate open-loop, mis. 10,25,50,100")
+    parser.add_argument("--slo-ms", type=float, default=1000.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if args.start_server:
+        server = start_local_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    client = LoadClient(
+        base_url,
+        load_queries(args.queries),
+        parse_mix(args.mix),
+        parse_mix(args.algo_mix),
+        args.top_k,
+        args.seed,
+        args.timeout,
+        args.fields,
+        args.accept_encoding,
+    )
+    client.warmup()
+
+    report = {
+        "base_url": base_url,
+        "mix": parse_mix(args.mix),
+        "algo_mix": parse_mix(args.algo_mix),
+        "top_k": args.top_k,
+        "fields": args.fields,
+        "accept_encoding": args.accept_encoding,
+        "duration": args.duration,
+    }
+
+    try:
+        if args.sweep_rates:
+            sweep = []
+            for rate in [float(r) for r in args.sweep_rates.split(",") if r.strip()]:
+                summary = run_open_loop(client, rate, args.duration, args.max_inflight,
+                                        args.poisson, args.seed)
+                print_summary(summary, f"OPEN-LOOP {rate:g} req/s")
+                sweep.append({"rate": rate, "summary": summary})
+            saturation = find_saturation(sweep, args.slo_ms, args.max_error_rate)
+            report.update({"mode": "sweep", "sweep": sweep, "saturation": saturation})
+            if saturation["rate"] is None:
+                print("\n[RESULT] Saturation point tidak tercapai pada rate yang diuji")
+            else:
+                print(f"\n[RESULT] Saturation point: ~{saturation['rate']:g} req/s "
+                      f"({', '.join(saturation['reasons'])})")
+        elif args.rate:
+            summary = run_open_loop(client, args.rate, args.duration, args.max_inflight,
+                                    args.poisson, args.seed)
+            print_summary(summary, f"OPEN-LOOP {args.rate:g} req/s")
+            report.update({"mode": "open", "rate": args.rate, "summary": summary})
+        else:
+            summary = run_closed_loop(client, args.concurrency, args.duration)
+            print_summary(summary, f"CLOSED-LOOP concurrency={args.concurrency}")
+            report.update({"mode": "closed", "concurrency": args.concurrency, "summary": summary})
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[SUCCESS] Hasil load test disimpan ke: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
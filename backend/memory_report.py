@@ -0,0 +1,150 @@
+"""
+Laporan memori struktur data search engine: sebelum vs sesudah compact index.
+
+"Sebelum" = representasi lama search_engine.py (DOC_META_DF + DOC_META
+dict-of-dicts, CORPUS_DF + CORPUS_BY_URL, INVERTED_INDEX dict-of-dicts,
+DF_MAP, IDF_TFIDF, IDF_BM25), dibangun ulang di sini khusus untuk diukur.
+"Sesudah" = TermDictionary + DocStore dari compact_index.py.
+
+Ukuran objek Python dihitung rekursif (sys.getsizeof + isi container),
+DataFrame pakai memory_usage(deep=True).
+
+Contoh:
+    python memory_report.py
+    python memory_report.py --output data/memory_report.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from artifacts import read_table
+from compact_index import _parse_postings, load_compact_index
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.environ.get("SIPAPA_DATA_DIR", BASE_DIR / "data"))
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """Total byte objek + semua isinya (dict/list/tuple/set), objek dihitung sekali."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += deep_sizeof(k, seen) + deep_sizeof(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    return size
+
+
+def legacy_structures(data_dir: Path) -> dict:
+    """Bangun ulang struktur lama search_engine.py dan ukur masing-masing."""
+    sizes = {}
+
+    doc_meta_df = read_table(data_dir / "doc_meta.csv", verbose=False)
+    doc_meta = {
+        int(row["doc_id"]): {
+            "doc_id": int(row["doc_id"]),
+            "title": row["title"],
+            "url": row["url"],
+            "doc_len": int(row["doc_len"]),
+        }
+        for _, row in doc_meta_df.iterrows()
+    }
+    sizes["DOC_META_DF"] = int(doc_meta_df.memory_usage(deep=True).sum())
+    sizes["DOC_META"] = deep_sizeof(doc_meta)
+
+    corpus_df = read_table(data_dir / "corpus_clean_v2.csv", verbose=False)
+    corpus_by_url = {
+        str(row["url"]): {
+            "content_final": str(row.get("content_final", "")),
+            "image_url": "" if pd.isna(row.get("image_url")) else str(row.get("image_url", "")),
+        }
+        for _, row in corpus_df.iterrows()
+    }
+    sizes["CORPUS_DF"] = int(corpus_df.memory_usage(deep=True).sum())
+    sizes["CORPUS_BY_URL"] = deep_sizeof(corpus_by_url)
+    del corpus_df, corpus_by_url, doc_meta_df
+
+    with (data_dir / "inverted_index.json").open("r", encoding="utf-8") as f:
+        raw_index = json.load(f)
+    inverted_index = {term: _parse_postings(p) for term, p in raw_index.items()}
+    del raw_index
+
+    n = len(doc_meta)
+    df_map = {term: len(postings) for term, postings in inverted_index.items()}
+    idf_tfidf = {}
+    idf_bm25 = {}
+    for term, df in df_map.items():
+        df = max(1, df)
+        idf_tfidf[term] = math.log(n / df)
+        idf_bm25[term] = math.log((n - df + 0.5) / (df + 0.5) + 1)
+
+    # Key term di-share antar dict; hitung string term sekali di INVERTED_INDEX
+    seen = set()
+    sizes["INVERTED_INDEX"] = deep_sizeof(inverted_index, seen)
+    sizes["DF_MAP"] = deep_sizeof(df_map, seen)
+    sizes["IDF_TFIDF"] = deep_sizeof(idf_tfidf, seen)
+    sizes["IDF_BM25"] = deep_sizeof(idf_bm25, seen)
+    return sizes
+
+
+def compact_structures(data_dir: Path) -> dict:
+    terms, docs = load_compact_index(data_dir)
+    sizes = {}
+    sizes.update(terms.memory_breakdown())
+    sizes.update(docs.memory_breakdown())
+    return sizes
+
+
+def _print_table(title: str, sizes: dict):
+    total = sum(sizes.values())
+    print(f"\n=== {title} ===")
+    for name, nbytes in sorted(sizes.items(), key=lambda x: -x[1]):
+        share = nbytes / total * 100 if total else 0.0
+        print(f"{name:<20} {nbytes / 1e6:>10.2f} MB  {share:>5.1f}%")
+    print(f"{'TOTAL':<20} {total / 1e6:>10.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breakdown memori index sebelum vs sesudah")
+    parser.add_argument("--output", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    print(f"[INFO] Data dir: {DATA_DIR}")
+    before = legacy_structures(DATA_DIR)
+    after = compact_structures(DATA_DIR)
+
+    _print_table("SEBELUM (dict-of-dicts + DataFrame)", before)
+    _print_table("SESUDAH (compact index)", after)
+
+    total_before = sum(before.values())
+    total_after = sum(after.values())
+    ratio = total_before / total_after if total_after else float("inf")
+    print(f"\n[RESULT] Reduksi memori: {ratio:.1f}x "
+          f"({total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "before": before,
+                "after": after,
+                "total_before": total_before,
+                "total_after": total_after,
+                "reduction": ratio,
+            }, f, indent=2)
+        print(f"[SUCCESS] Laporan disimpan ke: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
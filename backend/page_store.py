@@ -0,0 +1,250 @@
+"""
+Penyimpanan halaman mentah terkompresi (mirip WARC) untuk crawler & scraper.
+
+Crawler menyimpan HTML yang di-fetch di sini, jadi scraping konten dan
+ekstraksi gambar bisa jalan offline tanpa download ulang.
+
+Layout di data/pages/:
+- pages-00000.gz, pages-00001.gz, ... : segmen append-only. Setiap record
+  adalah satu member gzip sendiri, jadi bisa dibaca langsung lewat offset:
+      b"PAGE/1\n" + header JSON (url, status, fetched_at, headers) + b"\n" + body
+- index.sqlite3 : url kanonik -> (segmen, offset, panjang, fetched_at, status, sha1,
+  etag, last_modified). sha1 + validator dipakai recrawl kondisional
+  (scrape_articles.py --recrawl) untuk If-None-Match / If-Modified-Since.
+
+Satu proses penulis (crawler / scraper online), banyak proses pembaca.
+Record baru untuk URL yang sama menggantikan entri index lama.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from url_canon import canonicalize_url
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent / "data" / "pages"
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+COMMIT_EVERY = 200
+MAGIC = b"PAGE/1\n"
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "date", "content-length")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url        TEXT PRIMARY KEY,
+    segment    INTEGER NOT NULL,
+    offset     INTEGER NOT NULL,
+    length     INTEGER NOT NULL,
+    fetched_at REAL    NOT NULL,
+    status     INTEGER NOT NULL,
+    sha1       TEXT    NOT NULL,
+    etag          TEXT,
+    last_modified TEXT
+);
+"""
+
+
+class Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha1: str
+
+
+class StoredPage(NamedTuple):
+    url: str
+    status: int
+    fetched_at: float
+    headers: dict
+    html: str
+
+
+def store_key(url: str) -> str:
+    return canonicalize_url(url) or url
+
+
+def content_sha1(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+
+def _gzip_member(data: bytes) -> bytes:
+    """Satu member gzip lengkap (bisa didekompres berdiri sendiri)."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class PageStore:
+    def __init__(self, root: Path = DEFAULT_STORE_DIR, readonly: bool = False):
+        self.root = Path(root)
+        self.readonly = readonly
+        if not readonly:
+            self.root.mkdir(parents=True, exist_ok=True)
+        index_path = self.root / "index.sqlite3"
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(str(index_path))
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+            self._migrate()
+
+        self._segment = None
+        self._segment_id = None
+        self._pending = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+
+    def _migrate(self) -> None:
+        """Store lama (sebelum recrawl kondisional) belum punya kolom validator."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self.conn.commit()
+
+    # ----- tulis -----
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.root / f"pages-{segment_id:05d}.gz"
+
+    def _open_segment(self):
+        if self._segment is not None and self._segment.tell() < SEGMENT_MAX_BYTES:
+            return
+        if self._segment is not None:
+            self._segment.close()
+            self._segment_id += 1
+        else:
+            existing = sorted(self.root.glob("pages-*.gz"))
+            self._segment_id = int(existing[-1].stem.split("-")[1]) if existing else 0
+            if existing and existing[-1].stat().st_size >= SEGMENT_MAX_BYTES:
+                self._segment_id += 1
+        self._segment = self._segment_path(self._segment_id).open("ab")
+
+    def put(self, url: str, html: str, headers: Optional[dict] = None,
+            status: int = 200, fetched_at: Optional[float] = None) -> str:
+        """Simpan satu halaman; return sha1 body (untuk deteksi perubahan)."""
+        key = store_key(url)
+        body = html.encode("utf-8")
+        sha1 = hashlib.sha1(body).hexdigest()
+        kept = {k.lower(): v for k, v in (headers or {}).items() if k.lower() in KEPT_HEADERS}
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        meta = json.dumps({"url": key, "status": status, "fetched_at": fetched_at, "headers": kept},
+                          ensure_ascii=False).encode("utf-8")
+        record = _gzip_member(MAGIC + meta + b"\n" + body)
+
+        self._open_segment()
+        offset = self._segment.tell()
+        self._segment.write(record)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, self._segment_id, offset, len(record), fetched_at, status, sha1,
+             kept.get("etag"), kept.get("last-modified")),
+        )
+        self.bytes_raw += len(body)
+        self.bytes_stored += len(record)
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.flush()
+        return sha1
+
+    def flush(self) -> None:
+        if self._segment is not None:
+            self._segment.flush()
+        if not self.readonly:
+            self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self.conn.close()
+
+    # ----- baca -----
+
+    def _read(self, segment: int, offset: int, length: int) -> StoredPage:
+        if self._segment is not None:
+            self._segment.flush()
+        with self._segment_path(segment).open("rb") as f:
+            f.seek(offset)
+            data = zlib.decompress(f.read(length), 31)
+        if not data.startswith(MAGIC):
+            raise ValueError(f"Record rusak di segmen {segment} offset {offset}")
+        meta_end = data.index(b"\n", len(MAGIC))
+        meta = json.loads(data[len(MAGIC):meta_end])
+        return StoredPage(
+            url=meta["url"],
+            status=meta["status"],
+            fetched_at=meta["fetched_at"],
+            headers=meta["headers"],
+            html=data[meta_end + 1:].decode("utf-8"),
+        )
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        row = self.conn.execute(
+            "SELECT segment, offset, length FROM pages WHERE url = ?", (store_key(url),)
+        ).fetchone()
+        return self._read(*row) if row else None
+
+    def get_html(self, url: str) -> Optional[str]:
+        page = self.get(url)
+        return page.html if page is not None else None
+
+    def sha1(self, url: str) -> Optional[str]:
+        row = self.conn.execute("SELECT sha1 FROM pages WHERE url = ?", (store_key(url),)).fetchone()
+        return row[0] if row else None
+
+    def validators(self, url: str) -> Optional[Validators]:
+        """ETag / Last-Modified / sha1 terakhir (tanpa dekompres record)."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, sha1 FROM pages WHERE url = ?", (store_key(url),)
+        ).fetchone()
+        return Validators(*row) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM pages WHERE url = ?", (store_key(url),)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def urls(self) -> list:
+        return [row[0] for row in self.conn.execute("SELECT url FROM pages ORDER BY segment, offset")]
+
+    def iter_pages(self) -> Iterator[StoredPage]:
+        """Semua halaman, urut segmen/offset (baca file berurutan)."""
+        rows = self.conn.execute(
+            "SELECT segment, offset, length FROM pages ORDER BY segment, offset"
+        ).fetchall()
+        for row in rows:
+            yield self._read(*row)
+
+    def stats(self) -> dict:
+        pages, disk = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM pages").fetchone()
+        return {"pages": pages, "stored_bytes": disk}
+
+
+# ========== AKSES DARI PROSES WORKER ==========
+# Setiap proses membuka reader sendiri (koneksi SQLite tidak boleh dipakai
+# bersama lintas proses).
+
+_READERS = {}
+
+
+def read_html(root: str, url: str) -> Optional[str]:
+    reader = _READERS.get(root)
+    if reader is None:
+        reader = _READERS[root] = PageStore(Path(root), readonly=True)
+    return reader.get_html(url)
+
+
+def open_default_store(readonly: bool = True) -> Optional[PageStore]:
+    """Store default kalau sudah ada (None kalau crawler belum pernah menyimpan)."""
+    if readonly and not (DEFAULT_STORE_DIR / "index.sqlite3").exists():
+        return None
+    return PageStore(DEFAULT_STORE_DIR, readonly=readonly)
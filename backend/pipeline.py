@@ -0,0 +1,301 @@
+"""
+Runner pipeline offline: scraped.csv -> corpus_clean / corpus_clean_v2 -> index
+-> compact_index.npz.
+
+Dulu urutannya dijalankan manual (lihat NEXT STEPS di backfill_all_images.py)
+dan setiap tahap selalu memproses ulang semuanya. Di sini setiap tahap
+mendeklarasikan input, output, dan file kode yang dipakainya:
+
+- Fingerprint tahap = sha1 dari isi input + kode + argumen. Kalau sama dengan
+  run terakhir dan output masih utuh (hash sama), tahap dilewati.
+- Hash file di-cache per (ukuran, mtime), jadi rerun tanpa perubahan cukup stat.
+- Tahap yang outputnya tidak berubah (hash sama) tidak memicu tahap berikutnya.
+- Tahap yang tidak saling bergantung (corpus_clean & corpus_clean_v2) jalan
+  paralel sebagai subprocess; log per tahap di data/logs/<tahap>.log.
+
+Scraping tidak termasuk (butuh jaringan, sudah resumable sendiri).
+
+    python pipeline.py                 # jalankan yang perlu saja
+    python pipeline.py --dry-run       # tampilkan rencana
+    python pipeline.py --changed       # teruskan --changed (hasil recrawl)
+    python pipeline.py --force indexing
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from artifacts import exists, resolve
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+STATE_FILE = DATA_DIR / "pipeline_state.json"
+LOG_DIR = DATA_DIR / "logs"
+CHANGED_FILE = DATA_DIR / "changed_urls.txt"
+
+
+class Stage(NamedTuple):
+    name: str
+    script: str
+    inputs: Tuple[str, ...]           # path artifact relatif BASE_DIR (.csv: Parquet ikut terdeteksi)
+    outputs: Tuple[str, ...]
+    code: Tuple[str, ...]             # modul lokal yang ikut menentukan output
+    incremental: bool = True          # script menerima --changed
+
+
+STAGES = (
+    Stage(
+        "corpus_clean", "quick_corpus_clean.py",
+        inputs=("data/scraped.csv",),
+        outputs=("data/corpus_clean.csv",),
+        code=("quick_corpus_clean.py", "near_dedup.py", "changed_docs.py", "artifacts.py"),
+    ),
+    Stage(
+        "corpus_clean_v2", "clean_corpus_v2.py",
+        inputs=("data/scraped.csv",),
+        outputs=("data/corpus_clean_v2.csv",),
+        code=("clean_corpus_v2.py", "text_cleaning.py", "near_dedup.py", "changed_docs.py",
+              "artifacts.py"),
+    ),
+    Stage(
+        "indexing", "quick_indexing.py",
+        inputs=("data/corpus_clean.csv",),
+        outputs=("data/doc_meta.csv", "data/inverted_index.json"),
+        code=("quick_indexing.py", "changed_docs.py", "artifacts.py"),
+    ),
+    Stage(
+        "compact", "compact_index.py",
+        inputs=("data/doc_meta.csv", "data/corpus_clean_v2.csv", "data/inverted_index.json"),
+        outputs=("data/compact_index.npz",),
+        code=("compact_index.py", "artifacts.py"),
+        incremental=False,
+    ),
+)
+
+# Output yang dibaca backend API: kalau berubah, API perlu di-restart
+RUNTIME_OUTPUTS = {"data/doc_meta.csv", "data/inverted_index.json", "data/compact_index.npz"}
+
+
+# ========== FINGERPRINT ==========
+
+class FileHasher:
+    """sha1 isi file, di-cache per (path, ukuran, mtime_ns) lintas run."""
+
+    def __init__(self, cache: Dict[str, list]):
+        self.cache = cache
+
+    def digest(self, path: Path) -> Optional[str]:
+        if not path.exists():
+            return None
+        st = path.stat()
+        key = os.path.relpath(path, BASE_DIR)
+        cached = self.cache.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        h = hashlib.sha1()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.cache[key] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def artifact(self, rel: str) -> Optional[str]:
+        """Hash artifact (file Parquet / CSV yang akan dibaca tahap berikutnya)."""
+        path = BASE_DIR / rel
+        if not exists(path):
+            return None
+        try:
+            source = resolve(path)
+        except ImportError:
+            source = path
+        return f"{source.suffix}:{self.digest(source)}"
+
+
+def stage_fingerprint(stage: Stage, hasher: FileHasher, extra_args: Sequence[str]) -> str:
+    h = hashlib.sha1()
+    h.update(json.dumps([stage.name, stage.script, list(extra_args)]).encode())
+    for rel in stage.inputs:
+        h.update(f"in {rel} {hasher.artifact(rel)}\n".encode())
+    if "--changed" in extra_args:
+        h.update(f"in changed {hasher.digest(CHANGED_FILE)}\n".encode())
+    for rel in stage.code:
+        h.update(f"code {rel} {hasher.digest(BASE_DIR / rel)}\n".encode())
+    return h.hexdigest()
+
+
+def output_digests(stage: Stage, hasher: FileHasher) -> Dict[str, Optional[str]]:
+    return {rel: hasher.artifact(rel) for rel in stage.outputs}
+
+
+def up_to_date(stage: Stage, record: Optional[dict], fingerprint: str, hasher: FileHasher) -> bool:
+    if not record or record.get("fingerprint") != fingerprint:
+        return False
+    current = output_digests(stage, hasher)
+    return None not in current.values() and current == record.get("outputs")
+
+
+# ========== STATE ==========
+
+def load_state() -> dict:
+    if not STATE_FILE.exists():
+        return {"stages": {}, "files": {}}
+    with STATE_FILE.open("r", encoding="utf-8") as f:
+        state = json.load(f)
+    state.setdefault("stages", {})
+    state.setdefault("files", {})
+    return state
+
+
+def save_state(state: dict) -> None:
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+
+# ========== EKSEKUSI ==========
+
+def dependencies(stages: Sequence[Stage]) -> Dict[str, set]:
+    """Tahap -> tahap lain yang outputnya jadi input tahap ini."""
+    producer = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producer[i] for i in s.inputs if i in producer} for s in stages}
+
+
+def run_stage(stage: Stage, extra_args: Sequence[str]) -> Tuple[int, float, Path]:
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{stage.name}.log"
+    start = time.perf_counter()
+    with log_path.open("w", encoding="utf-8") as log:
+        proc = subprocess.run(
+            [sys.executable, stage.script, *extra_args],
+            cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+    return proc.returncode, time.perf_counter() - start, log_path
+
+
+def _tail(path: Path, lines: int = 15) -> str:
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def run_pipeline(force: Sequence[str] = (), changed: bool = False, jobs: int = 2,
+                 dry_run: bool = False) -> bool:
+    """Jalankan tahap yang perlu. Return False kalau ada tahap yang gagal."""
+    state = load_state()
+    hasher = FileHasher(state["files"])
+    deps = dependencies(STAGES)
+    force_all = "all" in force
+
+    status: Dict[str, str] = {}
+    seconds: Dict[str, float] = {}
+    changed_outputs: set = set()
+    pipeline_start = time.perf_counter()
+
+    def stage_args(stage: Stage) -> list:
+        return ["--changed"] if changed and stage.incremental else []
+
+    def decide(stage: Stage) -> Optional[str]:
+        """Fingerprint kalau tahap harus jalan, None kalau bisa dilewati."""
+        extra_args = stage_args(stage)
+        fingerprint = stage_fingerprint(stage, hasher, extra_args)
+        if force_all or stage.name in force:
+            return fingerprint
+        if dry_run and deps[stage.name] & {n for n, st in status.items() if st == "akan jalan"}:
+            return fingerprint
+        if up_to_date(stage, state["stages"].get(stage.name), fingerprint, hasher):
+            return None
+        return fingerprint
+
+    pending = list(STAGES)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        while pending or running:
+            for stage in list(pending):
+                dep_status = {status.get(d) for d in deps[stage.name]}
+                if dep_status & {"gagal", "batal"}:
+                    status[stage.name] = "batal"
+                    pending.remove(stage)
+                    continue
+                if not dep_status <= {"jalan", "lewati", "akan jalan"}:
+                    continue              # masih menunggu tahap sebelumnya
+                pending.remove(stage)
+
+                check_start = time.perf_counter()
+                fingerprint = decide(stage)
+                if fingerprint is None:
+                    status[stage.name] = "lewati"
+                    seconds[stage.name] = time.perf_counter() - check_start
+                    print(f"[SKIP] {stage.name}: input & kode tidak berubah")
+                    continue
+                extra_args = stage_args(stage)
+                if dry_run:
+                    status[stage.name] = "akan jalan"
+                    print(f"[PLAN] {stage.name}: python {stage.script} {' '.join(extra_args)}".rstrip())
+                    continue
+
+                print(f"[RUN] {stage.name}: python {stage.script} {' '.join(extra_args)}".rstrip())
+                future = pool.submit(run_stage, stage, extra_args)
+                running[future] = (stage, fingerprint)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                code, elapsed, log_path = future.result()
+                seconds[stage.name] = elapsed
+                if code != 0:
+                    status[stage.name] = "gagal"
+                    print(f"[ERROR] {stage.name} gagal (exit {code}), log: {log_path}")
+                    print(_tail(log_path))
+                    state["stages"].pop(stage.name, None)
+                    save_state(state)
+                    continue
+
+                status[stage.name] = "jalan"
+                previous = state["stages"].get(stage.name, {}).get("outputs", {})
+                outputs = output_digests(stage, hasher)
+                changed_outputs.update(rel for rel, d in outputs.items() if previous.get(rel) != d)
+                state["stages"][stage.name] = {"fingerprint": fingerprint, "outputs": outputs}
+                save_state(state)
+                print(f"[DONE] {stage.name}: {elapsed:.1f} detik (log: {log_path.name})")
+
+    if not dry_run:
+        save_state(state)            # cache hash input yang baru dihitung
+
+    print(f"\n{'tahap':<18}{'status':<12}{'detik':>8}")
+    for stage in STAGES:
+        print(f"{stage.name:<18}{status.get(stage.name, '-'):<12}{seconds.get(stage.name, 0.0):>8.2f}")
+    print(f"{'total':<30}{time.perf_counter() - pipeline_start:>8.2f}")
+
+    if changed_outputs & RUNTIME_OUTPUTS:
+        print("\n[INFO] Artifact runtime berubah, restart backend API")
+    return "gagal" not in status.values()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline offline dengan cache per tahap")
+    parser.add_argument("--force", nargs="*", metavar="TAHAP",
+                        help="Jalankan ulang tahap ini walau tidak berubah (tanpa nama = semua)")
+    parser.add_argument("--changed", action="store_true",
+                        help="Teruskan --changed ke setiap tahap (setelah scrape_articles.py --recrawl)")
+    parser.add_argument("--jobs", type=int, default=2, help="Tahap paralel maksimal")
+    parser.add_argument("--dry-run", action="store_true", help="Tampilkan rencana tanpa menjalankan")
+    args = parser.parse_args()
+
+    force = ["all"] if args.force == [] else (args.force or [])
+    unknown = set(force) - {s.name for s in STAGES} - {"all"}
+    if unknown:
+        parser.error(f"tahap tidak dikenal: {', '.join(sorted(unknown))}")
+    ok = run_pipeline(force, args.changed, args.jobs, args.dry_run)
+    sys.exit(0 if ok else 1)
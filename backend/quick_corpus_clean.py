@@ -1,29 +1,73 @@
 """
 Script cepat untuk membuat corpus_clean.csv dari scraped_cleaned.csv
 Langsung copy karena konten sudah dibersihkan, tinggal tambah image_url ke output
+
+Near-duplicate (near_dedup.py, MinHash LSH) dibuang dulu, kecuali --no-dedup.
+
+--changed: setelah `scrape_articles.py --recrawl`, hanya baris URL di
+data/changed_urls.txt (+ baris baru) yang diperbarui di corpus_clean.csv lama.
+
+Output lewat artifacts.py (corpus_clean.parquet kalau pyarrow ada). content /
+word_count tidak lagi diduplikasi ke content_raw / word_count_raw.
 """
+import argparse
 import pandas as pd
 from pathlib import Path
 
+from artifacts import exists, read_table, write_table
+from changed_docs import mark_consumed, merge_rows, pending_changes, rows_to_rebuild
+from near_dedup import dedup_frame
+
 BASE_DIR = Path(__file__).parent
 INPUT_FILE = BASE_DIR / "data" / "scraped.csv"
 OUTPUT_FILE = BASE_DIR / "data" / "corpus_clean.csv"
+INPUT_COLUMNS = ['url', 'title', 'image_url', 'word_count', 'content']
+CORPUS_COLUMNS = ['url', 'title', 'image_url', 'word_count_clean', 'content_clean']
+
+
+def to_corpus_rows(df):
+    # Rename kolom untuk match dengan expected format
+    df_clean = df[['url', 'title']].copy()
+    df_clean['image_url'] = df['image_url'] if 'image_url' in df.columns else ""
+    df_clean['word_count_clean'] = df['word_count']  # konten sudah clean
+    df_clean['content_clean'] = df['content']
+    return df_clean
+
+
+arg_parser = argparse.ArgumentParser(description="scraped.csv -> corpus_clean.csv")
+arg_parser.add_argument("--changed", action="store_true",
+                        help="Hanya perbarui URL di data/changed_urls.txt (hasil recrawl)")
+arg_parser.add_argument("--no-dedup", action="store_true",
+                        help="Jangan buang near-duplicate")
+args = arg_parser.parse_args()
 
 print(f"[INFO] Membaca: {INPUT_FILE}")
-df = pd.read_csv(INPUT_FILE)
+df = pd.read_csv(INPUT_FILE, usecols=lambda c: c in INPUT_COLUMNS)
 print(f"[INFO] Total baris: {len(df)}")
 
-# Rename kolom untuk match dengan expected format
-# content -> content_raw, word_count -> word_count_raw
-df_clean = df[['url', 'title']].copy()
-df_clean['image_url'] = df['image_url'] if 'image_url' in df.columns else ""
-df_clean['word_count_raw'] = df['word_count']
-df_clean['word_count_clean'] = df['word_count']  # sama aja karena sudah clean
-df_clean['content_raw'] = df['content']
-df_clean['content_clean'] = df['content']  # sama aja karena sudah clean
+if not args.no_dedup:
+    df, _ = dedup_frame(df)
+
+rows = None
+# Rebuild penuh juga mencakup semua URL di log, jadi posisi log tetap dicatat
+pending = pending_changes("corpus_clean")
+changed = pending[0] if args.changed and pending is not None else None
+if changed is not None and exists(OUTPUT_FILE):
+    old = read_table(OUTPUT_FILE, columns=CORPUS_COLUMNS)
+    rows = rows_to_rebuild(df['url'], old['url'], changed)
+    if rows is None:
+        print("[WARN] corpus_clean.csv lama tidak sejajar dengan scraped.csv, rebuild penuh")
+
+if rows is None:
+    df_clean = to_corpus_rows(df)
+else:
+    print(f"[INFO] Inkremental: {len(rows)}/{len(df)} baris diperbarui")
+    df_clean = merge_rows(old, to_corpus_rows(df.iloc[rows]))
 
 print(f"[INFO] Menyimpan ke: {OUTPUT_FILE}")
-df_clean.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
+write_table(df_clean, OUTPUT_FILE, encoding='utf-8-sig')
+if pending is not None:
+    mark_consumed("corpus_clean", pending[1])
 
 print(f"\n[SUCCESS] Selesai!")
 print(f"Total dokumen: {len(df_clean)}")
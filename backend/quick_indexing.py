@@ -1,45 +1,43 @@
 """
 Script cepat untuk regenerate indexing dari corpus_clean.csv
 Membuat doc_meta.csv dan inverted_index.json
+
+Folder data bisa diarahkan ke lokasi lain lewat env SIPAPA_DATA_DIR
+(mis. korpus sintetis untuk uji skala).
+
+--changed: setelah recrawl kondisional, hanya dokumen di changed_urls.txt
+(+ dokumen baru) yang ditokenisasi ulang; postings lama dokumen itu dibuang
+dari inverted_index.json yang ada.
+
+Kolom kecil (url, title, ...) dibaca sekaligus; content_clean di-stream per
+row group (artifacts.iter_table) supaya seluruh teks korpus tidak pernah ada
+di memori bersamaan.
 """
+import argparse
 import json
+import os
+import re
 import pandas as pd
 from pathlib import Path
 from collections import defaultdict
-import math
+from typing import Iterable
+
+from artifacts import exists, iter_table, read_table, write_table
+from changed_docs import mark_consumed, merge_rows, pending_changes, rows_to_rebuild
 
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.environ.get("SIPAPA_DATA_DIR", BASE_DIR / "data"))
 
 CORPUS_FILE = DATA_DIR / "corpus_clean.csv"
 DOC_META_FILE = DATA_DIR / "doc_meta.csv"
 INDEX_FILE = DATA_DIR / "inverted_index.json"
+CHANGED_FILE = DATA_DIR / "changed_urls.txt"
 
-print(f"[INFO] Membaca: {CORPUS_FILE}")
-df = pd.read_csv(CORPUS_FILE)
-print(f"[INFO] Total dokumen: {len(df)}")
-
-# 1. Buat doc_meta.csv
-print("\n[1/2] Membuat doc_meta.csv...")
-doc_meta = []
-for idx, row in df.iterrows():
-    doc_meta.append({
-        "doc_id": idx,
-        "url": row["url"],
-        "title": row["title"],
-        "image_url": row.get("image_url", ""),
-        "doc_len": row["word_count_clean"]
-    })
-
-doc_meta_df = pd.DataFrame(doc_meta)
-doc_meta_df.to_csv(DOC_META_FILE, index=False)
-print(f"     ✓ Saved: {DOC_META_FILE}")
-
-# 2. Buat inverted_index.json (consistent preprocessing)
-import re
+# Hanya kolom ini yang dibaca dari corpus (Parquet: kolom lain tidak di-decode).
+# content_clean dibaca terpisah per potongan lewat iter_contents().
+META_COLUMNS = ["url", "title", "image_url", "word_count_clean"]
+CONTENT_COLUMNS = ["content_clean"]
 
-print("\n[2/2] Membuat inverted_index.json...")
-inverted_index = defaultdict(lambda: defaultdict(int))
 
 def preprocess_text(text):
     """Preprocessing konsisten dengan search_engine.py"""
@@ -53,29 +51,139 @@ def preprocess_text(text):
     # Filter token pendek
     return [t for t in tokens if len(t) > 1]
 
-for idx, row in df.iterrows():
-    content = str(row["content_clean"])
-    # Gunakan preprocessing yang sama dengan search
-    tokens = preprocess_text(content)
-    
-    # Count term frequency per document
-    for token in tokens:
-        inverted_index[token][idx] += 1
 
-# Convert to regular dict untuk JSON
-inverted_index_json = {
-    term: dict(postings) 
-    for term, postings in inverted_index.items()
-}
+def build_doc_meta(df: pd.DataFrame) -> pd.DataFrame:
+    doc_meta = []
+    for idx, row in df.iterrows():
+        doc_meta.append({
+            "doc_id": idx,
+            "url": row["url"],
+            "title": row["title"],
+            "image_url": row.get("image_url", ""),
+            "doc_len": row["word_count_clean"]
+        })
+    return pd.DataFrame(doc_meta)
+
+
+def iter_contents(doc_ids: Iterable[int] = None):
+    """content_clean per row group (index = doc_id); hanya `doc_ids` kalau diberikan."""
+    wanted = None if doc_ids is None else set(doc_ids)
+    for chunk in iter_table(CORPUS_FILE, columns=CONTENT_COLUMNS):
+        if wanted is not None:
+            chunk = chunk[chunk.index.isin(wanted)]
+        if len(chunk):
+            yield chunk
+
+
+def build_inverted_index(chunks: Iterable[pd.DataFrame]) -> dict:
+    inverted_index = defaultdict(lambda: defaultdict(int))
+
+    for df in chunks:
+        for idx, content in df["content_clean"].items():
+            # Gunakan preprocessing yang sama dengan search
+            tokens = preprocess_text(str(content))
+
+            # Count term frequency per document
+            for token in tokens:
+                inverted_index[token][idx] += 1
+
+    # Convert to regular dict untuk JSON
+    return {
+        term: dict(postings)
+        for term, postings in inverted_index.items()
+    }
+
+
+def update_inverted_index(inverted_index: dict, doc_ids: list) -> dict:
+    """Ganti postings dokumen `doc_ids` dengan hasil tokenisasi baris terbarunya."""
+    stale = {str(doc_id) for doc_id in doc_ids}
+    for term in list(inverted_index):
+        postings = inverted_index[term]
+        if stale.isdisjoint(postings):
+            continue
+        for doc_id in stale.intersection(postings):
+            del postings[doc_id]
+        if not postings:
+            del inverted_index[term]
+
+    for term, postings in build_inverted_index(iter_contents(doc_ids)).items():
+        target = inverted_index.setdefault(term, {})
+        for doc_id, tf in postings.items():
+            target[str(doc_id)] = tf
+    return inverted_index
+
+
+def update_incremental(df: pd.DataFrame, changed):
+    """(doc_meta, inverted_index) diperbarui untuk URL berubah, None kalau harus rebuild penuh."""
+    if changed is None or not exists(DOC_META_FILE) or not INDEX_FILE.exists():
+        print("[WARN] changed_urls.txt / index lama tidak ada, rebuild penuh")
+        return None
+    old_meta = read_table(DOC_META_FILE)
+    doc_ids = rows_to_rebuild(df["url"], old_meta["url"], changed)
+    if doc_ids is None:
+        print("[WARN] doc_meta.csv lama tidak sejajar dengan corpus, rebuild penuh")
+        return None
+
+    print(f"[INFO] Inkremental: {len(doc_ids)}/{len(df)} dokumen diindex ulang")
+    updated = build_doc_meta(df.loc[doc_ids])
+    updated.index = doc_ids
+    doc_meta_df = merge_rows(old_meta, updated)
+
+    with open(INDEX_FILE, "r", encoding="utf-8") as f:
+        inverted_index = json.load(f)
+    return doc_meta_df, update_inverted_index(inverted_index, doc_ids)
+
+
+def main(changed_only: bool = False):
+    print(f"[INFO] Membaca: {CORPUS_FILE}")
+    df = read_table(CORPUS_FILE, columns=META_COLUMNS)
+    print(f"[INFO] Total dokumen: {len(df)}")
+
+    # Rebuild penuh juga mencakup semua URL di log, jadi posisi log tetap dicatat
+    pending = pending_changes("index", CHANGED_FILE)
+    changed = pending[0] if pending is not None else None
+    result = update_incremental(df, changed) if changed_only else None
+    if result is not None:
+        doc_meta_df, inverted_index_json = result
+        write_table(doc_meta_df, DOC_META_FILE, keep_csv=True)
+        with open(INDEX_FILE, "w", encoding="utf-8") as f:
+            json.dump(inverted_index_json, f, ensure_ascii=False)
+        mark_consumed("index", pending[1], CHANGED_FILE)
+        print(f"     ✓ Saved: {DOC_META_FILE}, {INDEX_FILE}")
+        print(f"\n[SUCCESS] Indexing inkremental selesai!")
+        print(f"   - Documents: {len(df)}")
+        print(f"   - Unique terms: {len(inverted_index_json)}")
+        return
+
+    # 1. Buat doc_meta.csv
+    print("\n[1/2] Membuat doc_meta.csv...")
+    doc_meta_df = build_doc_meta(df)
+    # CSV tetap ditulis: dibaca API/runtime; Parquet untuk tahap offline
+    write_table(doc_meta_df, DOC_META_FILE, keep_csv=True)
+    print(f"     ✓ Saved: {DOC_META_FILE}")
+
+    # 2. Buat inverted_index.json (consistent preprocessing)
+    print("\n[2/2] Membuat inverted_index.json...")
+    inverted_index_json = build_inverted_index(iter_contents())
+
+    print(f"     → Total unique terms: {len(inverted_index_json)}")
+
+    with open(INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(inverted_index_json, f, ensure_ascii=False)
+    if pending is not None:
+        mark_consumed("index", pending[1], CHANGED_FILE)
 
-print(f"     → Total unique terms: {len(inverted_index_json)}")
+    print(f"     ✓ Saved: {INDEX_FILE}")
 
-with open(INDEX_FILE, "w", encoding="utf-8") as f:
-    json.dump(inverted_index_json, f, ensure_ascii=False)
+    print(f"\n[SUCCESS] Indexing selesai!")
+    print(f"   - Documents: {len(df)}")
+    print(f"   - Unique terms: {len(inverted_index_json)}")
+    print(f"   - Avg doc length: {doc_meta_df['doc_len'].mean():.1f} words")
 
-print(f"     ✓ Saved: {INDEX_FILE}")
 
-print(f"\n[SUCCESS] Indexing selesai!")
-print(f"   - Documents: {len(df)}")
-print(f"   - Unique terms: {len(inverted_index_json)}")
-print(f"   - Avg doc length: {doc_meta_df['doc_len'].mean():.1f} words")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="corpus_clean.csv -> doc_meta.csv + inverted_index.json")
+    parser.add_argument("--changed", action="store_true",
+                        help="Hanya index ulang URL di changed_urls.txt (hasil recrawl)")
+    args = parser.parse_args()
+    main(changed_only=args.changed)
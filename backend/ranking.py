@@ -0,0 +1,120 @@
+"""
+Inti ranking yang dipakai bersama search_engine.py dan handler serverless
+api/search.py: preprocessing query, parameter & rumus BM25, traversal
+postings, penjumlahan skor per dokumen, dan top-k.
+
+Hanya butuh NumPy + stdlib (tanpa pandas / Sastrawi) supaya bisa di-import
+runtime serverless. Semua fungsi menerima TermDictionary / DocStore dari
+compact_index.py, jadi engine dan handler menghitung skor yang sama persis.
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# ========== PARAMETER BM25 ==========
+# Default k1/b, bisa di-override hasil tuning (bm25_sweep.py --write-config)
+BM25_PARAMS_FILE = "bm25_params.json"
+DEFAULT_K1: float = 1.5
+DEFAULT_B: float = 0.75
+
+
+def load_bm25_params(data_dir: Path) -> Tuple[float, float]:
+    """(k1, b) dari data/bm25_params.json, default kalau belum ada."""
+    path = Path(data_dir) / BM25_PARAMS_FILE
+    if not path.exists():
+        return DEFAULT_K1, DEFAULT_B
+    with path.open("r", encoding="utf-8") as f:
+        params = json.load(f)
+    return float(params.get("k1", DEFAULT_K1)), float(params.get("b", DEFAULT_B))
+
+
+# ========== QUERY PREPROCESSING ==========
+
+_URL_RE = re.compile(r"http\S+|www\.\S+")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-zA-Z\s]")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def preprocess_query(text: str) -> List[str]:
+    text = text.lower()
+    text = _URL_RE.sub(" ", text)
+    text = _NON_ALNUM_RE.sub(" ", text)
+    tokens = _TOKEN_RE.findall(text)
+    return [t for t in tokens if t]
+
+
+# ========== SCORING ==========
+# Scores = (doc rows unik terurut, skor per row). Row dipetakan balik ke
+# doc_id asli lewat DocStore.doc_ids saat materialisasi hasil.
+Scores = Tuple[np.ndarray, np.ndarray]
+
+EMPTY_SCORES: Scores = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+
+
+def bm25_contrib(tf: np.ndarray, dl: np.ndarray, idf: float,
+                 k1: float, b: float, avgdl: float) -> np.ndarray:
+    """Kontribusi BM25 satu term (urutan operasi dipakai juga oleh bm25_sweep.py)."""
+    denom = tf + k1 * (1 - b + b * (dl / avgdl))
+    return idf * (tf * (k1 + 1)) / denom
+
+
+def accumulate(rows_parts: list, score_parts: Dict[str, list]) -> Dict[str, Scores]:
+    """
+    Jumlahkan kontribusi per term jadi satu skor per dokumen, untuk setiap scorer.
+    Union doc rows cukup dihitung sekali dan dipakai bersama semua scorer.
+    """
+    if not rows_parts:
+        return {name: EMPTY_SCORES for name in score_parts}
+    if len(rows_parts) == 1:
+        return {name: (rows_parts[0], parts[0]) for name, parts in score_parts.items()}
+    rows = np.concatenate(rows_parts)
+    uniq, inverse = np.unique(rows, return_inverse=True)
+    return {
+        name: (uniq, np.bincount(inverse, weights=np.concatenate(parts), minlength=len(uniq)))
+        for name, parts in score_parts.items()
+    }
+
+
+def score_tokens(terms, tokens: Iterable[str], funcs: Dict[str, Callable],
+                 params: dict) -> Dict[str, Scores]:
+    """
+    Hitung beberapa scorer sekaligus dari SATU traversal postings: lookup term
+    & slice postings sekali, lalu tiap scorer menghitung kontribusinya
+    lewat func(term_id, rows, tf, params).
+    """
+    rows_parts = []
+    score_parts = {name: [] for name in funcs}
+
+    for term in tokens:
+        term_id = terms.lookup(term)
+        if term_id < 0:
+            continue
+        rows, tf = terms.postings(term_id)
+        if len(rows) == 0:
+            continue
+
+        rows_parts.append(rows)
+        for name, func in funcs.items():
+            score_parts[name].append(func(term_id, rows, tf, params))
+
+    return accumulate(rows_parts, score_parts)
+
+
+def top_k(scores: Scores, k: int) -> np.ndarray:
+    """Index ke `scores` untuk k skor tertinggi (tie -> doc row kecil dulu)."""
+    rows, values = scores
+    if k <= 0 or len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if len(values) > k:
+        # Ambil kandidat >= skor ke-k supaya tie di batas tetap deterministik
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((rows[candidates], -values[candidates]))
+    return candidates[order[:k]]
@@ -7,61 +7,15 @@ Script ini akan:
 4. Update scraped.csv dengan image_url baru
 """
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import time
-import re
 from pathlib import Path
 
+from http_client import print_handshake_stats
+from image_meta import fetch_images, print_fetch_stats
+from page_store import open_default_store
+
 BASE_DIR = Path(__file__).parent
 SCRAPED_FILE = BASE_DIR / "data" / "scraped.csv"
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-}
-
-def extract_images(soup):
-    """Ekstrak URL gambar dari artikel"""
-    # Prioritas 1: Open Graph image
-    og_image = soup.find("meta", attrs={"property": "og:image"})
-    if og_image and og_image.get("content"):
-        return og_image["content"].strip()
-    
-    # Prioritas 2: Twitter card
-    twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
-    if twitter_image and twitter_image.get("content"):
-        return twitter_image["content"].strip()
-    
-    # Prioritas 3: First image in article
-    article_containers = soup.find_all(["article", "div"], class_=lambda x: x and ('article' in x.lower() or 'content' in x.lower()))
-    for container in article_containers:
-        img = container.find("img", src=True)
-        if img and img.get("src"):
-            src = img["src"].strip()
-            if not src.startswith('data:') and 'icon' not in src.lower() and 'logo' not in src.lower():
-                return src
-    
-    # Fallback: first image
-    img = soup.find("img", src=True)
-    if img and img.get("src"):
-        src = img["src"].strip()
-        if not src.startswith('data:'):
-            return src
-    
-    return ""
-
-def scrape_image(url):
-    """Scrape gambar dari satu URL"""
-    try:
-        res = requests.get(url, headers=HEADERS, timeout=15)
-        if res.status_code == 200:
-            soup = BeautifulSoup(res.text, "html.parser")
-            image_url = extract_images(soup)
-            return image_url
-        return ""
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
-        return ""
+STORE = open_default_store()
 
 print("[INFO] Membaca scraped.csv...")
 df = pd.read_csv(SCRAPED_FILE)
@@ -71,34 +25,30 @@ print(f"[INFO] Total rows: {len(df)}")
 test_urls = df.head(100)
 
 print(f"\n[INFO] Akan scrape ulang {len(test_urls)} artikel untuk ambil gambar...")
-print("[INFO] Estimasi waktu: ~30 detik\n")
+
+# Skip yang sudah ada gambar
+current = test_urls['image_url'].fillna("").astype(str).str.strip()
+has_image = (current != "") & (current != "nan")
+print(f"[INFO] {has_image.sum()} sudah ada gambar (skip), {(~has_image).sum()} di-scrape\n")
+todo = test_urls.loc[~has_image, 'url']
+
+# Hanya baca prefix yang cukup (<head> / <img> artikel pertama), concurrent (lihat image_meta.py)
+images, fetch_stats = fetch_images(todo, store=STORE)
 
 updated_count = 0
-for idx, row in test_urls.iterrows():
-    url = row['url']
-    current_image = row.get('image_url', '')
-    
-    # Skip jika sudah ada gambar
-    if pd.notna(current_image) and str(current_image).strip() and str(current_image) != 'nan':
-        print(f"[{idx+1}/{len(test_urls)}] ✓ Skip (sudah ada gambar)")
-        continue
-    
-    print(f"[{idx+1}/{len(test_urls)}] Scraping: {url[:60]}...")
-    
-    image_url = scrape_image(url)
-    
+for idx, url in todo.items():
+    image_url = images.get(url, "")
+    df.at[idx, 'image_url'] = image_url
     if image_url:
-        df.at[idx, 'image_url'] = image_url
         updated_count += 1
-        print(f"   ✓ Gambar ditemukan: {image_url[:60]}...")
+        print(f"[{idx+1}/{len(test_urls)}] ✓ Gambar ditemukan: {image_url[:60]}...")
     else:
-        df.at[idx, 'image_url'] = ""
-        print(f"   ✗ Tidak ada gambar")
-    
-    time.sleep(0.3)  # Jeda sopan
+        print(f"[{idx+1}/{len(test_urls)}] ✗ Tidak ada gambar: {url[:60]}")
 
 print(f"\n[SUCCESS] Scraping selesai!")
 print(f"[INFO] Updated: {updated_count}/{len(test_urls)} artikel dengan gambar")
+print_fetch_stats(fetch_stats, len(todo), full=False)
+print_handshake_stats()
 
 # Save
 print(f"\n[SAVE] Menyimpan ke {SCRAPED_FILE}...")
@@ -112,6 +62,5 @@ for idx, row in df.head(5).iterrows():
         print(f"   Image: {str(row['image_url'])[:70]}")
 
 print("\n[NEXT STEPS]")
-print("1. python quick_corpus_clean.py  # Regenerate corpus_clean.csv")
-print("2. python quick_indexing.py      # Regenerate index")
-print("3. python api.py                  # Restart backend")
+print("1. python pipeline.py             # Regenerate corpus + index (yang berubah saja)")
+print("2. python api.py                  # Restart backend")
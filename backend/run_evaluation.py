@@ -0,0 +1,242 @@
+"""
+Batch evaluation TF-IDF vs BM25 untuk query set besar.
+
+Query dibagi ke process pool. Index di-load sekali di proses utama lalu
+di-share ke worker lewat fork (copy-on-write), jadi worker tidak load ulang.
+Worker hanya mengembalikan doc_id hasil ranking (tanpa snippet/materialisasi);
+semua metrik (P@k, recall, F1, MAP, nDCG, MRR) dihitung sekaligus untuk semua
+query dengan NumPy (evaluator.batch_metrics).
+
+Output (default ke data/):
+- evaluation_report.json
+- tfidf_evaluation.csv, bm25_evaluation.csv
+- algorithm_comparison.csv
+
+Format --queries:
+- .txt  : satu query per baris
+- .json : list query, list {"query": ..., "keywords": [...]}, atau
+          dict {query: [doc_id relevan]} (sekaligus jadi ground truth)
+
+Query yang tidak ada di ground truth di-generate on-the-fly dari index
+(SearchEvaluator.generate_ground_truth_for_query).
+
+Contoh:
+    python run_evaluation.py
+    python run_evaluation.py --queries data/queries.txt --workers 8 --top-k 20
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import search_engine as se
+from evaluator import DEFAULT_GROUND_TRUTH_PATH, SearchEvaluator, batch_metrics
+
+BASE_DIR = Path(__file__).resolve().parent
+
+ALGOS = {"tfidf": "TF-IDF", "bm25": "BM25"}
+CUTOFFS = (5, 10)
+
+_WORKER_EVALUATOR = None
+
+
+# ========== INPUT ==========
+
+def load_queries(path: Path) -> tuple:
+    """Return (list query, dict metadata per query, dict ground truth dari file query)."""
+    if path.suffix.lower() == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return list(data), {}, {q: set(v) for q, v in data.items()}
+        queries, meta = [], {}
+        for item in data:
+            if isinstance(item, dict):
+                queries.append(item["query"])
+                meta[item["query"]] = item
+            else:
+                queries.append(str(item))
+        return queries, meta, {}
+
+    with path.open("r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return queries, {}, {}
+
+
+# ========== WORKER ==========
+
+def _ranked_ids(query: str, top_k: int) -> tuple:
+    ranked = se.multi_search_ids(query, top_k=top_k, scorers=tuple(ALGOS))
+    return ranked["tfidf"], ranked["bm25"]
+
+
+def _evaluate_chunk(task: tuple) -> list:
+    """Ranking + ground truth untuk satu potongan query (jalan di worker)."""
+    global _WORKER_EVALUATOR
+    queries, top_k, need_judgment = task
+
+    rows = []
+    for query, need in zip(queries, need_judgment):
+        tfidf_ids, bm25_ids = _ranked_ids(query, top_k)
+        relevant = None
+        if need:
+            if _WORKER_EVALUATOR is None:
+                _WORKER_EVALUATOR = SearchEvaluator(ground_truth_path="", engine=se)
+            relevant = sorted(_WORKER_EVALUATOR.generate_ground_truth_for_query(query))
+        rows.append((tfidf_ids, bm25_ids, relevant))
+    return rows
+
+
+def _pool_context():
+    # fork: worker mewarisi index yang sudah di-load (copy-on-write)
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context()
+
+
+def rank_all(queries: list, ground_truth: dict, top_k: int, workers: int) -> tuple:
+    global _WORKER_EVALUATOR
+    need = [q not in ground_truth for q in queries]
+    if any(need) and _WORKER_EVALUATOR is None:
+        # Bangun sebelum fork supaya token store judul ikut di-share ke worker
+        _WORKER_EVALUATOR = SearchEvaluator(ground_truth_path="", engine=se)
+    n_chunks = max(1, min(len(queries), workers * 4))
+    bounds = np.linspace(0, len(queries), n_chunks + 1).astype(int)
+    tasks = [
+        (queries[a:b], top_k, need[a:b])
+        for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+    ]
+
+    if workers <= 1:
+        chunks = [_evaluate_chunk(t) for t in tasks]
+    else:
+        with _pool_context().Pool(workers) as pool:
+            chunks = pool.map(_evaluate_chunk, tasks)
+
+    retrieved = {algo: np.full((len(queries), top_k), -1, dtype=np.int64) for algo in ALGOS}
+    relevant = []
+    i = 0
+    for chunk in chunks:
+        for tfidf_ids, bm25_ids, generated in chunk:
+            retrieved["tfidf"][i, :len(tfidf_ids)] = tfidf_ids
+            retrieved["bm25"][i, :len(bm25_ids)] = bm25_ids
+            q = queries[i]
+            relevant.append(ground_truth[q] if generated is None else set(generated))
+            i += 1
+    return retrieved, relevant
+
+
+# ========== OUTPUT ==========
+
+def summarize(algo_name: str, metrics: dict) -> dict:
+    summary = {
+        "algorithm": algo_name,
+        "avg_precision": float(metrics["precision"].mean()),
+        "avg_recall": float(metrics["recall"].mean()),
+        "avg_f1": float(metrics["f1"].mean()),
+        "MAP": float(metrics["ap"].mean()),
+        "nDCG": float(metrics["ndcg"].mean()),
+        "MRR": float(metrics["rr"].mean()),
+    }
+    for cutoff in CUTOFFS:
+        summary[f"P@{cutoff}"] = float(metrics[f"p@{cutoff}"].mean())
+    return summary
+
+
+def per_query_frame(queries: list, metrics: dict) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "query": queries,
+        "precision": metrics["precision"],
+        "recall": metrics["recall"],
+        "f1": metrics["f1"],
+        "ap": metrics["ap"],
+        "retrieved_count": metrics["retrieved_count"],
+        "relevant_count": metrics["relevant_count"],
+        "ndcg": metrics["ndcg"],
+        "rr": metrics["rr"],
+    })
+    for cutoff in CUTOFFS:
+        df[f"p@{cutoff}"] = metrics[f"p@{cutoff}"]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch evaluation TF-IDF vs BM25")
+    parser.add_argument("--queries", help="File query (.txt / .json). Default: query ground truth")
+    parser.add_argument("--ground-truth", default=str(BASE_DIR / DEFAULT_GROUND_TRUTH_PATH))
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output-dir", default=str(se.DATA_DIR))
+    args = parser.parse_args()
+
+    ground_truth = {}
+    gt_path = Path(args.ground_truth)
+    if gt_path.exists():
+        with gt_path.open("r", encoding="utf-8") as f:
+            ground_truth = {q: set(v) for q, v in json.load(f).items()}
+
+    query_meta = {}
+    if args.queries:
+        queries, query_meta, gt_from_queries = load_queries(Path(args.queries))
+        ground_truth.update(gt_from_queries)
+    else:
+        queries = list(ground_truth)
+    if not queries:
+        raise SystemExit("[ERROR] Tidak ada query. Pakai --queries atau buat ground_truth.json dulu.")
+
+    print(f"[INFO] {len(queries)} query, top_k={args.top_k}, workers={args.workers}")
+    start = time.time()
+    retrieved, relevant = rank_all(queries, ground_truth, args.top_k, args.workers)
+    rank_seconds = time.time() - start
+
+    start_metrics = time.time()
+    metrics = {algo: batch_metrics(retrieved[algo], relevant, CUTOFFS) for algo in ALGOS}
+    metrics_seconds = time.time() - start_metrics
+    elapsed = time.time() - start
+
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    summaries = {algo: summarize(name, metrics[algo]) for algo, name in ALGOS.items()}
+    for algo in ALGOS:
+        per_query_frame(queries, metrics[algo]).to_csv(
+            out_dir / f"{algo}_evaluation.csv", index=False
+        )
+    pd.DataFrame(list(summaries.values())).to_csv(
+        out_dir / "algorithm_comparison.csv", index=False
+    )
+
+    report = {
+        "tfidf_summary": summaries["tfidf"],
+        "bm25_summary": summaries["bm25"],
+        "test_queries": [query_meta.get(q, {"query": q}) for q in queries],
+        "evaluation_settings": {
+            "top_k": args.top_k,
+            "num_queries": len(queries),
+            "total_documents": se.N,
+            "workers": args.workers,
+            "ranking_seconds": rank_seconds,
+            "metrics_seconds": metrics_seconds,
+        },
+    }
+    with (out_dir / "evaluation_report.json").open("w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'metric':<14} {'TF-IDF':>10} {'BM25':>10}")
+    for key in summaries["tfidf"]:
+        if key == "algorithm":
+            continue
+        print(f"{key:<14} {summaries['tfidf'][key]:>10.4f} {summaries['bm25'][key]:>10.4f}")
+
+    print(f"\n[INFO] Ranking: {rank_seconds:.2f} s, metrik: {metrics_seconds * 1000:.1f} ms, "
+          f"total: {elapsed:.2f} s ({len(queries) / elapsed:.0f} query/detik)")
+    print(f"[SUCCESS] Hasil evaluasi disimpan ke: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Kurva skala pipeline pakai korpus sintetis.
+
+Untuk setiap ukuran korpus:
+1. generate korpus (synthetic_corpus.py) kalau belum ada
+2. jalankan quick_indexing.py  -> waktu build, peak RSS, ukuran index
+3. jalankan compact_index.py   -> artifact .npz yang dimuat engine & serverless
+4. jalankan benchmark.py       -> waktu load engine, peak RSS, latency query
+
+Setiap tahap jalan di subprocess dengan SIPAPA_DATA_DIR diarahkan ke folder
+korpus sintetis, jadi angka memorinya murni milik tahap itu.
+
+Contoh:
+    python scaling_curve.py --scales 10000,100000,1000000
+    python scaling_curve.py --scales 100000 --skip-bench
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_corpus import generate_corpus
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+SYNTH_DIR = DATA_DIR / "synthetic"
+OUT_DIR = DATA_DIR / "scaling"
+
+
+def run_stage(cmd: list, data_dir: Path) -> dict:
+    """Jalankan subprocess, return waktu wall-clock + peak RSS (MB) child itu."""
+    env = dict(os.environ, SIPAPA_DATA_DIR=str(data_dir))
+    # stderr ke file sementara, bukan PIPE: pipe yang tidak dibaca selama
+    # wait4 bisa penuh (warning/traceback panjang) dan child jadi macet
+    with tempfile.TemporaryFile() as err:
+        start = time.time()
+        proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=err)
+        # wait4 memberi rusage khusus child ini (bukan akumulasi semua child)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        elapsed = time.time() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            err.seek(0)
+            stderr = err.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"{' '.join(cmd)} gagal ({proc.returncode}):\n{stderr[-2000:]}")
+
+    peak = rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"seconds": elapsed, "peak_rss_mb": peak}
+
+
+def measure_scale(n_docs: int, args) -> dict:
+    data_dir = SYNTH_DIR / f"n{n_docs}"
+    row = {"n_docs": n_docs}
+
+    if args.regenerate or not (data_dir / "corpus_clean.csv").exists():
+        info = generate_corpus(n_docs, data_dir, seed=args.seed)
+    else:
+        with (data_dir / "synthetic_info.json").open("r", encoding="utf-8") as f:
+            info = json.load(f)
+    row["vocab_size"] = info["vocab_size"]
+    row["corpus_mb"] = info["corpus_bytes"] / 1e6
+
+    print(f"\n[SCALE {n_docs:,}] indexing...")
+    build = run_stage([sys.executable, "quick_indexing.py"], data_dir)
+    row["build_seconds"] = build["seconds"]
+    row["build_peak_rss_mb"] = build["peak_rss_mb"]
+    row["index_mb"] = (data_dir / "inverted_index.json").stat().st_size / 1e6
+    row["doc_meta_mb"] = (data_dir / "doc_meta.csv").stat().st_size / 1e6
+
+    print(f"[SCALE {n_docs:,}] compact index...")
+    compact = run_stage([sys.executable, "compact_index.py", "--data-dir", str(data_dir)], data_dir)
+    row["compact_seconds"] = compact["seconds"]
+
+    if not args.skip_bench:
+        print(f"[SCALE {n_docs:,}] benchmark...")
+        bench_path = data_dir / "benchmark.json"
+        bench_cmd = [
+            sys.executable, "benchmark.py",
+            "--sets", "ground_truth", "mixed",
+            "--targets", "tfidf_search", "bm25_search",
+            "--repeat", str(args.repeat),
+            "--output", str(bench_path),
+        ]
+        bench = run_stage(bench_cmd, data_dir)
+        with bench_path.open("r", encoding="utf-8") as f:
+            report = json.load(f)
+        row["engine_load_seconds"] = report["load"]["seconds"]
+        row["engine_peak_rss_mb"] = bench["peak_rss_mb"]
+        for algo in ("tfidf_search", "bm25_search"):
+            lat = report["results"]["mixed"]["targets"][algo]["latency_ms"]
+            row[f"{algo}_p50_ms"] = lat["p50"]
+            row[f"{algo}_p95_ms"] = lat["p95"]
+
+    print(f"[SCALE {n_docs:,}] " + ", ".join(
+        f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()
+    ))
+    return row
+
+
+def plot_curves(rows: list, out_path: Path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[WARN] matplotlib tidak terpasang, plot dilewati")
+        return
+
+    xs = [r["n_docs"] for r in rows]
+    panels = [
+        ("build_seconds", "Waktu build index (detik)"),
+        ("index_mb", "Ukuran inverted_index.json (MB)"),
+        ("engine_peak_rss_mb", "Peak RSS engine (MB)"),
+        ("bm25_search_p50_ms", "Latency BM25 p50 (ms)"),
+    ]
+    fig, axes = plt.subplots(2, 2, figsize=(11, 8))
+    for ax, (key, label) in zip(axes.flat, panels):
+        ys = [r.get(key) for r in rows]
+        if any(y is None for y in ys):
+            ax.set_visible(False)
+            continue
+        ax.plot(xs, ys, marker="o")
+        ax.set_xscale("log")
+        ax.set_xlabel("Jumlah dokumen")
+        ax.set_title(label)
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=120)
+    print(f"[INFO] Plot disimpan ke: {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kurva skala pipeline dengan korpus sintetis")
+    parser.add_argument("--scales", default="10000,100000",
+                        help="Daftar ukuran korpus, pisah koma")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--regenerate", action="store_true",
+                        help="Generate ulang korpus walau sudah ada")
+    parser.add_argument("--skip-bench", action="store_true")
+    args = parser.parse_args()
+
+    scales = [int(s.replace("_", "")) for s in args.scales.split(",") if s.strip()]
+    rows = [measure_scale(n, args) for n in scales]
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    with (OUT_DIR / "scaling_results.json").open("w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+    fieldnames = list(dict.fromkeys(k for r in rows for k in r))
+    with (OUT_DIR / "scaling_results.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    plot_curves(rows, OUT_DIR / "scaling_curves.png")
+    print(f"\n[SUCCESS] Hasil scaling disimpan ke: {OUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,43 @@
+import argparse
+import asyncio
+import multiprocessing as mp
 import os
 import re
 import time
-import requests
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from bs4 import BeautifulSoup
 from pathlib import Path
 from urllib.parse import urlparse
 
+from config import MAX_CONCURRENT_TASKS, PER_DOMAIN_DELAY, PER_DOMAIN_BURST
+from crawl_frontier import url_host
+from changed_docs import CHANGED_LOG, append_changed_urls, merge_rows
+from crawl_scheduler import HostScheduler, conditional_headers, next_ready_host, polite_fetch
+from http_client import async_session, fetch_text, print_handshake_stats
+from page_store import DEFAULT_STORE_DIR, PageStore, content_sha1, read_html
+from url_canon import BLOCKED_PATH_FRAGMENTS
+
 # ============================
 # PATH FILE
 # ============================
 BASE_DIR = Path(__file__).parent
 URL_FILE = BASE_DIR / "data" / "urls.txt"
 OUTPUT_FILE = BASE_DIR / "data" / "scraped.csv"
+# Log URL yang sudah diproses mode concurrent ("ok"/"short" + TAB + url),
+# supaya rerun tidak mengulang URL yang sudah selesai
+DONE_LOG = BASE_DIR / "data" / "scraped_done.txt"
 
 OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 # ============================
 # PARAMETER SCRAPING
 # ============================
-REQUEST_TIMEOUT = 15  # detik
 SLEEP_BETWEEN_REQUESTS = 0.2  # jeda antar request biar sopan
 MIN_WORDS = 40  # minimal jumlah kata supaya artikel dianggap valid
-
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
+BATCH_SIZE = 100  # artikel per checkpoint ke scraped.csv (mode concurrent)
+# Header, timeout & retry request ada di http_client.py (session bersama)
 
 # ============================
 # BACA URL DARI urls.txt
@@ -59,13 +67,8 @@ def is_article_url(url: str) -> bool:
     parsed = urlparse(url)
     path = parsed.path or ""
 
-    blocked_fragments = [
-        "/copy/",
-        "/komentar/",
-        "/image/",
-        "/search/",
-    ]
-    if any(b in path for b in blocked_fragments):
+    # Aturan yang sama dipakai crawler sebelum enqueue (url_canon.py)
+    if any(b in path for b in BLOCKED_PATH_FRAGMENTS):
         return False
 
     if path in ["", "/"]:
@@ -208,15 +211,8 @@ def extract_article(url: str, html: str) -> dict:
 # HTTP REQUEST
 # ============================
 def fetch(url: str):
-    try:
-        res = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-        if res.status_code == 200:
-            return res.text
-        print(f"[STATUS {res.status_code}] {url}")
-        return None
-    except Exception as e:
-        print(f"[ERROR] {url} -> {e}")
-        return None
+    # Session keep-alive bersama: koneksi ke host yang sama dipakai ulang
+    return fetch_text(url)
 
 
 # ============================
@@ -260,17 +256,355 @@ def scrape_all():
     elapsed = time.time() - start_time
     print(f"\n[INFO] Scraping selesai dalam {elapsed:.2f} detik.")
     print(f"[INFO] Total artikel valid: {len(results)}")
+    print_handshake_stats()
     return results
 
 
 # ============================
-# ENTRY POINT
+# MODE CONCURRENT + CHECKPOINT
 # ============================
-if __name__ == "__main__":
-    print(f"[INFO] Working Directory : {BASE_DIR}")
-    print(f"[INFO] URL source       : {URL_FILE}")
-    print(f"[INFO] Output CSV       : {OUTPUT_FILE}\n")
+OUTPUT_COLUMNS = ["url", "domain", "title", "content", "image_url", "word_count", "timestamp"]
+
+
+def load_done_urls() -> set:
+    """URL yang sudah ada di scraped.csv atau tercatat di DONE_LOG."""
+    done = set()
+    if OUTPUT_FILE.exists() and OUTPUT_FILE.stat().st_size > 0:
+        done.update(pd.read_csv(OUTPUT_FILE, usecols=["url"])["url"].astype(str))
+    if DONE_LOG.exists():
+        with DONE_LOG.open(encoding="utf-8") as f:
+            for line in f:
+                _, _, url = line.rstrip("\n").partition("\t")
+                if url:
+                    done.add(url)
+    return done
+
+
+class BatchWriter:
+    """Tampung hasil scraping lalu append ke scraped.csv + DONE_LOG per batch."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.rows = []
+        self.done = []
+        self.written = 0
+
+    def add(self, url: str, article):
+        if article is not None:
+            self.rows.append(article)
+        self.done.append(("ok" if article is not None else "short", url))
+        if len(self.done) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            new_file = not OUTPUT_FILE.exists() or OUTPUT_FILE.stat().st_size == 0
+            # BOM utf-8-sig cuma di awal file, batch berikutnya utf-8 biasa
+            pd.DataFrame(self.rows, columns=OUTPUT_COLUMNS).to_csv(
+                OUTPUT_FILE, mode="a", header=new_file, index=False,
+                encoding="utf-8-sig" if new_file else "utf-8",
+            )
+            self.written += len(self.rows)
+        # DONE_LOG ditulis SETELAH CSV: URL yang tercatat pasti sudah tersimpan
+        if self.done:
+            with DONE_LOG.open("a", encoding="utf-8") as f:
+                f.writelines(f"{status}\t{url}\n" for status, url in self.done)
+        self.rows = []
+        self.done = []
+
+
+async def scrape_all_async(concurrency: int, parse_workers: int, batch_size: int):
+    """
+    Halaman yang sudah ada di page store (disimpan crawler) dipakai langsung
+    tanpa request; sisanya di-fetch lalu ikut disimpan ke store.
+    """
+    urls = load_urls(URL_FILE)
+
+    article_urls = [u for u in urls if is_article_url(u)]
+    done = load_done_urls()
+    todo = [u for u in article_urls if u not in done]
+    print(f"[INFO] URL yang lolos filter pola artikel: {len(article_urls)}")
+    print(f"[INFO] Sudah di-scrape sebelumnya: {len(article_urls) - len(todo)}, sisa: {len(todo)}")
+
+    # Antrian per host: worker ambil dari host yang token politeness-nya siap duluan
+    by_host = defaultdict(deque)
+    for url in todo:
+        by_host[url_host(url)].append(url)
+
+    scheduler = HostScheduler(base_delay=PER_DOMAIN_DELAY, burst=PER_DOMAIN_BURST)
+    writer = BatchWriter(batch_size)
+    stats = Counter()
+    loop = asyncio.get_running_loop()
+    store = PageStore()
+
+    # Parsing BeautifulSoup CPU-bound -> process pool (0 = di event loop)
+    pool = None
+    if parse_workers > 0:
+        pool = ProcessPoolExecutor(parse_workers, mp_context=mp.get_context("spawn"))
+
+    async def worker(session):
+        while True:
+            hosts = [h for h, queue in by_host.items() if queue]
+            if not hosts:
+                return
+
+            # Halaman yang sudah di-crawl: tanpa request, tanpa token politeness
+            host = next((h for h in hosts if by_host[h][0] in store), None)
+            if host is not None:
+                url = by_host[host].popleft()
+                html = store.get_html(url)
+                stats["from_store"] += 1
+            else:
+                host = await next_ready_host(session, scheduler, hosts)
+                if host is None:
+                    continue
+
+                url = by_host[host].popleft()
+                page = await polite_fetch(session, url, scheduler)
+                if page is None:
+                    # Tidak dicatat di DONE_LOG -> dicoba lagi saat rerun
+                    stats["failed"] += 1
+                    continue
+                store.put(url, page.text, page.headers, page.status)
+                html = page.text
+
+            if pool is None:
+                article = extract_article(url, html)
+            else:
+                article = await loop.run_in_executor(pool, extract_article, url, html)
+
+            if not article["content"] or article["word_count"] < MIN_WORDS:
+                print(f"[SKIP - KONTEN PENDEK] {url}")
+                stats["short"] += 1
+                writer.add(url, None)
+                continue
+
+            print(f"[OK] {url} (≈ {article['word_count']} kata)")
+            stats["ok"] += 1
+            before = writer.written
+            writer.add(url, article)
+            if writer.written != before:
+                elapsed = time.time() - start_time
+                done_now = stats["ok"] + stats["short"]
+                print(f"[CHECKPOINT] {writer.written} artikel tersimpan, "
+                      f"{done_now / elapsed:.1f} URL/detik")
+
+    start_time = time.time()
+    session = async_session(limit=concurrency)
+    try:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    finally:
+        writer.flush()
+        store.close()
+        await session.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.time() - start_time
+    processed = stats["ok"] + stats["short"] + stats["failed"]
+    print(f"\n[INFO] Scraping selesai dalam {elapsed:.2f} detik "
+          f"({processed / elapsed if elapsed else 0:.1f} URL/detik).")
+    print(f"[INFO] Artikel valid: {stats['ok']}, konten pendek: {stats['short']}, "
+          f"gagal (dicoba lagi saat rerun): {stats['failed']}, "
+          f"dari page store (tanpa request): {stats['from_store']}")
+    for host, st in scheduler.stats().items():
+        print(f"[INFO] Host {host}: {st['requests']} request, {st['throttled']} throttle, "
+              f"delay akhir {st['delay']:.2f} detik")
+    print_handshake_stats()
+
+
+# ============================
+# MODE OFFLINE (DARI PAGE STORE)
+# ============================
+def _extract_stored(task: tuple):
+    """Jalan di worker: baca HTML dari store lalu ekstrak artikel."""
+    root, url = task
+    html = read_html(root, url)
+    if html is None:
+        return url, None, False
+    return url, extract_article(url, html), True
+
+
+def scrape_from_store(parse_workers: int, batch_size: int, store_dir: Path = DEFAULT_STORE_DIR):
+    """
+    Ekstrak ulang artikel dari page store tanpa jaringan (mis. setelah parser
+    diperbaiki). Murni CPU, jadi dibagi ke semua core.
+    """
+    urls = load_urls(URL_FILE)
+    article_urls = [u for u in urls if is_article_url(u)]
+    done = load_done_urls()
+    todo = [u for u in article_urls if u not in done]
+    print(f"[INFO] URL artikel: {len(article_urls)}, sisa: {len(todo)}")
+
+    writer = BatchWriter(batch_size)
+    stats = Counter()
+    start_time = time.time()
+    tasks = [(str(store_dir), url) for url in todo]
 
+    if parse_workers > 1:
+        pool = ProcessPoolExecutor(parse_workers)
+        results = pool.map(_extract_stored, tasks, chunksize=32)
+    else:
+        pool = None
+        results = map(_extract_stored, tasks)
+
+    try:
+        for url, article, found in results:
+            if not found:
+                stats["not_in_store"] += 1
+            elif not article["content"] or article["word_count"] < MIN_WORDS:
+                stats["short"] += 1
+                writer.add(url, None)
+            else:
+                stats["ok"] += 1
+                writer.add(url, article)
+    finally:
+        writer.flush()
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.time() - start_time
+    processed = stats["ok"] + stats["short"]
+    print(f"\n[INFO] Ekstraksi offline selesai dalam {elapsed:.2f} detik "
+          f"({processed / elapsed if elapsed else 0:.1f} halaman/detik, {parse_workers} proses).")
+    print(f"[INFO] Artikel valid: {stats['ok']}, konten pendek: {stats['short']}, "
+          f"tidak ada di store: {stats['not_in_store']}")
+
+
+# ============================
+# MODE RECRAWL KONDISIONAL
+# ============================
+def _same_article(old_row, article: dict) -> bool:
+    """Judul, konten & gambar hasil ekstraksi sama dengan baris scraped.csv."""
+    for col in ("title", "content", "image_url"):
+        old = "" if pd.isna(old_row[col]) else str(old_row[col])
+        if old != str(article[col] or ""):
+            return False
+    return True
+
+
+async def recrawl_async(concurrency: int, parse_workers: int):
+    """
+    Cek ulang artikel di scraped.csv dengan request kondisional: ETag /
+    Last-Modified + sha1 HTML terakhir diambil dari page store.
+
+    - 304 Not Modified / sha1 HTML sama  -> tidak diekstrak ulang
+    - hasil ekstraksi sama dengan CSV    -> tidak diteruskan ke cleaning/indexing
+    - berubah                            -> baris scraped.csv ditimpa di tempat
+                                            (doc_id tetap) + masuk CHANGED_LOG
+
+    quick_corpus_clean.py / clean_corpus_v2.py / quick_indexing.py dengan
+    --changed lalu hanya memproses URL di CHANGED_LOG yang belum mereka
+    proses (log di-append, lihat changed_docs.py).
+    """
+    if not OUTPUT_FILE.exists():
+        raise FileNotFoundError(f"scraped.csv belum ada: {OUTPUT_FILE}")
+    df = pd.read_csv(OUTPUT_FILE)
+    urls = list(dict.fromkeys(df["url"].astype(str)))
+    print(f"[INFO] Recrawl kondisional {len(urls)} artikel dari {OUTPUT_FILE.name}")
+
+    by_host = defaultdict(deque)
+    for url in urls:
+        by_host[url_host(url)].append(url)
+
+    scheduler = HostScheduler(base_delay=PER_DOMAIN_DELAY, burst=PER_DOMAIN_BURST)
+    stats = Counter()
+    changed = {}
+    loop = asyncio.get_running_loop()
+    store = PageStore()
+    first_row = {}
+    for i, url in enumerate(df["url"].astype(str)):
+        first_row.setdefault(url, i)
+
+    pool = None
+    if parse_workers > 0:
+        pool = ProcessPoolExecutor(parse_workers, mp_context=mp.get_context("spawn"))
+
+    async def worker(session):
+        while True:
+            hosts = [h for h, queue in by_host.items() if queue]
+            if not hosts:
+                return
+            host = await next_ready_host(session, scheduler, hosts)
+            if host is None:
+                continue
+
+            url = by_host[host].popleft()
+            validators = store.validators(url)
+            headers = conditional_headers(validators.etag, validators.last_modified) if validators else None
+            page = await polite_fetch(session, url, scheduler, headers=headers)
+            if page is None:
+                stats["failed"] += 1
+                continue
+            if page.status == 304:
+                stats["not_modified"] += 1
+                continue
+            if validators is not None and content_sha1(page.text) == validators.sha1:
+                # Server tidak mendukung request kondisional, tapi isinya sama
+                stats["same_hash"] += 1
+                continue
+
+            if pool is None:
+                article = extract_article(url, page.text)
+            else:
+                article = await loop.run_in_executor(pool, extract_article, url, page.text)
+
+            if not article["content"] or article["word_count"] < MIN_WORDS:
+                # Baris lama dipertahankan
+                print(f"[SKIP - KONTEN PENDEK] {url}")
+                stats["short"] += 1
+            elif _same_article(df.iloc[first_row[url]], article):
+                stats["same_content"] += 1
+            else:
+                print(f"[CHANGED] {url} (≈ {article['word_count']} kata)")
+                stats["changed"] += 1
+                changed[url] = (article, page)
+                continue
+            store.put(url, page.text, page.headers, page.status)
+
+    start_time = time.time()
+    session = async_session(limit=concurrency)
+    try:
+        try:
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        finally:
+            await session.close()
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if changed:
+            rows = [i for i, url in enumerate(df["url"].astype(str)) if url in changed]
+            updated = pd.DataFrame([changed[str(df["url"].iat[i])][0] for i in rows],
+                                   columns=OUTPUT_COLUMNS, index=rows)
+            df = merge_rows(df, updated)
+            tmp_path = OUTPUT_FILE.with_suffix(".csv.tmp")
+            df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+            os.replace(tmp_path, OUTPUT_FILE)
+        append_changed_urls(changed, CHANGED_LOG)
+
+        # Halaman berubah baru masuk store SETELAH scraped.csv tersimpan: kalau
+        # proses mati di tengah, recrawl berikutnya masih melihatnya berubah
+        for url, (_, page) in changed.items():
+            store.put(url, page.text, page.headers, page.status)
+    finally:
+        store.close()
+
+    elapsed = time.time() - start_time
+    total = len(urls)
+    not_fetched = stats["not_modified"] + stats["same_hash"]
+    skipped = not_fetched + stats["same_content"]
+    print(f"\n[INFO] Recrawl selesai dalam {elapsed:.2f} detik "
+          f"({total / elapsed if elapsed else 0:.1f} URL/detik).")
+    print(f"[INFO] 304 Not Modified: {stats['not_modified']}, sha1 HTML sama: {stats['same_hash']}, "
+          f"konten sama: {stats['same_content']}, berubah: {stats['changed']}, "
+          f"konten pendek: {stats['short']}, gagal: {stats['failed']}")
+    print(f"[INFO] Ekstraksi di-skip : {not_fetched}/{total} ({not_fetched / max(total, 1):.1%})")
+    print(f"[INFO] Indexing di-skip  : {skipped}/{total} ({skipped / max(total, 1):.1%})")
+    print(f"[INFO] {len(changed)} URL berubah -> {CHANGED_LOG}")
+    print_handshake_stats()
+
+
+def run_serial():
     results = scrape_all()
 
     if results:
@@ -282,3 +616,44 @@ if __name__ == "__main__":
         print(df.head())
     else:
         print("\n[WARNING] Tidak ada data yang berhasil di-scrape!")
+
+
+# ============================
+# ENTRY POINT
+# ============================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape artikel dari data/urls.txt")
+    parser.add_argument("--serial", action="store_true",
+                        help="Mode lama: satu per satu, tulis scraped.csv di akhir")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_TASKS)
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                        help="Proses untuk parsing HTML (0 = di event loop)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--fresh", action="store_true",
+                        help="Hapus scraped.csv + log progres, scrape ulang semua")
+    parser.add_argument("--from-store", action="store_true",
+                        help="Ekstrak offline dari page store crawler (tanpa request)")
+    parser.add_argument("--recrawl", action="store_true",
+                        help="Cek ulang artikel di scraped.csv (ETag/Last-Modified), "
+                             "hanya yang berubah ditimpa + dicatat di changed_urls.txt")
+    args = parser.parse_args()
+
+    print(f"[INFO] Working Directory : {BASE_DIR}")
+    print(f"[INFO] URL source       : {URL_FILE}")
+    print(f"[INFO] Output CSV       : {OUTPUT_FILE}\n")
+
+    if args.fresh:
+        for path in (OUTPUT_FILE, DONE_LOG):
+            if path.exists():
+                path.unlink()
+
+    if args.serial:
+        run_serial()
+    elif args.recrawl:
+        asyncio.run(recrawl_async(args.concurrency, args.parse_workers))
+    elif args.from_store:
+        scrape_from_store(args.parse_workers, args.batch_size)
+        print(f"\n[SUCCESS] Hasil disimpan (append per batch) ke: {OUTPUT_FILE}")
+    else:
+        asyncio.run(scrape_all_async(args.concurrency, args.parse_workers, args.batch_size))
+        print(f"\n[SUCCESS] Hasil disimpan (append per batch) ke: {OUTPUT_FILE}")
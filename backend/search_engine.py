@@ -1,39 +1,38 @@
 from __future__ import annotations
 
 import json
-import math
-import re
-from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import os
-import pandas as pd
+
+import numpy as np
+
+from boolean_query import is_boolean_query, parse_query
+from compact_index import index_generation, load_compact_index, average_doc_len
+from ranking import (
+    BM25_PARAMS_FILE, EMPTY_SCORES, Scores, bm25_contrib, load_bm25_params,
+    preprocess_query, score_tokens, top_k as _top_k,
+)
 
 # ========== PATH SETUP ==========
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-
-# ========== LOAD DOC META ==========
-DOC_META_DF = pd.read_csv(DATA_DIR / "doc_meta.csv")
-DOC_META = {
-    int(row["doc_id"]): {
-        "doc_id": int(row["doc_id"]),
-        "title": row["title"],
-        "url": row["url"],
-        "doc_len": int(row["doc_len"]),
-    }
-    for _, row in DOC_META_DF.iterrows()
-}
+# SIPAPA_DATA_DIR: arahkan engine ke folder data lain (mis. korpus sintetis)
+DATA_DIR = Path(os.environ.get("SIPAPA_DATA_DIR", BASE_DIR / "data"))
 
-# ========== LOAD CORPUS (VERSI CLEAN v2) ==========
-CORPUS_DF = pd.read_csv(DATA_DIR / "corpus_clean_v2.csv")
-CORPUS_BY_URL = {
-    str(row["url"]): {
-        "content_final": str(row.get("content_final", "")),
-        "image_url": "" if pd.isna(row.get("image_url")) else str(row.get("image_url", "")),
-    }
-    for _, row in CORPUS_DF.iterrows()
-}
+# ========== LOAD INDEX + DOC META (COMPACT) ==========
+# TERMS: term dictionary + postings CSR, DOCS: metadata & konten (lihat compact_index.py).
+# Tidak ada DataFrame / dict-of-dicts yang disimpan setelah load.
+TERMS, DOCS = load_compact_index(DATA_DIR)
+# Berubah setiap index di-build ulang; dipakai api.py sebagai ETag dokumen
+INDEX_GENERATION: str = index_generation(DATA_DIR)
+
+N: int = len(DOCS)
+AVGDL: float = average_doc_len(DOCS)
+
+# ========== PARAMETER BM25 ==========
+# Default k1/b bisa di-override hasil tuning (bm25_sweep.py --write-config)
+BM25_PARAMS_PATH = DATA_DIR / BM25_PARAMS_FILE
+BM25_K1, BM25_B = load_bm25_params(DATA_DIR)
 
 # ========== STOPWORDS + STEMMER (opsional) ==========
 STOPWORDS_PATH = BASE_DIR / "stopwords_id.txt"
@@ -59,159 +58,185 @@ def _stem(token: str) -> str:
         return token
 
 
-# ========== LOAD INVERTED INDEX ==========
-with (DATA_DIR / "inverted_index.json").open("r", encoding="utf-8") as f:
-    _raw_index = json.load(f)
-
-INVERTED_INDEX: Dict[str, Dict[int, int]] = {}
-for term, postings in _raw_index.items():
-    doc_tf: Dict[int, int] = {}
-
-    if isinstance(postings, dict):  # direct {doc: tf}
-        for doc_id, tf in postings.items():
-            doc_tf[int(doc_id)] = int(tf)
-
-    elif isinstance(postings, list):  # list postings
-        for item in postings:
-            doc_id = None
-            tf = 1
-
-            if isinstance(item, (list, tuple)) and len(item) >= 2:
-                doc_id, tf = item[0], item[1]
-
-            elif isinstance(item, dict):
-                doc_id = item.get("doc_id") or item.get("id") or item.get("doc")
-                tf = item.get("tf") or item.get("freq") or item.get("count") or 1
-
-            else:
-                doc_id = item
-                tf = 1
-
-            if doc_id is not None:
-                doc_tf[int(doc_id)] = doc_tf.get(int(doc_id), 0) + int(tf)
-
-    INVERTED_INDEX[term] = doc_tf
-
-DOC_META_MAP = DOC_META
-N: int = len(DOC_META_MAP)
-AVGDL: float = float(DOC_META_DF["doc_len"].mean())
+# ========== SEARCH CORE ==========
+# Preprocessing query, akumulasi skor dan top-k ada di ranking.py (dipakai
+# juga handler serverless api/search.py).
+
+# Field hasil /search (urutan = urutan key di JSON). Tiap field dihitung
+# per kolom untuk semua dokumen top-k, jadi field yang tidak diminta
+# (mis. snippet) tidak pernah di-decode.
+RESULT_FIELDS = ("doc_id", "title", "url", "doc_len", "score", "snippet", "image_url")
+SNIPPET_CHARS = 1200
+
+_FIELD_COLUMNS: Dict[str, Callable] = {
+    "doc_id": lambda rows, values: DOCS.doc_ids[rows].tolist(),
+    "title": lambda rows, values: [DOCS.title(r) for r in rows.tolist()],
+    "url": lambda rows, values: [DOCS.url(r) for r in rows.tolist()],
+    "doc_len": lambda rows, values: DOCS.doc_len[rows].tolist(),
+    "score": lambda rows, values: values.tolist(),
+    "snippet": lambda rows, values: [DOCS.snippet(r, SNIPPET_CHARS) or DOCS.title(r)
+                                     for r in rows.tolist()],
+    "image_url": lambda rows, values: [DOCS.image_url(r) for r in rows.tolist()],
+}
 
-# ========== IDF CALC ==========
 
-DF_MAP = {term: len(postings) for term, postings in INVERTED_INDEX.items()}
+def _rank_to_results(scores: Scores, top_k: int, fields: Sequence[str] = RESULT_FIELDS):
+    rows, values = scores
+    top = _top_k(scores, top_k)
+    top_rows = rows[top].astype(np.int64)
+    columns = [_FIELD_COLUMNS[name](top_rows, values[top]) for name in fields]
+    return [dict(zip(fields, record)) for record in zip(*columns)]
 
-IDF_TFIDF = {}
-IDF_BM25 = {}
 
-for term, df in DF_MAP.items():
-    df = max(1, df)
-    IDF_TFIDF[term] = math.log(N / df)
-    IDF_BM25[term] = math.log((N - df + 0.5) / (df + 0.5) + 1)
+# Kontribusi satu term ke skor dokumen: f(term_id, rows, tf, params) -> array skor.
+# Tambah scorer baru cukup daftarkan fungsinya di SCORERS.
 
+def _tfidf_contrib(term_id: int, rows: np.ndarray, tf: np.ndarray, params: dict) -> np.ndarray:
+    return tf * TERMS.idf_tfidf[term_id]
 
-# ========== QUERY PREPROCESSING ==========
 
-def preprocess_query(text: str) -> List[str]:
-    text = text.lower()
-    text = re.sub(r"http\S+|www\.\S+", " ", text)
-    text = re.sub(r"[^0-9a-zA-Z\s]", " ", text)
-    tokens = re.findall(r"\w+", text)
-    return [t for t in tokens if t]
+def _bm25_contrib(term_id: int, rows: np.ndarray, tf: np.ndarray, params: dict) -> np.ndarray:
+    return bm25_contrib(tf, DOCS.doc_len[rows], TERMS.idf_bm25[term_id],
+                        params.get("k1", BM25_K1), params.get("b", BM25_B), AVGDL)
 
 
-# ========== SEARCH CORE ==========
+SCORERS: Dict[str, Callable] = {
+    "tfidf": _tfidf_contrib,
+    "bm25": _bm25_contrib,
+}
 
-def _rank_to_results(scores: Counter, top_k: int):
-    ranked = scores.most_common(top_k)
-    results = []
 
-    for doc_id, score in ranked:
-        meta = DOC_META_MAP.get(int(doc_id))
-        if not meta:
+def multi_scores(tokens: List[str], scorers: Sequence[str] = ("tfidf", "bm25"),
+                 **params) -> Dict[str, Scores]:
+    """
+    Hitung beberapa scorer sekaligus dari SATU traversal postings:
+    lookup term & slice postings sekali, lalu tiap scorer menghitung kontribusinya.
+    """
+    funcs = {name: SCORERS[name] for name in scorers}
+    return score_tokens(TERMS, tokens, funcs, params)
+
+
+def boolean_scores(query: str, scorers: Sequence[str] = ("tfidf", "bm25"),
+                   **params) -> Dict[str, Scores]:
+    """
+    Query boolean (AND/OR/NOT, +/-, kurung; lihat boolean_query.py): cari
+    dulu dokumen yang lolos lewat execution tree, lalu skor hanya dokumen itu
+    dengan term positif query. Query yang restriktif jadi lebih murah dari
+    multi_scores karena union postings tidak pernah dibangun.
+    """
+    funcs = {name: SCORERS[name] for name in scorers}
+    node, scoring_terms = parse_query(query, preprocess_query, TERMS)
+    matched = node.rows(TERMS)
+    if len(matched) == 0:
+        return {name: EMPTY_SCORES for name in funcs}
+    totals = {name: np.zeros(len(matched), dtype=np.float64) for name in funcs}
+
+    for term in scoring_terms:
+        rows, tf = TERMS.postings(term.term_id)
+        if len(rows) == 0:
+            continue
+        # Posisi tiap dokumen hasil di postings term ini (binary search)
+        pos = np.searchsorted(rows, matched)
+        np.minimum(pos, len(rows) - 1, out=pos)
+        hit = rows[pos] == matched
+        if not hit.any():
             continue
+        hit_rows, hit_tf = matched[hit], tf[pos[hit]]
+        for name, func in funcs.items():
+            totals[name][hit] += func(term.term_id, hit_rows, hit_tf, params)
 
-        url = meta["url"]
-        corpus = CORPUS_BY_URL.get(url, {})
-        content_final = corpus.get("content_final", "")
-        image_url = corpus.get("image_url", "")
+    return {name: (matched, totals[name]) for name in funcs}
 
-        snippet = content_final[:1200] if content_final else meta["title"]
 
-        results.append({
-            "doc_id": doc_id,
-            "title": meta["title"],
-            "url": url,
-            "doc_len": meta["doc_len"],
-            "score": float(score),
-            "snippet": snippet,
-            "image_url": image_url,
-        })
+def query_scores(query: str, scorers: Sequence[str] = ("tfidf", "bm25"),
+                 **params) -> Dict[str, Scores]:
+    """Query boolean -> boolean_scores, selain itu bag-of-words multi_scores."""
+    if is_boolean_query(query):
+        return boolean_scores(query, scorers, **params)
+    return multi_scores(preprocess_query(query), scorers, **params)
 
-    return results
 
+def tfidf_scores(tokens: List[str]) -> Scores:
+    return multi_scores(tokens, ("tfidf",))["tfidf"]
 
-def tfidf_search(query: str, top_k: int = 20):
-    tokens = preprocess_query(query)
-    scores = Counter()
 
-    for term in tokens:
-        postings = INVERTED_INDEX.get(term)
-        if not postings:
-            continue
+def bm25_scores(tokens: List[str], k1: float = BM25_K1, b: float = BM25_B) -> Scores:
+    return multi_scores(tokens, ("bm25",), k1=k1, b=b)["bm25"]
 
-        idf = IDF_TFIDF.get(term, 0)
-        for doc_id, tf in postings.items():
-            scores[doc_id] += tf * idf
 
-    return _rank_to_results(scores, top_k)
+def rank_doc_ids(scores: Scores, top_k: int) -> List[int]:
+    """Doc_id hasil ranking saja, tanpa materialisasi title/snippet."""
+    rows, _ = scores
+    return DOCS.doc_ids[rows[_top_k(scores, top_k)]].tolist()
 
 
-def bm25_search(query: str, top_k: int = 20, k1: float = 1.5, b: float = 0.75):
-    tokens = preprocess_query(query)
-    scores = Counter()
+def multi_search_ids(query: str, top_k: int = 20,
+                     scorers: Sequence[str] = ("tfidf", "bm25"), **params) -> Dict[str, List[int]]:
+    """
+    Ranking beberapa algoritma untuk satu query dengan satu traversal postings.
+    Return {nama scorer: [doc_id, ...]} (cukup untuk evaluasi).
+    """
+    all_scores = query_scores(query, scorers, **params)
+    return {name: rank_doc_ids(scores, top_k) for name, scores in all_scores.items()}
 
-    for term in tokens:
-        postings = INVERTED_INDEX.get(term)
-        if not postings:
-            continue
 
-        idf = IDF_BM25.get(term, 0)
+def tfidf_search(query: str, top_k: int = 20, fields: Sequence[str] = RESULT_FIELDS):
+    return _rank_to_results(query_scores(query, ("tfidf",))["tfidf"], top_k, fields)
 
-        for doc_id, tf in postings.items():
-            dl = DOC_META_MAP[doc_id]["doc_len"]
-            denom = tf + k1 * (1 - b + b * (dl / AVGDL))
-            score = idf * (tf * (k1 + 1)) / denom
-            scores[doc_id] += score
 
-    return _rank_to_results(scores, top_k)
+def bm25_search(query: str, top_k: int = 20, k1: float = BM25_K1, b: float = BM25_B,
+                fields: Sequence[str] = RESULT_FIELDS):
+    return _rank_to_results(query_scores(query, ("bm25",), k1=k1, b=b)["bm25"], top_k, fields)
 
 
 # ========== GET DETAIL DOCUMENT ==========
 
+def has_document(doc_id: int) -> bool:
+    """Cek keberadaan doc_id tanpa decode konten."""
+    return DOCS.row_of(int(doc_id)) >= 0
+
+
 def get_document(doc_id: int):
     doc_id = int(doc_id)
-    meta = DOC_META.get(doc_id)
-    if not meta:
+    row = DOCS.row_of(doc_id)
+    if row < 0:
         return None
 
-    corpus = CORPUS_BY_URL.get(meta["url"], {})
-    content = corpus.get("content_final", "")
-    image_url = corpus.get("image_url", "")
-
     return {
         "doc_id": doc_id,
-        "title": meta["title"],
-        "url": meta["url"],
-        "doc_len": meta["doc_len"],
-        "content": content,
-        "image_url": image_url,
+        "title": DOCS.title(row),
+        "url": DOCS.url(row),
+        "doc_len": int(DOCS.doc_len[row]),
+        "content": DOCS.content(row),
+        "image_url": DOCS.image_url(row),
     }
 
 
 # ========== METRICS LOADER ==========
+METRICS_PATH = DATA_DIR / "evaluation_report.json"
+
+# (stamp file, isi) dari parse terakhir; diganti utuh supaya aman antar thread
+_metrics_cache: Tuple[Optional[Tuple[int, int]], dict] = (None, {})
+
+
+def metrics_stamp() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, ukuran) evaluation_report.json, None kalau belum ada."""
+    try:
+        st = METRICS_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def get_metrics():
-    path = DATA_DIR / "evaluation_report.json"
-    if not path.exists():
+    """Isi evaluation_report.json; di-parse ulang hanya kalau file berubah."""
+    global _metrics_cache
+    stamp = metrics_stamp()
+    if stamp is None:
         return {}
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    cached_stamp, data = _metrics_cache
+    if cached_stamp != stamp:
+        with METRICS_PATH.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        _metrics_cache = (stamp, data)
+    return data
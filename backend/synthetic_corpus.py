@@ -0,0 +1,247 @@
+"""
+Generator korpus sintetis untuk uji skala pipeline (100k - 10M dokumen).
+
+Output-nya pakai skema yang sama dengan pipeline asli:
+- corpus_clean.csv    : url, title, image_url, content_final, content_clean,
+                        word_count_clean  (input quick_indexing.py / evaluator)
+- corpus_clean_v2.csv : url, title, image_url, content_final  (input search_engine.py)
+
+Distribusi dibuat mirip korpus asli:
+- Vocabulary Zipfian: urutan term + eksponen Zipf di-fit dari statistik
+  inverted_index.json asli, lalu diperpanjang dengan term sintetis mengikuti
+  Heaps' law supaya vocabulary ikut tumbuh dengan ukuran korpus.
+- Panjang dokumen: log-normal yang di-fit dari doc_len di doc_meta.csv.
+
+Ditulis per chunk (streaming), jadi memori tetap kecil walau 10M dokumen.
+
+Contoh:
+    python synthetic_corpus.py --docs 100000 --out data/synthetic/n100000
+    SIPAPA_DATA_DIR=data/synthetic/n100000 python quick_indexing.py
+    SIPAPA_DATA_DIR=data/synthetic/n100000 python benchmark.py
+"""
+import argparse
+import csv
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+
+# Default kalau statistik korpus asli tidak tersedia
+DEFAULT_ZIPF_S = 1.05
+DEFAULT_LEN_MU = 5.5      # exp(5.5) ≈ 245 kata
+DEFAULT_LEN_SIGMA = 0.6
+MIN_DOC_LEN = 20
+MAX_DOC_LEN = 20_000
+
+# Heaps' law V = K * n^beta (n = total token). beta ≈ 0.5 untuk teks berita.
+HEAPS_BETA = 0.5
+
+CORPUS_COLUMNS = [
+    "url", "title", "image_url", "content_final", "content_clean", "word_count_clean",
+]
+CORPUS_V2_COLUMNS = ["url", "title", "image_url", "content_final"]
+
+
+# ========== STATISTIK KORPUS ASLI ==========
+
+def load_term_stats(index_path: Path) -> tuple:
+    """
+    Ambil term asli diurutkan berdasarkan collection frequency (cf).
+    Return (terms, cf) atau ([], array kosong) kalau index tidak ada.
+    """
+    if not index_path.exists():
+        print(f"[WARN] {index_path} tidak ada, pakai vocabulary sintetis penuh")
+        return [], np.array([], dtype=np.int64)
+
+    with index_path.open("r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    stats = []
+    for term, postings in raw.items():
+        if isinstance(postings, dict):
+            cf = sum(int(tf) for tf in postings.values())
+        else:
+            cf = sum(int(p[1]) if isinstance(p, (list, tuple)) else 1 for p in postings)
+        stats.append((term, cf))
+    stats.sort(key=lambda x: (-x[1], x[0]))
+
+    terms = [t for t, _ in stats]
+    cf = np.array([c for _, c in stats], dtype=np.int64)
+    return terms, cf
+
+
+def fit_zipf_exponent(cf: np.ndarray) -> float:
+    """Fit s pada cf(r) ∝ r^-s (regresi log-log, buang ekor yang berisik)."""
+    if len(cf) < 100:
+        return DEFAULT_ZIPF_S
+    hi = min(len(cf), 20_000)
+    ranks = np.arange(1, hi + 1)
+    slope, _ = np.polyfit(np.log(ranks[9:]), np.log(cf[9:hi]), 1)
+    return float(min(max(-slope, 0.7), 1.5))
+
+
+def fit_doc_length(doc_meta_path: Path) -> tuple:
+    """Fit log-normal (mu, sigma) dari doc_len."""
+    if not doc_meta_path.exists():
+        return DEFAULT_LEN_MU, DEFAULT_LEN_SIGMA
+    lengths = pd.read_csv(doc_meta_path, usecols=["doc_len"])["doc_len"]
+    lengths = lengths[lengths > 0].astype(float)
+    if len(lengths) < 10:
+        return DEFAULT_LEN_MU, DEFAULT_LEN_SIGMA
+    logs = np.log(lengths.to_numpy())
+    return float(logs.mean()), float(logs.std())
+
+
+# ========== VOCABULARY ==========
+
+def build_vocabulary(real_terms: list, real_cf: np.ndarray, n_docs: int,
+                     len_mu: float, len_sigma: float, vocab_size: int = None) -> list:
+    """
+    Vocabulary = term asli (urut cf) + term sintetis 'sintetisN' kalau
+    ukuran vocabulary Heaps' law untuk korpus target lebih besar.
+    """
+    if vocab_size is None:
+        expected_len = math.exp(len_mu + len_sigma ** 2 / 2)
+        total_tokens = n_docs * expected_len
+        if len(real_cf) > 0:
+            # K di-fit dari korpus asli: V_asli = K * n_asli^beta
+            k = len(real_terms) / (real_cf.sum() ** HEAPS_BETA)
+        else:
+            k = 40.0
+        vocab_size = int(k * total_tokens ** HEAPS_BETA)
+        vocab_size = max(vocab_size, len(real_terms), 1000)
+
+    vocab = list(real_terms[:vocab_size])
+    for i in range(vocab_size - len(vocab)):
+        vocab.append(f"sintetis{i}")
+    return vocab
+
+
+def zipf_cdf(vocab_size: int, s: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, vocab_size + 1, dtype=np.float64) ** s
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    return cdf
+
+
+# ========== GENERATOR ==========
+
+def generate_chunk(rng: np.random.Generator, start_id: int, n: int, vocab: np.ndarray,
+                   cdf: np.ndarray, len_mu: float, len_sigma: float) -> dict:
+    lengths = rng.lognormal(len_mu, len_sigma, size=n)
+    lengths = np.clip(lengths, MIN_DOC_LEN, MAX_DOC_LEN).astype(np.int64)
+
+    # Inverse-CDF sampling untuk semua token di chunk sekaligus
+    token_ids = np.searchsorted(cdf, rng.random(int(lengths.sum())), side="right")
+    title_lens = rng.integers(5, 12, size=n)
+    title_ids = np.searchsorted(cdf, rng.random(int(title_lens.sum())), side="right")
+    has_image = rng.random(n) < 0.95
+
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    title_offsets = np.concatenate(([0], np.cumsum(title_lens)))
+
+    rows = {col: [] for col in CORPUS_COLUMNS}
+    for i in range(n):
+        doc_id = start_id + i
+        words = vocab[token_ids[offsets[i]:offsets[i + 1]]]
+        # Paragraf ~60 kata seperti artikel asli
+        paragraphs = [" ".join(words[p:p + 60]) for p in range(0, len(words), 60)]
+        content_final = "\n".join(p.capitalize() for p in paragraphs)
+        title_words = vocab[title_ids[title_offsets[i]:title_offsets[i + 1]]]
+
+        rows["url"].append(f"https://synthetic.sipapa.local/read/{doc_id // 1000}/{doc_id}")
+        rows["title"].append(" ".join(title_words).title())
+        rows["image_url"].append(
+            f"https://synthetic.sipapa.local/img/{doc_id}.jpg" if has_image[i] else ""
+        )
+        rows["content_final"].append(content_final)
+        rows["content_clean"].append(" ".join(words))
+        rows["word_count_clean"].append(int(lengths[i]))
+    return rows
+
+
+def generate_corpus(n_docs: int, out_dir: Path, seed: int = 42, chunk_size: int = 10_000,
+                    vocab_size: int = None, source_dir: Path = DATA_DIR) -> dict:
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    real_terms, real_cf = load_term_stats(source_dir / "inverted_index.json")
+    zipf_s = fit_zipf_exponent(real_cf)
+    len_mu, len_sigma = fit_doc_length(source_dir / "doc_meta.csv")
+    vocab = build_vocabulary(real_terms, real_cf, n_docs, len_mu, len_sigma, vocab_size)
+    vocab_arr = np.array(vocab, dtype=object)
+    cdf = zipf_cdf(len(vocab), zipf_s)
+
+    print(f"[INFO] Target dokumen : {n_docs:,}")
+    print(f"[INFO] Vocabulary     : {len(vocab):,} term ({len(real_terms):,} dari korpus asli)")
+    print(f"[INFO] Zipf s         : {zipf_s:.3f}")
+    print(f"[INFO] Panjang dok    : lognormal(mu={len_mu:.2f}, sigma={len_sigma:.2f})")
+
+    rng = np.random.default_rng(seed)
+    corpus_path = out_dir / "corpus_clean.csv"
+    corpus_v2_path = out_dir / "corpus_clean_v2.csv"
+
+    start = time.time()
+    written = 0
+    with corpus_path.open("w", encoding="utf-8", newline="") as f_all, \
+            corpus_v2_path.open("w", encoding="utf-8", newline="") as f_v2:
+        w_all = csv.writer(f_all)
+        w_v2 = csv.writer(f_v2)
+        w_all.writerow(CORPUS_COLUMNS)
+        w_v2.writerow(CORPUS_V2_COLUMNS)
+
+        while written < n_docs:
+            n = min(chunk_size, n_docs - written)
+            rows = generate_chunk(rng, written, n, vocab_arr, cdf, len_mu, len_sigma)
+            w_all.writerows(zip(*(rows[c] for c in CORPUS_COLUMNS)))
+            w_v2.writerows(zip(*(rows[c] for c in CORPUS_V2_COLUMNS)))
+            written += n
+
+            elapsed = time.time() - start
+            print(f"   → {written:,}/{n_docs:,} dokumen ({written / elapsed:,.0f} dok/detik)")
+
+    elapsed = time.time() - start
+    info = {
+        "n_docs": n_docs,
+        "seed": seed,
+        "vocab_size": len(vocab),
+        "real_vocab_size": len(real_terms),
+        "zipf_s": zipf_s,
+        "len_mu": len_mu,
+        "len_sigma": len_sigma,
+        "generate_seconds": elapsed,
+        "corpus_bytes": corpus_path.stat().st_size,
+        "corpus_v2_bytes": corpus_v2_path.stat().st_size,
+    }
+    with (out_dir / "synthetic_info.json").open("w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+    print(f"\n[SUCCESS] Korpus sintetis disimpan ke: {out_dir}")
+    print(f"   - Waktu: {elapsed:.1f} detik")
+    print(f"   - Ukuran corpus_clean.csv: {info['corpus_bytes'] / 1e6:.1f} MB")
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate korpus sintetis untuk uji skala")
+    parser.add_argument("--docs", type=int, required=True, help="Jumlah dokumen")
+    parser.add_argument("--out", help="Folder output (default data/synthetic/n<docs>)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--vocab-size", type=int, help="Paksa ukuran vocabulary")
+    parser.add_argument("--source-dir", default=str(DATA_DIR),
+                        help="Folder data asli untuk statistik term & panjang dokumen")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out) if args.out else DATA_DIR / "synthetic" / f"n{args.docs}"
+    generate_corpus(args.docs, out_dir, args.seed, args.chunk_size,
+                    args.vocab_size, Path(args.source_dir))
+
+
+if __name__ == "__main__":
+    main()
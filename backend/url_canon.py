@@ -0,0 +1,127 @@
+"""
+Kanonikalisasi URL + aturan filter frontier crawler.
+
+canonicalize_url():
+- scheme & host lowercase, port default (:80 / :443) dibuang
+- fragment (#...) dibuang
+- path: segmen "." / ".." diselesaikan, "//" digabung
+- query: parameter tracking (utm_*, fbclid, ...) dan paginasi (page) dibuang,
+  sisanya diurutkan supaya urutan parameter tidak menghasilkan URL "baru"
+
+UrlFilter.admit() dipakai crawling.py sebelum URL masuk frontier: URL di luar
+ALLOWED_DOMAINS, halaman non-artikel (BLOCKED_PATH_FRAGMENTS, sama dengan
+is_article_url di scrape_articles.py) dan file statis tidak pernah di-fetch.
+Counter-nya menunjukkan berapa fetch yang dihemat.
+"""
+from __future__ import annotations
+
+import posixpath
+import re
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+BLOCKED_PATH_FRAGMENTS = ("/copy/", "/komentar/", "/image/", "/search/")
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "_ga", "_gl",
+    "mc_cid", "mc_eid", "ref", "ref_src", "src", "source", "tag_from",
+}
+TRACKING_PREFIXES = ("utm_",)
+PAGINATION_PARAMS = {"page"}
+
+ASSET_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".bmp",
+    ".css", ".js", ".json", ".xml", ".pdf", ".zip", ".mp3", ".mp4",
+    ".woff", ".woff2", ".ttf",
+}
+
+_MULTI_SLASH_RE = re.compile(r"/{2,}")
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def _is_dropped_param(name: str) -> bool:
+    name = name.lower()
+    return (
+        name in TRACKING_PARAMS
+        or name in PAGINATION_PARAMS
+        or name.startswith(TRACKING_PREFIXES)
+    )
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """Bentuk kanonik URL http(s); None kalau bukan URL http(s) yang valid."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if port is not None and str(port) != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = _MULTI_SLASH_RE.sub("/", parts.path or "/")
+    if "/." in path:
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path)
+        if trailing and path != "/":
+            path += "/"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_dropped_param(k)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def is_blocked_path(url: str) -> bool:
+    path = urlsplit(url).path or ""
+    return any(b in path for b in BLOCKED_PATH_FRAGMENTS)
+
+
+def is_asset(url: str) -> bool:
+    return posixpath.splitext(urlsplit(url).path)[1].lower() in ASSET_EXTENSIONS
+
+
+class UrlFilter:
+    """Kanonikalisasi + filter link sebelum masuk frontier, dengan counter."""
+
+    def __init__(self, allowed_domains: Iterable[str]):
+        self.allowed_domains = tuple(allowed_domains)
+        self.counts: Counter = Counter()
+
+    def admit(self, url: str) -> Optional[str]:
+        """URL kanonik kalau layak di-crawl, None kalau dibuang."""
+        self.counts["links_seen"] += 1
+        canon = canonicalize_url(url)
+        if canon is None:
+            self.counts["dropped_invalid"] += 1
+            return None
+        if canon != url:
+            self.counts["rewritten"] += 1
+
+        host = urlsplit(canon).netloc
+        if not any(host.endswith(allow) for allow in self.allowed_domains):
+            self.counts["dropped_offsite"] += 1
+            return None
+        if is_blocked_path(canon):
+            self.counts["dropped_blocked_path"] += 1
+            return None
+        if is_asset(canon):
+            self.counts["dropped_asset"] += 1
+            return None
+        return canon
+
+    def fetches_avoided(self) -> int:
+        """Link on-site yang tidak di-fetch karena aturan filter."""
+        return self.counts["dropped_blocked_path"] + self.counts["dropped_asset"]